@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Procedural Asset Registry
+=========================
+
+Every procedural generator script declares the files it produces with an
+``asset_jobs()`` function returning AssetJob entries: an output path, a
+module-level function that draws it (returning a PIL image, or text for prompt
+files) and its arguments. Nothing is drawn at import time, so the build driver
+(build_assets.py) can import every generator, see all outputs up front and
+spread the jobs over a process pool.
+
+Several scripts draw the same files (e.g. ``client/assets/resources/tree_oak.png``
+comes from generate_assets and generate_quality_trees).
+Conflicts are resolved per output:
+
+1. a primary job beats a fallback job
+2. otherwise the generator listed later in GENERATORS wins
+
+Fallback jobs draw simple placeholders for art that normally comes from the
+image API (buildings, interiors, NPCs, ...). They are only written when the
+file is missing (or is still the placeholder an earlier build wrote), so a
+build never replaces generated art with a placeholder.
+
+With a BuildManifest (build_manifest.py) builds are incremental: only jobs
+whose output is missing or whose fingerprint changed run, slowest first by
+their last recorded time, and a job that draws identical bytes leaves its file
+untouched.
+"""
+
+import importlib
+import io
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from build_manifest import BuildManifest, file_digest
+from image_cache import write_atomic
+from format_manifest import client_keys, drop_stale_webp
+
+# Lowest priority first: a later generator's primary output wins a conflict
+GENERATORS = [
+    'generate_world_builder_assets',
+    'generate_assets',
+    'generate_town_buildings',
+    'generate_building_interiors',
+    'generate_terrain',
+    'generate_animations',
+    'generate_quality_trees',
+]
+
+
+class AssetJob(NamedTuple):
+    """One output file and how to draw it"""
+    output: str
+    build: Callable
+    args: Tuple = ()
+    fallback: bool = False
+    inputs: Tuple[str, ...] = ()
+    generator: str = ''
+
+
+def collect_jobs(generators: Iterable[str] = GENERATORS) -> List[AssetJob]:
+    """Every job every generator declares, tagged with its generator"""
+    jobs = []
+    for name in generators:
+        module = importlib.import_module(name)
+        jobs.extend(job._replace(generator=name) for job in module.asset_jobs())
+    return jobs
+
+
+def resolve_conflicts(jobs: List[AssetJob]) -> Tuple[List[AssetJob], Dict[str, List[AssetJob]]]:
+    """One job per output, plus every output that more than one job claims (winner first)"""
+    order = {name: index for index, name in enumerate(GENERATORS)}
+    claims: Dict[str, List[AssetJob]] = {}
+    for job in jobs:
+        claims.setdefault(job.output, []).append(job)
+
+    selected = []
+    conflicts = {}
+    for output, candidates in claims.items():
+        ranked = sorted(candidates, key=lambda job: (not job.fallback, order.get(job.generator, -1)), reverse=True)
+        selected.append(ranked[0])
+        if len(ranked) > 1:
+            conflicts[output] = ranked
+    return selected, conflicts
+
+
+def render(job: AssetJob) -> bytes:
+    """Draw one job and encode it for its output file"""
+    result = job.build(*job.args)
+    if isinstance(result, str):
+        return result.encode('utf-8')
+    buffer = io.BytesIO()
+    result.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def run_job(job: AssetJob) -> Dict:
+    """Draw one asset and write it unless the file already has those bytes, with its timing (pool worker)"""
+    start = time.perf_counter()
+    try:
+        data = render(job)
+        path = Path(job.output)
+        changed = not path.exists() or path.read_bytes() != data
+        if changed:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(path, data)
+    except Exception as e:
+        return {'output': job.output, 'generator': job.generator, 'error': str(e),
+                'seconds': time.perf_counter() - start}
+    return {'output': job.output, 'generator': job.generator, 'bytes': len(data), 'sha256': file_digest(data),
+            'changed': changed, 'seconds': time.perf_counter() - start}
+
+
+def plan(jobs: List[AssetJob], manifest: Optional[BuildManifest] = None, overwrite: bool = False,
+         force: bool = False) -> Tuple[List[Tuple[AssetJob, List[str]]], List[AssetJob], List[AssetJob]]:
+    """Split jobs into (jobs to run with the reasons, fallbacks kept as they were, up-to-date jobs)"""
+    todo, kept, fresh = [], [], []
+    for job in jobs:
+        exists = Path(job.output).exists()
+        if manifest is None:
+            reasons = ["output missing"] if not exists else ["no build manifest"]
+        else:
+            reasons = manifest.stale_reasons(job, manifest.fingerprint(job))
+        if force and not reasons:
+            reasons = ["forced"]
+
+        if not reasons:
+            fresh.append(job)
+        elif job.fallback and exists and not overwrite and not (manifest and manifest.is_own_output(job.output)):
+            # Replaced by real art since (or never ours): stop tracking it
+            if manifest is not None:
+                manifest.forget(job.output)
+            kept.append(job)
+        else:
+            todo.append((job, reasons))
+
+    if manifest is not None:
+        todo.sort(key=lambda item: manifest.seconds(item[0].output), reverse=True)
+    return todo, kept, fresh
+
+
+def build(jobs: List[AssetJob], workers: Optional[int] = 1, overwrite: bool = False,
+          manifest: Optional[BuildManifest] = None,
+          force: bool = False) -> Tuple[List[Dict], List[AssetJob], List[AssetJob]]:
+    """Run stale jobs (in a pool when workers > 1); returns (results, fallbacks kept, up-to-date jobs)"""
+    todo, kept, fresh = plan(jobs, manifest, overwrite, force)
+    reasons = {job.output: job_reasons for job, job_reasons in todo}
+    fingerprints = {job.output: manifest.fingerprint(job) for job, _ in todo} if manifest is not None else {}
+    pending = [job for job, _ in todo]
+
+    if workers == 1 or len(pending) <= 1:
+        results = [run_job(job) for job in pending]
+    else:
+        with Pool(min(workers or len(pending), len(pending))) as pool:
+            results = list(pool.imap_unordered(run_job, pending, chunksize=1))
+
+    for result in results:
+        result['reasons'] = reasons[result['output']]
+        if manifest is not None and 'error' not in result:
+            manifest.record(result['output'], fingerprints[result['output']], result)
+    if manifest is not None:
+        manifest.save()
+    drop_stale_webp(client_keys(result['output'] for result in results if result.get('changed')))
+    return results, kept, fresh
+
+
+def run_generator(jobs: List[AssetJob]):
+    """Standalone run of one generator script: build its stale jobs in-process and report them"""
+    results, kept, fresh = build(jobs, manifest=BuildManifest())
+    for result in results:
+        if 'error' in result:
+            print(f"❌ {result['output']}: {result['error']}")
+        elif result['changed']:
+            print(f"Created {result['output']}")
+        else:
+            print(f"Unchanged {result['output']}")
+    for job in kept:
+        print(f"Kept existing {job.output} (placeholder not written)")
+    if fresh:
+        print(f"{len(fresh)} assets already up to date")
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Asset Store
+=============================
+
+Keeps every version of every served image exactly once, by SHA-256, so no
+post-processing step can destroy an original again and identical files
+(placeholders shared by several asset types, repeated variants) cost their
+bytes only once.
+
+- objects are read-only files named by the hash of their content
+- refs record, per served path, the original hash, the current hash and the
+  history of derivatives (with the step that produced each one)
+- served paths are materialized as hardlinks to objects, so the served tree
+  takes no extra disk at all; files on another filesystem (or one without
+  hardlinks) fall back to copies one by one. Either way reverting or switching
+  versions is a single atomic rename
+
+Layout:
+    .asset_store/objects/ab/abcdef....png   immutable content
+    .asset_store/refs.json                  served path -> original / current / history
+    .asset_store/derivations.json           (input hash, step) -> output hash, so
+                                            re-running a step on a known input is a lookup
+
+Configuration (.env):
+    ASSET_STORE_DIR     store location (default .asset_store)
+    ASSET_STORE_MODE    hardlink (default) or copy. Hardlinked paths share the
+                        read-only object, so every writer replaces files with
+                        write_atomic instead of overwriting them in place
+
+Usage:
+    python asset_store.py ingest client/assets      # snapshot + deduplicate a tree
+    python asset_store.py revert client/assets/buildings
+    python asset_store.py status
+    python asset_store.py gc
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import stat
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from format_manifest import client_keys, drop_stale_webp
+from image_cache import write_atomic
+
+PathLike = Union[str, Path]
+
+
+def file_hash(path: PathLike) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AssetStore:
+    """Deduplicated object store with per-path version refs"""
+
+    def __init__(self, store_dir: Optional[PathLike] = None, mode: Optional[str] = None):
+        self.store_dir = Path(store_dir or os.getenv('ASSET_STORE_DIR', '.asset_store'))
+        self.objects_dir = self.store_dir / 'objects'
+        self.refs_path = self.store_dir / 'refs.json'
+        self.derivations_path = self.store_dir / 'derivations.json'
+        self.mode = mode or os.getenv('ASSET_STORE_MODE', 'hardlink')
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.refs = self._load(self.refs_path)
+        self.derivations = self._load(self.derivations_path)
+
+    @staticmethod
+    def _load(path: Path) -> Dict:
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        write_atomic(self.refs_path, json.dumps(self.refs, indent=1, sort_keys=True).encode('utf-8'))
+        write_atomic(self.derivations_path, json.dumps(self.derivations, indent=1, sort_keys=True).encode('utf-8'))
+
+    def _link_by_default(self, link: Optional[bool]) -> bool:
+        return self.mode == 'hardlink' if link is None else link
+
+    @staticmethod
+    def ref_name(path: PathLike) -> str:
+        return Path(os.path.relpath(path)).as_posix()
+
+    def object_path(self, key: str, suffix: str = '.png') -> Path:
+        return self.objects_dir / key[:2] / f"{key}{suffix}"
+
+    def find_object(self, key: str) -> Path:
+        matches = list(self.objects_dir.glob(f"{key[:2]}/{key}.*"))
+        if not matches:
+            raise KeyError(f"Object not in store: {key}")
+        return matches[0]
+
+    def put_file(self, path: PathLike) -> str:
+        """Copy a file into the store (once per unique content) and return its hash"""
+        path = Path(path)
+        key = file_hash(path)
+        target = self.object_path(key, path.suffix or '.bin')
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+            shutil.copyfile(path, tmp)
+            os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(tmp, target)
+        return key
+
+    def materialize(self, path: PathLike, key: str):
+        """Point a served path at an object, atomically"""
+        path = Path(path)
+        source = self.find_object(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.link.tmp")
+        if tmp.exists():
+            tmp.unlink()
+
+        if self.mode == 'hardlink':
+            try:
+                os.link(source, tmp)
+            except OSError:
+                # Different filesystem or no hardlink support
+                shutil.copyfile(source, tmp)
+        else:
+            shutil.copyfile(source, tmp)
+            os.chmod(tmp, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(tmp, path)
+
+    def ingest(self, path: PathLike, link: Optional[bool] = None) -> str:
+        """Snapshot a served file; its first snapshot becomes the path's original"""
+        name = self.ref_name(path)
+        key = self.put_file(path)
+        ref = self.refs.setdefault(name, {'original': key, 'current': key, 'history': []})
+
+        if ref['current'] != key:
+            # Changed outside the store since the last snapshot
+            ref['history'].append({'hash': key, 'step': 'external', 'parent': ref['current'],
+                                   'time': time.time()})
+            ref['current'] = key
+
+        if self._link_by_default(link):
+            self.materialize(path, key)
+        return key
+
+    def record(self, path: PathLike, step: str, parent: Optional[str] = None, link: Optional[bool] = None) -> str:
+        """Register a derivative just written to a served path"""
+        name = self.ref_name(path)
+        key = self.put_file(path)
+        ref = self.refs.setdefault(name, {'original': parent or key, 'current': parent or key, 'history': []})
+
+        parent = parent or ref['current']
+        if key != ref['current']:
+            ref['history'].append({'hash': key, 'step': step, 'parent': parent, 'time': time.time()})
+            ref['current'] = key
+        self.derivations[f"{parent}:{step}"] = key
+
+        if self._link_by_default(link):
+            self.materialize(path, key)
+        return key
+
+    def derived(self, parent: str, step: str) -> Optional[str]:
+        """Output hash of a step already applied to this input, if it is still stored"""
+        key = self.derivations.get(f"{parent}:{step}")
+        try:
+            return key and self.find_object(key) and key
+        except KeyError:
+            return None
+
+    def apply_derived(self, path: PathLike, parent: str, step: str) -> Optional[str]:
+        """Serve a known derivative instead of recomputing it; None when it must be computed"""
+        key = self.derived(parent, step)
+        if key is None:
+            return None
+
+        ref = self.refs[self.ref_name(path)]
+        if key != ref['current']:
+            ref['history'].append({'hash': key, 'step': step, 'parent': parent, 'time': time.time()})
+        self.checkout(path, key)
+        return key
+
+    def checkout(self, path: PathLike, key: str):
+        """Serve a specific stored version of a path"""
+        ref = self.refs[self.ref_name(path)]
+        self.materialize(path, key)
+        ref['current'] = key
+
+    def revert(self, path: PathLike) -> bool:
+        """Serve the original version again; returns False if the path is unknown"""
+        ref = self.refs.get(self.ref_name(path))
+        if ref is None:
+            return False
+        if ref['current'] != ref['original'] or not Path(path).exists() or file_hash(path) != ref['original']:
+            self.checkout(path, ref['original'])
+        return True
+
+    def paths_under(self, roots: Iterable[PathLike]) -> List[str]:
+        """Known served paths at or below any of the given roots"""
+        prefixes = [self.ref_name(root) for root in roots]
+        return sorted(name for name in self.refs
+                      if any(name == prefix or name.startswith(prefix.rstrip('/') + '/') for prefix in prefixes))
+
+    def referenced(self) -> set:
+        keys = set()
+        for ref in self.refs.values():
+            keys.update((ref['original'], ref['current']))
+            keys.update(entry['hash'] for entry in ref['history'])
+        return keys
+
+    def gc(self, keep_history: bool = True) -> int:
+        """Delete objects no ref points at; returns bytes freed"""
+        if not keep_history:
+            for ref in self.refs.values():
+                ref['history'] = [entry for entry in ref['history'] if entry['hash'] == ref['current']]
+
+        keys = self.referenced()
+        self.derivations = {source: key for source, key in self.derivations.items()
+                            if key in keys and source.split(':')[0] in keys}
+        freed = 0
+        for path in self.objects_dir.glob('*/*'):
+            if path.name.split('.')[0] not in keys:
+                freed += path.stat().st_size
+                path.unlink()
+        return freed
+
+    def stats(self) -> Dict[str, int]:
+        """Store size versus what the served paths would take without deduplication"""
+        sizes = {path.name.split('.')[0]: path.stat().st_size for path in self.objects_dir.glob('*/*')}
+        return {
+            'paths': len(self.refs),
+            'objects': len(sizes),
+            'store_bytes': sum(sizes.values()),
+            'served_bytes': sum(sizes.get(ref['current'], 0) for ref in self.refs.values()),
+            'all_versions_bytes': sum(sizes.get(key, 0) for ref in self.refs.values()
+                                      for key in {ref['original'], ref['current'],
+                                                  *(entry['hash'] for entry in ref['history'])}),
+        }
+
+
+def iter_files(roots: Iterable[PathLike], pattern: str = '*.png') -> List[Path]:
+    files = []
+    for root in map(Path, roots):
+        files.extend([root] if root.is_file() else root.rglob(pattern))
+    return sorted(path for path in files if not path.name.startswith('.'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed store for game assets")
+    parser.add_argument('command', choices=('ingest', 'revert', 'status', 'gc'))
+    parser.add_argument('paths', nargs='*', default=['client/assets'])
+    parser.add_argument('--copy', action='store_true', help="materialize writable copies instead of hardlinks")
+    parser.add_argument('--drop-history', action='store_true', help="gc: also drop superseded derivatives")
+    args = parser.parse_args()
+
+    store = AssetStore(mode='copy' if args.copy else None)
+
+    if args.command == 'ingest':
+        files = iter_files(args.paths)
+        for path in files:
+            store.ingest(path)
+        store.save()
+        print(f"✅ Snapshotted {len(files)} files")
+
+    elif args.command == 'revert':
+        names = store.paths_under(args.paths)
+        for name in names:
+            store.revert(name)
+            print(f"Reverted: {name}")
+        store.save()
+        drop_stale_webp(client_keys(map(Path, names)))
+        print(f"✅ Reverted {len(names)} files to their originals")
+
+    elif args.command == 'gc':
+        freed = store.gc(keep_history=not args.drop_history)
+        store.save()
+        print(f"🧹 Freed {freed / 1e6:.1f} MB")
+
+    stats = store.stats()
+    print(f"📦 {stats['paths']} paths -> {stats['objects']} objects, "
+          f"{stats['store_bytes'] / 1e6:.1f} MB stored for {stats['all_versions_bytes'] / 1e6:.1f} MB of versions "
+          f"({stats['served_bytes'] / 1e6:.1f} MB currently served)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Batch Post-Processor
+====================
+
+Runs image post-processing steps over ``client/assets`` on a process pool
+(one worker per core) and only touches images that changed since the last run.
+
+A sidecar manifest (``.postprocess_manifest.json`` in the processed root)
+records, for every output, the hash of the pipeline configuration and the
+hash, size and mtime of the file that was written. On the next run:
+
+- size + mtime + configuration unchanged    skipped without reading the file
+- stat changed but content hash unchanged   manifest refreshed, no work
+- anything else (new image, new config)     processed
+
+so a no-op re-run over the whole tree only costs a directory walk.
+
+Every input is snapshotted into the asset store (asset_store.py) before it is
+overwritten, and outputs are recorded as derivatives of it. An input the store
+has already processed with the same configuration (e.g. after a revert) is
+served from the store instead of being recomputed.
+
+Rules map path patterns (relative to the root) to a list of steps; images
+matching no rule are never read.
+
+Usage:
+    python batch_postprocess.py                  # client/assets, default rules
+    python batch_postprocess.py --dry-run        # list what would be processed
+    python batch_postprocess.py --force --workers 4
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+from fnmatch import fnmatch
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from asset_store import AssetStore
+from background_key import remove_background
+from image_cache import cache_key, write_atomic
+from format_manifest import drop_stale_webp
+
+ASSETS_PATH = Path("client/assets")
+MANIFEST_NAME = '.postprocess_manifest.json'
+
+# Step name -> function(rgba array, **options) -> rgba array
+STEPS: Dict[str, Callable[..., np.ndarray]] = {
+    'key': remove_background,
+}
+
+KEY_BACKGROUND = [('key', {'mode': 'flood', 'color': [255, 255, 255], 'threshold': 24.0, 'softness': 16.0})]
+
+# (pattern relative to the root, steps); the first matching rule wins, None means leave alone
+DEFAULT_RULES: List[Tuple[str, Optional[List[Tuple[str, Dict]]]]] = [
+    ('world_builder/terrain/*', None),
+    # Packed town building sheets are drawn transparent and must keep their layout
+    ('buildings/town/*', None),
+    ('buildings/*.png', KEY_BACKGROUND),
+    ('world_builder/*.png', KEY_BACKGROUND),
+]
+
+PNG_COMPRESS_LEVEL = 3
+
+
+def config_key(steps: List[Tuple[str, Dict]]) -> str:
+    """Stable hash of a pipeline configuration"""
+    return cache_key({'steps': [[name, options] for name, options in steps]})
+
+
+def steps_for(relative: str, rules) -> Optional[List[Tuple[str, Dict]]]:
+    for pattern, steps in rules:
+        if fnmatch(relative, pattern):
+            return steps
+    return None
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def run_pipeline(job: Tuple[str, List[Tuple[str, Dict]]]) -> Dict:
+    """Apply every step to one image and rewrite it if anything changed (pool worker)"""
+    path, steps = job
+    path = Path(path)
+    data = path.read_bytes()
+    input_hash = file_digest(data)
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            original = np.asarray(img.convert('RGBA'))
+
+        pixels = original
+        for name, options in steps:
+            pixels = STEPS[name](pixels, **options)
+    except (OSError, ValueError) as e:
+        stat = path.stat()
+        return {'path': str(path), 'error': str(e), 'changed': False, 'input_hash': input_hash,
+                'output_hash': input_hash, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    changed = pixels.shape != original.shape or not np.array_equal(pixels, original)
+    if changed:
+        buffer = io.BytesIO()
+        Image.fromarray(pixels, 'RGBA').save(buffer, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
+        data = buffer.getvalue()
+        write_atomic(path, data)
+
+    stat = path.stat()
+    return {'path': str(path), 'changed': changed, 'input_hash': input_hash,
+            'output_hash': file_digest(data), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class BatchPostProcessor:
+    """Incremental, parallel post-processing of an asset tree"""
+
+    def __init__(self, root: Path = ASSETS_PATH, rules=None, workers: Optional[int] = None,
+                 manifest_path: Optional[Path] = None, store: Optional[AssetStore] = None):
+        self.root = Path(root)
+        self.store = store
+        self.rules = rules if rules is not None else DEFAULT_RULES
+        self.workers = workers or os.cpu_count() or 1
+        self.manifest_path = Path(manifest_path) if manifest_path else self.root / MANIFEST_NAME
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        try:
+            return json.loads(self.manifest_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self):
+        data = json.dumps(self.manifest, indent=1, sort_keys=True).encode('utf-8')
+        write_atomic(self.manifest_path, data)
+
+    def scan(self, force: bool = False) -> Tuple[List[Tuple[str, List]], int]:
+        """Return (jobs, skipped) for every image whose inputs changed"""
+        jobs = []
+        skipped = 0
+
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.endswith('.png') or filename.startswith('.'):
+                    continue
+
+                path = Path(directory) / filename
+                relative = path.relative_to(self.root).as_posix()
+                steps = steps_for(relative, self.rules)
+                if not steps:
+                    continue
+
+                entry = self.manifest.get(relative)
+                config = config_key(steps)
+                if not force and entry and entry['config'] == config:
+                    stat = path.stat()
+                    if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']:
+                        skipped += 1
+                        continue
+                    # Touched but identical (e.g. checkout): refresh the stat, skip the work
+                    if file_digest(path.read_bytes()) == entry['output_hash']:
+                        entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                        skipped += 1
+                        continue
+
+                jobs.append((str(path), steps))
+
+        return jobs, skipped
+
+    def run(self, force: bool = False, dry_run: bool = False) -> Dict:
+        """Process every changed image and update the manifest"""
+        start = time.perf_counter()
+        jobs, skipped = self.scan(force)
+        stats = {'processed': 0, 'rewritten': 0, 'restored': 0, 'skipped': skipped, 'errors': 0}
+
+        if dry_run:
+            for path, steps in jobs:
+                print(f"Would process: {path} ({', '.join(name for name, _ in steps)})")
+            stats['processed'] = len(jobs)
+            stats['seconds'] = time.perf_counter() - start
+            return stats
+
+        configs = {path: config_key(steps) for path, steps in jobs}
+        if self.store:
+            pending = []
+            for path, steps in jobs:
+                input_hash = self.store.ingest(path)
+                output_hash = self.store.apply_derived(path, input_hash, configs[path])
+                if output_hash is None:
+                    pending.append((path, steps))
+                    continue
+                self._update_manifest(path, configs[path], input_hash, output_hash)
+                stats['restored'] += 1
+            jobs = pending
+
+        if jobs:
+            with Pool(min(self.workers, len(jobs))) as pool:
+                for result in pool.imap_unordered(run_pipeline, jobs, chunksize=2):
+                    if self.store and 'error' not in result:
+                        self.store.record(result['path'], configs[result['path']], parent=result['input_hash'])
+
+                    # Failures are recorded too, so a broken file isn't retried until it changes
+                    relative = self._update_manifest(result['path'], configs[result['path']],
+                                                     result['input_hash'], result['output_hash'])
+
+                    if 'error' in result:
+                        self.manifest[relative]['error'] = result['error']
+                        stats['errors'] += 1
+                        print(f"❌ {result['path']}: {result['error']}")
+                        continue
+
+                    stats['processed'] += 1
+                    stats['rewritten'] += result['changed']
+
+        self.save_manifest()
+        if self.store:
+            self.store.save()
+        if stats['rewritten'] or stats['restored']:
+            drop_stale_webp()
+        stats['seconds'] = time.perf_counter() - start
+        return stats
+
+    def _update_manifest(self, path: str, config: str, input_hash: str, output_hash: str) -> str:
+        relative = Path(path).relative_to(self.root).as_posix()
+        stat = Path(path).stat()
+        self.manifest[relative] = {
+            'config': config,
+            'input_hash': input_hash,
+            'output_hash': output_hash,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+        return relative
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental parallel post-processing of game assets")
+    parser.add_argument('--root', default=str(ASSETS_PATH))
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default one per core)")
+    parser.add_argument('--force', action='store_true', help="ignore the manifest and process everything")
+    parser.add_argument('--dry-run', action='store_true', help="list what would be processed")
+    parser.add_argument('--no-store', action='store_true', help="don't snapshot inputs into the asset store")
+    args = parser.parse_args()
+
+    store = None if args.no_store else AssetStore()
+    processor = BatchPostProcessor(Path(args.root), workers=args.workers, store=store)
+    stats = processor.run(force=args.force, dry_run=args.dry_run)
+
+    print(f"\n🎉 Processed {stats['processed']} images ({stats['rewritten']} rewritten, "
+          f"{stats['restored']} restored from the store), skipped {stats['skipped']} unchanged, "
+          f"{stats['errors']} errors in {stats['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
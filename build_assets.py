@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Procedural Asset Build
+======================
+
+Builds every procedural asset declared in the generator registry
+(asset_registry.py) in one go: output conflicts between generators are
+resolved up front, then all jobs run on a process pool (one worker per core),
+so a full rebuild takes about as long as the slowest asset rather than the sum
+of every generator script run one after another.
+
+Builds are incremental (build_manifest.py): an asset is only redrawn when its
+output is missing or its generator code, parameters, seed or inputs changed,
+and ``--explain`` says which. Placeholders for art that normally comes from
+the image API are only drawn when the file is missing, unless ``--overwrite``
+is given.
+
+Usage:
+    python build_assets.py                         # build what changed
+    python build_assets.py --explain               # ... and say why each asset was rebuilt
+    python build_assets.py --list --explain        # what would be rebuilt, no drawing
+    python build_assets.py --force                 # rebuild everything
+    python build_assets.py --only 'client/assets/tiles/*' --workers 2
+"""
+
+import argparse
+import os
+import time
+from fnmatch import fnmatch
+
+from asset_registry import build, collect_jobs, plan, resolve_conflicts
+from build_manifest import BuildManifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build all procedural assets in parallel")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default one per core)")
+    parser.add_argument('--only', action='append', default=[], metavar='PATTERN',
+                        help="only outputs matching this glob (repeatable)")
+    parser.add_argument('--overwrite', action='store_true', help="also replace existing files with placeholders")
+    parser.add_argument('--list', action='store_true', help="show jobs and conflicts without building")
+    parser.add_argument('--explain', action='store_true', help="say why each asset is (or would be) rebuilt")
+    parser.add_argument('--force', action='store_true', help="rebuild every asset, ignoring the build manifest")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = BuildManifest()
+
+    jobs, conflicts = resolve_conflicts(collect_jobs())
+    if args.only:
+        jobs = [job for job in jobs if any(fnmatch(job.output, pattern) for pattern in args.only)]
+
+    for output, ranked in sorted(conflicts.items()):
+        print(f"⚠️  {output}: {ranked[0].generator} wins over "
+              f"{', '.join(job.generator for job in ranked[1:])}")
+
+    if args.list:
+        todo, kept, _ = plan(jobs, manifest, overwrite=args.overwrite, force=args.force)
+        stale = {job.output: reasons for job, reasons in todo}
+        for job in sorted(jobs, key=lambda job: job.output):
+            state = '' if job.output in stale else ', up to date'
+            print(f"{job.output}  ({job.generator}{', placeholder' if job.fallback else ''}{state})")
+            if args.explain and job.output in stale:
+                print(f"    {'; '.join(stale[job.output])}")
+        print(f"\n{len(jobs)} jobs, {len(todo)} to build, {len(kept)} placeholders kept, "
+              f"{len(conflicts)} conflicting outputs")
+        return
+
+    results, kept, fresh = build(jobs, workers=args.workers or os.cpu_count() or 1, overwrite=args.overwrite,
+                                 manifest=manifest, force=args.force)
+    elapsed = time.perf_counter() - start
+
+    if results:
+        print()
+    for result in sorted(results, key=lambda result: result['seconds'], reverse=True):
+        if 'error' in result:
+            print(f"❌ {result['output']} ({result['generator']}): {result['error']}")
+            continue
+        unchanged = '' if result['changed'] else '  (same bytes, not rewritten)'
+        print(f"{result['seconds'] * 1000:8.1f} ms  {result['output']}  ({result['generator']}){unchanged}")
+        if args.explain:
+            print(f"             {'; '.join(result['reasons'])}")
+
+    built = [result for result in results if 'error' not in result]
+    rewritten = sum(result['changed'] for result in built)
+    slowest = max((result['seconds'] for result in results), default=0.0)
+    total = sum(result['seconds'] for result in results)
+    print(f"\n🎉 Built {len(built)} assets ({rewritten} rewritten), {len(fresh)} up to date, "
+          f"kept {len(kept)} existing files instead of placeholders, {len(results) - len(built)} errors")
+    print(f"⏱️  {elapsed:.2f}s wall for {total:.2f}s of drawing (slowest asset {slowest:.2f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Incremental Build Manifest
+==========================
+
+Make-style staleness checks for the procedural asset build (asset_registry.py).
+Every output written by the build is recorded in
+``client/assets/.build_manifest.json`` with a fingerprint of everything that
+went into it:
+
+- code      SHA-256 of the generator script and of every local module it uses
+            (pixel_effects.py, asset_seed.py, ...), followed transitively
+- build     the drawing function
+- args      hash of the job's arguments (names, sizes, colours, prompts)
+- seed      the project seed (ASSET_SEED)
+- inputs    SHA-256 of every upstream file the job reads
+
+On the next build a job only runs when its output is missing or some part of
+its fingerprint changed, and the reasons are available for ``--explain``.
+A job that does run but draws the same bytes leaves the file alone, so mtimes
+stay put and downstream stages (batch_postprocess.py, png_optimize.py) keep
+skipping it.
+
+Checking is cheap: source and input hashes are computed once per file, inputs
+are re-read only when their size or mtime changed, and outputs are only
+stat'ed, so a no-change build of the whole tree is dominated by importing the
+generator scripts.
+"""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, List, Optional
+
+from asset_seed import PROJECT_SEED
+from image_cache import write_atomic
+
+BUILD_MANIFEST_PATH = Path("client/assets/.build_manifest.json")
+
+# Modules whose source lives here count as generator code; everything else (PIL, numpy) doesn't
+SOURCE_ROOT = Path(__file__).resolve().parent
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def local_module(value) -> Optional[ModuleType]:
+    """The repo module a global refers to (a module or something defined in one), if any"""
+    module = value if isinstance(value, ModuleType) else sys.modules.get(getattr(value, '__module__', None) or '')
+    path = getattr(module, '__file__', None)
+    if path and Path(path).resolve().parent == SOURCE_ROOT:
+        return module
+    return None
+
+
+class BuildManifest:
+    """Fingerprints of built assets and why a job is stale"""
+
+    def __init__(self, path: Path = BUILD_MANIFEST_PATH):
+        self.path = Path(path)
+        self.entries = self._load()
+        self._source_hashes: Dict[str, str] = {}
+        self._code: Dict[str, Dict[str, str]] = {}
+        self._fingerprints: Dict[str, Dict] = {}
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            return json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.path, json.dumps(self.entries, indent=1, sort_keys=True).encode('utf-8'))
+
+    def _source_hash(self, path: str) -> str:
+        if path not in self._source_hashes:
+            self._source_hashes[path] = file_digest(Path(path).read_bytes())
+        return self._source_hashes[path]
+
+    def code_hashes(self, module: ModuleType) -> Dict[str, str]:
+        """Source hash of a module and every local module it uses, by file name"""
+        if module.__name__ in self._code:
+            return self._code[module.__name__]
+
+        hashes = {}
+        pending = [module]
+        seen = set()
+        while pending:
+            current = pending.pop()
+            if current.__name__ in seen:
+                continue
+            seen.add(current.__name__)
+            hashes[Path(current.__file__).name] = self._source_hash(current.__file__)
+            for value in list(vars(current).values()):
+                dependency = local_module(value)
+                if dependency is not None and dependency.__name__ not in seen:
+                    pending.append(dependency)
+
+        self._code[module.__name__] = hashes
+        return hashes
+
+    def input_hashes(self, output: str, inputs) -> Dict[str, Dict]:
+        """Hash, size and mtime of each upstream file (unchanged stats reuse the recorded hash)"""
+        recorded = self.entries.get(output, {}).get('inputs', {})
+        hashes = {}
+        for name in inputs:
+            if not Path(name).exists():
+                hashes[name] = {'sha256': None, 'size': None, 'mtime_ns': None}
+                continue
+            stat = Path(name).stat()
+            previous = recorded.get(name)
+            if previous and previous['size'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns:
+                hashes[name] = previous
+            else:
+                hashes[name] = {'sha256': file_digest(Path(name).read_bytes()),
+                                'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        return hashes
+
+    def fingerprint(self, job) -> Dict:
+        """Everything that decides the bytes of a job's output"""
+        if job.output in self._fingerprints:
+            return self._fingerprints[job.output]
+        self._fingerprints[job.output] = {
+            'build': f"{Path(sys.modules[job.build.__module__].__file__).stem}.{job.build.__qualname__}",
+            'args': file_digest(repr(job.args).encode('utf-8')),
+            'seed': PROJECT_SEED,
+            'code': self.code_hashes(sys.modules[job.build.__module__]),
+            'inputs': self.input_hashes(job.output, job.inputs),
+        }
+        return self._fingerprints[job.output]
+
+    def stale_reasons(self, job, fingerprint: Dict) -> List[str]:
+        """Why a job has to run; empty when its output is up to date"""
+        entry = self.entries.get(job.output)
+        if not Path(job.output).exists():
+            return ["output missing"]
+        if entry is None:
+            return ["no build record"]
+
+        reasons = []
+        if entry.get('build') != fingerprint['build']:
+            reasons.append(f"drawn by {fingerprint['build']} instead of {entry.get('build')}")
+        elif entry.get('args') != fingerprint['args']:
+            reasons.append("parameters changed")
+        if entry.get('seed') != fingerprint['seed']:
+            reasons.append(f"project seed changed ({entry.get('seed')} -> {fingerprint['seed']})")
+
+        code = entry.get('code', {})
+        for name, digest in sorted(fingerprint['code'].items()):
+            if name not in code:
+                reasons.append(f"now uses {name}")
+            elif code[name] != digest:
+                reasons.append(f"{name} changed")
+
+        inputs = entry.get('inputs', {})
+        for name, state in sorted(fingerprint['inputs'].items()):
+            if name not in inputs:
+                reasons.append(f"new input {name}")
+            elif state['sha256'] is None:
+                reasons.append(f"input {name} missing")
+            elif inputs[name]['sha256'] != state['sha256']:
+                reasons.append(f"input {name} changed")
+        return reasons
+
+    def is_own_output(self, output: str) -> bool:
+        """Whether a file is still exactly what the build last wrote there"""
+        entry = self.entries.get(output)
+        if entry is None:
+            return False
+        stat = Path(output).stat()
+        if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']:
+            return True
+        return file_digest(Path(output).read_bytes()) == entry['sha256']
+
+    def seconds(self, output: str) -> float:
+        """Drawing time recorded last build (unknown jobs sort as slowest)"""
+        return self.entries.get(output, {}).get('seconds', float('inf'))
+
+    def record(self, output: str, fingerprint: Dict, result: Dict):
+        stat = Path(output).stat()
+        self.entries[output] = dict(fingerprint, sha256=result['sha256'], size=stat.st_size,
+                                    mtime_ns=stat.st_mtime_ns, seconds=round(result['seconds'], 4))
+
+    def forget(self, output: str):
+        self.entries.pop(output, None)
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Building Parts
+==============
+
+Town building sprites assembled from a parts atlas instead of drawn from
+scratch. Every part (a wall material, a roof style, a door or window kind, a
+sign, a chimney) is drawn once per look and scale onto one in-memory RGBA
+sheet, the PartsAtlas. A building is a BuildingLayout, a plain declarative
+description (size, wall material, roof style, door and window kinds, window
+count, sign, ornaments), and compose() assembles it by alpha-blitting parts
+from the sheet with floor_tiling.stamp:
+
+- walls      one period of a material pattern (stone, brick, wood, plaster),
+             tiled over the wall and outlined at compose time
+- roofs      gable, tiled gable, hip or flat
+- doors      single, double or arched, with handles
+- windows    cross, arched, shuttered or round
+- signs      a board above the door, optionally hanging from a bracket
+- ornaments  chimney, crest on the roof peak
+
+Roofs and doors are stored as grey tone maps (which shade of the colour each
+pixel takes) and coloured at compose time, keyed only by style and a size
+snapped to ROOF_STEP / DOOR_STEP. So a town of thousands of buildings needs a
+few dozen roof and door slots instead of one per colour and exact size.
+
+Layouts are in 1x pixels; an atlas draws its parts at an integer scale, so
+the same layout composes crisply at 1x, 2x or 3x. Once the parts a town uses
+are in the atlas, composing a building is a handful of array blits, so
+hundreds of distinct buildings take well under a second.
+
+Usage:
+    atlas = PartsAtlas(scale=2)
+    layout = BuildingLayout(64, 48, wall='brick', wall_color=(160, 140, 100), roof='gable',
+                            roof_color=(120, 80, 60), windows=2)
+    image = to_image(compose(layout, atlas))
+"""
+
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from asset_seed import asset_rng
+from floor_tiling import stamp, tile_floor, to_image
+
+Color = Tuple[int, int, int]
+
+OUTLINE = (0, 0, 0)
+GLASS = (100, 150, 255)
+
+
+class BuildingLayout(NamedTuple):
+    """Declarative description of one building, in 1x pixels"""
+    width: int
+    height: int
+    wall: str                                # a WALLS material
+    wall_color: Color
+    roof: str                                # a ROOFS style
+    roof_color: Color
+    door: str = 'single'                     # a DOORS kind
+    door_size: Tuple[int, int] = (12, 20)
+    door_color: Color = (80, 50, 30)
+    handle_color: Color = (139, 69, 19)
+    window: str = 'cross'                    # a WINDOWS kind
+    window_size: Tuple[int, int] = (8, 8)
+    windows: int = 2                         # split between both sides of the door
+    glass: Color = GLASS
+    sign: Optional[Color] = None             # board above the door
+    sign_size: Tuple[int, int] = (28, 6)
+    hanging_sign: bool = False
+    chimney: Optional[Color] = None
+    crest: Optional[Color] = None            # crystal on the roof peak
+
+
+def shade(color: Color, amount: int) -> Color:
+    return tuple(int(min(255, max(0, c + amount))) for c in color[:3])
+
+
+def canvas(width: int, height: int) -> Tuple[Image.Image, ImageDraw.ImageDraw]:
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    return img, ImageDraw.Draw(img)
+
+
+# Wall materials: one period of the pattern at a scale, tiled over any wall
+
+def stone_pattern(color: Color, scale: int) -> np.ndarray:
+    """Blocks in running bond with darker mortar"""
+    block_w, block_h = 8 * scale, 5 * scale
+    tile = np.empty((block_h * 2, block_w, 4), dtype=np.uint8)
+    tile[:] = color + (255,)
+    mortar = shade(color, -35)
+    tile[:scale, :, :3] = mortar
+    tile[block_h:block_h + scale, :, :3] = mortar
+    tile[:block_h, :scale, :3] = mortar
+    tile[block_h:, block_w // 2:block_w // 2 + scale, :3] = mortar
+    return tile
+
+
+def brick_pattern(color: Color, scale: int) -> np.ndarray:
+    """Small bricks, every other course a shade darker"""
+    tile = stone_pattern(color, scale)[:, :6 * scale]
+    tile = np.concatenate([tile[:3 * scale], tile[5 * scale:8 * scale]])
+    tile[3 * scale:, scale:, :3] = np.array(shade(color, -12))
+    tile[::3 * scale, :, :3] = shade(color, -40)
+    tile[:3 * scale, :scale, :3] = shade(color, -40)
+    tile[3 * scale:, 3 * scale:4 * scale, :3] = shade(color, -40)
+    return tile
+
+
+def wood_pattern(color: Color, scale: int) -> np.ndarray:
+    """Horizontal boards with dark seams"""
+    tile = np.empty((8 * scale, 16 * scale, 4), dtype=np.uint8)
+    tile[:] = color + (255,)
+    tile[4 * scale:, :, :3] = shade(color, 10)
+    tile[::4 * scale, :, :3] = shade(color, -30)
+    tile[:scale, :, :3] = shade(color, -30)
+    return tile
+
+
+def plaster_pattern(color: Color, scale: int) -> np.ndarray:
+    """Flat render with a few seeded blemishes"""
+    size = 16 * scale
+    tile = np.empty((size, size, 4), dtype=np.uint8)
+    tile[:] = color + (255,)
+    rng = asset_rng('buildings/plaster')
+    for x, y in rng.integers(0, 16, (6, 2)):
+        tile[y * scale:(y + 1) * scale, x * scale:(x + 1) * scale, :3] = shade(color, -15)
+    return tile
+
+
+WALLS: Dict[str, Callable[[Color, int], np.ndarray]] = {
+    'stone': stone_pattern,
+    'brick': brick_pattern,
+    'wood': wood_pattern,
+    'plaster': plaster_pattern,
+}
+
+
+def draw_wall(scale: int, material: str, color: Color) -> np.ndarray:
+    return WALLS[material](color, scale)
+
+
+def tile_wall(pattern: np.ndarray, width: int, height: int, scale: int) -> np.ndarray:
+    """A width x height wall (in scaled pixels) repeating a material pattern, with an outline"""
+    wall = tile_floor(pattern, width, height)
+    wall[:scale, :, :3] = OUTLINE
+    wall[-scale:, :, :3] = OUTLINE
+    wall[:, :scale, :3] = OUTLINE
+    wall[:, -scale:, :3] = OUTLINE
+    return wall
+
+
+# Tone maps: recolourable parts are drawn with tone indices as their grey level,
+# and TONES says what each index becomes for a given colour and accent
+
+BASE, DARK, DARKER, LIGHT, EDGE, ACCENT = range(6)
+TONES = [('color', 0), ('color', -20), ('color', -40), ('color', 25), ('outline', 0), ('accent', 0)]
+
+# Roofs snap to multiples of 8 x 4 px and doors to 2 x 4 px (1x pixels), rounding down
+ROOF_STEP = (8, 4)
+DOOR_STEP = (2, 4)
+
+
+def tone(index: int) -> Tuple[int, int, int, int]:
+    return (index, index, index, 255)
+
+
+def snap(size: Tuple[int, int], step: Tuple[int, int]) -> Tuple[int, int]:
+    return tuple(max(s, value // s * s) for value, s in zip(size, step))
+
+
+def palette(color: Color, accent: Color = OUTLINE) -> np.ndarray:
+    """The RGB of every tone for one colour"""
+    sources = {'color': color, 'outline': OUTLINE, 'accent': accent}
+    return np.array([shade(sources[source], amount) for source, amount in TONES], dtype=np.uint8)
+
+
+def colorize(part: np.ndarray, color: Color, accent: Color = OUTLINE) -> np.ndarray:
+    """A tone-map part in real colours"""
+    sprite = np.empty_like(part)
+    sprite[..., :3] = palette(color, accent)[part[..., 0]]
+    sprite[..., 3] = part[..., 3]
+    return sprite
+
+
+# Roofs, spanning the full building width
+
+def roof_outline(style: str, width: int, height: int):
+    if style == 'hip':
+        return [(0, height - 1), (width // 3, 0), (width - 1 - width // 3, 0), (width - 1, height - 1)]
+    if style == 'flat':
+        return [(0, height - 1), (0, height // 2), (width - 1, height // 2), (width - 1, height - 1)]
+    return [(0, height - 1), (width // 2, 0), (width - 1, height - 1)]
+
+
+def draw_roof(scale: int, style: str, width: int, height: int) -> Image.Image:
+    """Tone map of a roof"""
+    w, h = width * scale, height * scale
+    points = roof_outline(style, w, h)
+    img, draw = canvas(w, h)
+    draw.polygon(points, fill=tone(BASE))
+
+    if style == 'tiled':
+        # Shingle rows, offset every row, kept inside the roof shape
+        shingles = np.asarray(img).copy()
+        inside = shingles[..., 3] > 0
+        rows = np.arange(h)[:, None] // (4 * scale)
+        columns = (np.arange(w)[None, :] + rows * 4 * scale) // (8 * scale)
+        dark = ((rows + columns) % 2 == 0) & inside
+        shingles[dark, :3] = DARK
+        shingles[(np.arange(h) % (4 * scale) < scale)[:, None] & inside, :3] = DARKER
+        img = Image.fromarray(shingles, 'RGBA')
+        draw = ImageDraw.Draw(img)
+    elif style == 'flat':
+        # Parapet along the top edge
+        draw.rectangle([0, h // 2, w - 1, h // 2 + 2 * scale], fill=tone(LIGHT))
+
+    draw.line(points + [points[0]], fill=tone(EDGE), width=scale)
+    return img
+
+
+# Doors, windows and signs
+
+def draw_door(scale: int, kind: str, width: int, height: int) -> Image.Image:
+    """Tone map of a door; the handle takes the accent colour"""
+    w, h = width * scale, height * scale
+    img, draw = canvas(w, h)
+    color, frame, handle = tone(BASE), tone(DARK), tone(ACCENT)
+    knob = 2 * scale
+    middle = h // 2
+
+    if kind == 'double':
+        half = w // 2
+        draw.rectangle([0, 0, half - scale, h - 1], fill=color, outline=frame, width=scale)
+        draw.rectangle([half + scale, 0, w - 1, h - 1], fill=color, outline=frame, width=scale)
+        draw.ellipse([3 * scale, middle - scale, 3 * scale + knob, middle + scale], fill=handle)
+        draw.ellipse([w - 5 * scale, middle - scale, w - 5 * scale + knob, middle + scale], fill=handle)
+        return img
+
+    if kind == 'arched':
+        draw.ellipse([0, 0, w - 1, w - 1], fill=color, outline=frame, width=scale)
+        draw.rectangle([0, w // 2, w - 1, h - 1], fill=color, outline=frame, width=scale)
+        draw.rectangle([scale, w // 2 - scale, w - 1 - scale, w // 2 + scale], fill=color)
+    else:
+        draw.rectangle([0, 0, w - 1, h - 1], fill=color, outline=frame, width=scale)
+    draw.ellipse([w - 4 * scale, middle - scale, w - 4 * scale + knob, middle + scale], fill=handle)
+    return img
+
+
+def draw_window(scale: int, kind: str, glass: Color, width: int, height: int) -> Image.Image:
+    w, h = width * scale, height * scale
+    if kind == 'shuttered':
+        # Shutters either side, each half the window wide
+        img, draw = canvas(w * 2, h)
+        shutter = (90, 60, 35)
+        draw.rectangle([0, 0, w // 2 - 1, h - 1], fill=shutter, outline=OUTLINE, width=scale)
+        draw.rectangle([w * 3 // 2, 0, w * 2 - 1, h - 1], fill=shutter, outline=OUTLINE, width=scale)
+        draw.rectangle([w // 2, 0, w * 3 // 2 - 1, h - 1], fill=glass, outline=OUTLINE, width=scale)
+        draw.line([(w, 0), (w, h - 1)], fill=OUTLINE, width=scale)
+        return img
+
+    img, draw = canvas(w, h)
+    if kind == 'round':
+        draw.ellipse([0, 0, w - 1, h - 1], fill=glass, outline=OUTLINE, width=scale)
+    elif kind == 'arched':
+        draw.ellipse([0, 0, w - 1, w - 1], fill=glass, outline=OUTLINE, width=scale)
+        draw.rectangle([0, w // 2, w - 1, h - 1], fill=glass, outline=OUTLINE, width=scale)
+        draw.rectangle([scale, w // 2 - scale, w - 1 - scale, w // 2 + scale], fill=glass)
+        return img
+    else:
+        draw.rectangle([0, 0, w - 1, h - 1], fill=glass, outline=OUTLINE, width=scale)
+    draw.line([(w // 2, 0), (w // 2, h - 1)], fill=OUTLINE, width=scale)
+    draw.line([(0, h // 2), (w - 1, h // 2)], fill=OUTLINE, width=scale)
+    return img
+
+
+def draw_sign(scale: int, color: Color, width: int, height: int, hanging: bool) -> Image.Image:
+    w, h = width * scale, height * scale
+    drop = 3 * scale if hanging else 0
+    img, draw = canvas(w, h + drop)
+    if hanging:
+        draw.line([(w // 4, 0), (w // 4, drop)], fill=OUTLINE, width=scale)
+        draw.line([(w * 3 // 4, 0), (w * 3 // 4, drop)], fill=OUTLINE, width=scale)
+    draw.rectangle([0, drop, w - 1, drop + h - 1], fill=color, outline=OUTLINE, width=scale)
+    return img
+
+
+def draw_chimney(scale: int, color: Color) -> Image.Image:
+    img, draw = canvas(6 * scale, 12 * scale)
+    draw.rectangle([0, 2 * scale, 6 * scale - 1, 12 * scale - 1], fill=color, outline=OUTLINE, width=scale)
+    draw.rectangle([0, 0, 6 * scale - 1, 3 * scale - 1], fill=shade(color, -30), outline=OUTLINE, width=scale)
+    return img
+
+
+def draw_crest(scale: int, color: Color) -> Image.Image:
+    size = 5 * scale
+    img, draw = canvas(size, size)
+    draw.polygon([(size // 2, 0), (0, size - 1), (size - 1, size - 1)], fill=color, outline=OUTLINE)
+    return img
+
+
+DRAWERS: Dict[str, Callable] = {
+    'wall': draw_wall,
+    'roof': draw_roof,
+    'door': draw_door,
+    'window': draw_window,
+    'sign': draw_sign,
+    'chimney': draw_chimney,
+    'crest': draw_crest,
+}
+
+ROOFS = ('gable', 'tiled', 'hip', 'flat')
+DOORS = ('single', 'double', 'arched')
+WINDOWS = ('cross', 'arched', 'shuttered', 'round')
+
+
+class PartsAtlas:
+    """Every part drawn once at one scale and packed onto one sheet, row by row"""
+
+    def __init__(self, scale: int = 1, width: int = 1024):
+        self.scale = scale
+        self.sheet = np.zeros((256, width, 4), dtype=np.uint8)
+        self.slots: Dict[Tuple, Tuple[int, int, int, int]] = {}
+        self._x = self._y = self._row = 0
+
+    def wall(self, material: str, color: Color, width: int, height: int) -> np.ndarray:
+        """An outlined wall of width x height 1x pixels, tiled from the cached material pattern"""
+        return tile_wall(self.part('wall', material, color), width * self.scale, height * self.scale, self.scale)
+
+    def roof(self, style: str, color: Color, width: int, height: int) -> np.ndarray:
+        """A coloured roof from the shape cached for its style and snapped size"""
+        return colorize(self.part('roof', style, *snap((width, height), ROOF_STEP)), color)
+
+    def door(self, kind: str, color: Color, handle: Color, width: int, height: int) -> np.ndarray:
+        """A coloured door from the shape cached for its kind and snapped size"""
+        return colorize(self.part('door', kind, *snap((width, height), DOOR_STEP)), color, handle)
+
+    def part(self, kind: str, *args) -> np.ndarray:
+        """A part's pixels on the sheet, drawing and packing it the first time it is asked for"""
+        key = (kind,) + args
+        if key not in self.slots:
+            self.slots[key] = self._pack(np.asarray(DRAWERS[kind](self.scale, *args)))
+        x, y, width, height = self.slots[key]
+        return self.sheet[y:y + height, x:x + width]
+
+    def _pack(self, pixels: np.ndarray) -> Tuple[int, int, int, int]:
+        height, width = pixels.shape[:2]
+        if width > self.sheet.shape[1]:
+            self.sheet = np.pad(self.sheet, ((0, 0), (0, width - self.sheet.shape[1]), (0, 0)))
+        if self._x + width > self.sheet.shape[1]:
+            self._x, self._y, self._row = 0, self._y + self._row, 0
+        if self._y + height > self.sheet.shape[0]:
+            grow = max(self.sheet.shape[0], self._y + height - self.sheet.shape[0])
+            self.sheet = np.pad(self.sheet, ((0, grow), (0, 0), (0, 0)))
+        self.sheet[self._y:self._y + height, self._x:self._x + width] = pixels
+        slot = (self._x, self._y, width, height)
+        self._x += width
+        self._row = max(self._row, height)
+        return slot
+
+    def image(self) -> Image.Image:
+        """The sheet so far, cropped to the packed rows"""
+        return to_image(self.sheet[:self._y + self._row])
+
+
+def window_positions(layout: BuildingLayout, window_width: int) -> list:
+    """Left edges of the windows, spread evenly over the wall either side of the door and its sign"""
+    middle = max(layout.door_size[0], layout.sign_size[0] if layout.sign is not None else 0)
+    left, right = (layout.width - middle) // 2, (layout.width + middle) // 2
+    left_count = (layout.windows + 1) // 2
+    right_count = layout.windows // 2
+    positions = []
+    for start, end, count in ((0, left, left_count), (right, layout.width, right_count)):
+        if count:
+            gap = (end - start - count * window_width) / (count + 1)
+            positions += [int(start + gap + i * (window_width + gap)) for i in range(count)]
+    return positions
+
+
+def compose(layout: BuildingLayout, atlas: PartsAtlas) -> np.ndarray:
+    """Assemble a building sprite (height x width x 4 at the atlas scale) from atlas parts"""
+    s = atlas.scale
+    width, height = layout.width, layout.height
+    # The roof snaps to its cached size; it is centred over the wall and overlaps its top row
+    roof = atlas.roof(layout.roof, layout.roof_color, width, height // 3 + 1)
+    roof_width, roof_height = roof.shape[1] // s, roof.shape[0] // s - 1
+    wall_height = height - roof_height
+    sprite = np.zeros((height * s, width * s, 4), dtype=np.uint8)
+
+    # Chimney first, so the roof covers its foot
+    if layout.chimney is not None:
+        stamp(sprite, atlas.part('chimney', layout.chimney), width * 3 // 4 * s, max(roof_height // 3 - 4, 0) * s)
+    stamp(sprite, atlas.wall(layout.wall, layout.wall_color, width, wall_height), 0, roof_height * s)
+    stamp(sprite, roof, (width - roof_width) // 2 * s, 0)
+    if layout.crest is not None:
+        stamp(sprite, atlas.part('crest', layout.crest), (width // 2 - 2) * s, 0)
+
+    door = atlas.door(layout.door, layout.door_color, layout.handle_color, *layout.door_size)
+    door_w, door_h = door.shape[1] // s, door.shape[0] // s
+    door_x, door_y = (width - door_w) // 2, height - door_h
+    stamp(sprite, door, door_x * s, door_y * s)
+
+    window_w, window_h = layout.window_size
+    window = atlas.part('window', layout.window, layout.glass, window_w, window_h)
+    span = window.shape[1] // s
+    window_y = roof_height + max(4, (wall_height - door_h) // 3)
+    for x in window_positions(layout._replace(door_size=(door_w, door_h)), span):
+        stamp(sprite, window, x * s, window_y * s)
+
+    if layout.sign is not None:
+        sign_w, sign_h = layout.sign_size
+        sign = atlas.part('sign', layout.sign, sign_w, sign_h, layout.hanging_sign)
+        stamp(sprite, sign, (width - sign_w) // 2 * s, door_y * s - sign.shape[0] - 4 * s)
+
+    return sprite
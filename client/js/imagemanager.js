@@ -6,6 +6,25 @@ class ImageManager {
         this.totalImages = 0;
         this.loadedImages = 0;
         
+        // Canvas size and offset of sprites cropped by sprite_trim.py, keyed by path
+        this.trims = {};
+        
+        // Byte size of each available format per image from png_optimize.py, keyed by path
+        this.formats = {};
+        this.supportsWebP = document.createElement('canvas').toDataURL('image/webp').startsWith('data:image/webp');
+        
+        // Frame layout and timing of animation strips from generate_animations.py, keyed by path
+        this.animations = {};
+        
+        // Packed sheet per scale and rect per building of generate_town_buildings.py's random town
+        this.town = null;
+        
+        // Cell size of images holding a grid of variants, keyed by image. Tree species and
+        // their variant strips are registered from generate_quality_trees.py's manifest
+        this.atlases = {
+            'grass_variants': 32
+        };
+        
         // Define all game images
         this.imageDefinitions = {
             // Ground tiles
@@ -13,18 +32,17 @@ class ImageManager {
             'grass1': 'assets/tiles/grass1.png',
             'grass2': 'assets/tiles/grass2.png',
             'grass3': 'assets/tiles/grass3.png',
+            'grass_variants': 'assets/tiles/grass_variants.png',
             'dirt': 'assets/tiles/dirt.png',
             'path': 'assets/tiles/path.png',
             'stone': 'assets/tiles/stone.png',
             'water': 'assets/tiles/water.png',
             'sand': 'assets/tiles/sand.png',
             'mud': 'assets/tiles/mud.png',
+            'water_anim': 'assets/tiles/water_anim.png',
+            'lava_anim': 'assets/tiles/lava_anim.png',
             
-            // Trees and resources
-            'tree_oak': 'assets/resources/tree_oak.png',
-            'tree_willow': 'assets/resources/tree_willow.png',
-            'tree_maple': 'assets/resources/tree_maple.png',
-            'tree_yew': 'assets/resources/tree_yew.png',
+            // Trees (tree_<species> and tree_<species>_variants come from the tree manifest) and resources
             'stump': 'assets/resources/stump.png',
             
             // Mining rocks
@@ -57,6 +75,7 @@ class ImageManager {
             
             // Effects
             'fire': 'assets/effects/fire.png',
+            'fire_anim': 'assets/effects/fire_anim.png',
             
             // Buildings
             'bank': 'assets/buildings/bank.png',
@@ -77,6 +96,8 @@ class ImageManager {
     async loadAllImages() {
         console.log('Starting image loading...');
         
+        await Promise.all([this.loadTrimManifest(), this.loadFormatManifest(), this.loadAnimationManifest(),
+                           this.loadTreeManifest(), this.loadTownManifest()]);
         this.totalImages = Object.keys(this.imageDefinitions).length;
         const loadPromises = [];
 
@@ -95,9 +116,82 @@ class ImageManager {
         }
     }
 
+    async loadTrimManifest() {
+        try {
+            const response = await fetch('assets/trim_manifest.json');
+            if (response.ok) {
+                this.trims = await response.json();
+            }
+        } catch (error) {
+            // No manifest: every image is drawn as a full canvas
+        }
+    }
+
+    async loadFormatManifest() {
+        try {
+            const response = await fetch('assets/format_manifest.json');
+            if (response.ok) {
+                this.formats = await response.json();
+            }
+        } catch (error) {
+            // No manifest: every image is loaded as PNG
+        }
+    }
+
+    async loadAnimationManifest() {
+        try {
+            const response = await fetch('assets/animation_manifest.json');
+            if (response.ok) {
+                this.animations = await response.json();
+            }
+        } catch (error) {
+            // No manifest: animation strips are never used
+        }
+    }
+
+    async loadTreeManifest() {
+        try {
+            const response = await fetch('assets/resources/tree_manifest.json');
+            if (response.ok) {
+                const species = await response.json();
+                for (const [name, tree] of Object.entries(species)) {
+                    this.imageDefinitions[`tree_${name}`] = tree.sprite;
+                    this.imageDefinitions[`tree_${name}_variants`] = tree.variants;
+                    this.atlases[`tree_${name}_variants`] = tree.cell;
+                }
+            }
+        } catch (error) {
+            // No manifest: trees are drawn as emoji
+        }
+    }
+
+    async loadTownManifest() {
+        try {
+            const response = await fetch('assets/buildings/town/town_manifest.json');
+            if (response.ok) {
+                this.town = await response.json();
+            }
+        } catch (error) {
+            // No manifest: there are no random town buildings to draw
+        }
+    }
+
+    sourceFor(path) {
+        // Lossless WebP siblings decode to the same pixels, so trims still apply. A sibling is only
+        // used when it was made from the PNG the trim manifest describes; a rewritten PNG wins
+        const formats = this.formats[path];
+        const trim = this.trims[path];
+        if (this.supportsWebP && formats && formats.webp && formats.sha256 &&
+                (!trim || trim.sha256 === formats.sha256)) {
+            return path.replace(/\.png$/, '.webp');
+        }
+        return path;
+    }
+
     loadImage(key, path) {
         return new Promise((resolve, reject) => {
             const img = new Image();
+            img.trimKey = path;
             
             img.onload = () => {
                 this.images.set(key, img);
@@ -124,6 +218,11 @@ class ImageManager {
                     'tree_willow': '#90EE90',
                     'tree_maple': '#FF6347',
                     'tree_yew': '#2F4F4F',
+                    'tree_normal': '#228B22',
+                    'tree_magic': '#9932CC',
+                    'tree_palm': '#32CD32',
+                    'tree_dead': '#696969',
+                    'tree_pine': '#2E8B57',
                     'stump': '#8B4513',
                     'rock_copper': '#CD853F',
                     'rock_tin': '#C0C0C0',
@@ -165,7 +264,7 @@ class ImageManager {
                 resolve(canvas);
             };
             
-            img.src = path;
+            img.src = this.sourceFor(path);
         });
     }
 
@@ -266,8 +365,23 @@ class ImageManager {
         return this.images.has(key);
     }
 
+    trimFor(image) {
+        // Only while the loaded file is still the trimmed one; a regenerated asset is a full canvas again
+        const trim = this.trims[image.trimKey];
+        return trim && image.width === trim.size[0] && image.height === trim.size[1] ? trim : null;
+    }
+
     drawImage(ctx, key, x, y, width = null, height = null) {
         const image = this.getImage(key);
+        const trim = image && this.trimFor(image);
+        if (trim) {
+            // Draw the cropped sprite where it sat on its original canvas
+            const scaleX = width && height ? width / trim.canvas[0] : 1;
+            const scaleY = width && height ? height / trim.canvas[1] : 1;
+            ctx.drawImage(image, x + trim.offset[0] * scaleX, y + trim.offset[1] * scaleY,
+                          image.width * scaleX, image.height * scaleY);
+            return true;
+        }
         if (image) {
             if (width && height) {
                 ctx.drawImage(image, x, y, width, height);
@@ -279,6 +393,80 @@ class ImageManager {
         return false;
     }
 
+    hasAnimation(key) {
+        // The strip must have loaded for real (a missing file leaves a single-frame placeholder)
+        const animation = this.animations[this.imageDefinitions[key]];
+        const image = this.images.get(key);
+        return Boolean(animation && image && image.width >= animation.frames * animation.frame_size[0]);
+    }
+
+    drawAnimationFrame(ctx, key, time, x, y, width, height) {
+        // Pick the frame from the per-frame durations, looping over their total
+        if (!this.hasAnimation(key)) return false;
+
+        const animation = this.animations[this.imageDefinitions[key]];
+        const total = animation.durations.reduce((sum, duration) => sum + duration, 0);
+        let elapsed = time % total;
+        let frame = 0;
+        while (elapsed >= animation.durations[frame]) {
+            elapsed -= animation.durations[frame];
+            frame++;
+        }
+
+        const [frameWidth, frameHeight] = animation.frame_size;
+        ctx.drawImage(this.images.get(key), frame * frameWidth, 0, frameWidth, frameHeight,
+                      x, y, width || frameWidth, height || frameHeight);
+        return true;
+    }
+
+    atlasCount(key) {
+        const image = this.images.get(key);
+        const cell = this.atlases[key];
+        if (!image || !cell) return 0;
+        return Math.floor(image.width / cell) * Math.floor(image.height / cell);
+    }
+
+    drawAtlasTile(ctx, key, index, x, y, width, height) {
+        // Draw one variant cell of an atlas; any index works, it wraps around the variant count
+        const count = this.atlasCount(key);
+        if (!count) return false;
+
+        const image = this.images.get(key);
+        const cell = this.atlases[key];
+        const columns = Math.floor(image.width / cell);
+        const i = index % count;
+        ctx.drawImage(image, (i % columns) * cell, Math.floor(i / columns) * cell, cell, cell, x, y, width, height);
+        return true;
+    }
+
+    townBuildingCount() {
+        return this.town ? this.town.buildings.length : 0;
+    }
+
+    drawTownBuilding(ctx, index, x, y, scale = 1) {
+        // Draw one random town building (any index works, it wraps around) with its top-left at (x, y),
+        // from the sheet drawn nearest this scale. A sheet is only fetched the first time it is needed
+        const count = this.townBuildingCount();
+        if (!count) return false;
+
+        const sheetScale = Object.keys(this.town.sheets).map(Number)
+            .reduce((best, s) => Math.abs(s - scale) < Math.abs(best - scale) ? s : best);
+        const key = `town_${sheetScale}x`;
+        const image = this.images.get(key);
+        if (!image) {
+            if (!this.loadPromises.has(key)) {
+                this.totalImages++;
+                this.loadPromises.set(key, this.loadImage(key, this.town.sheets[sheetScale]));
+            }
+            return false;
+        }
+
+        const [rx, ry, width, height] = this.town.buildings[index % count].rect;
+        ctx.drawImage(image, rx * sheetScale, ry * sheetScale, width * sheetScale, height * sheetScale,
+                      x, y, width * scale, height * scale);
+        return true;
+    }
+
     // Utility method to create tiled backgrounds
     drawTiledBackground(ctx, key, startX, startY, endX, endY, tileSize = 32) {
         const image = this.getImage(key);
@@ -306,6 +494,7 @@ class ImageManager {
 
     // Method to preload critical images first
     async loadCriticalImages() {
+        await this.loadTreeManifest();
         const criticalImages = [
             'grass', 'dirt', 'player_male', 'player_male_walking', 'npc_goblin', 'tree_oak', 'rock_copper'
         ];
@@ -133,6 +133,13 @@ class RuneScapeWorldBuilder {
             special: ['fishing_spot', 'portal', 'teleport_pad', 'quest_marker', 'spawn_point']
         };
         
+        // Canvas size and offset of sprites cropped by sprite_trim.py, keyed by path
+        this.trims = {};
+        fetch('assets/trim_manifest.json')
+            .then(response => response.ok ? response.json() : {})
+            .then(trims => { this.trims = trims; this.render(); })
+            .catch(() => {});
+        
         // Maximum number of variants to check for each tile type
         const maxVariants = 10; // Increased to allow more variants
         this.totalImages = 0;
@@ -156,6 +163,7 @@ class RuneScapeWorldBuilder {
                     // Organized folder structure: assets/world_builder/category/type/variant.png
                     const variantFilename = variant === 1 ? '1.png' : `${variant}.png`;
                     const variantPath = `assets/world_builder/${category}/${type}/${variantFilename}`;
+                    img.trimKey = variantPath;
                     
                     img.onload = () => {
                         this.imagesLoaded++;
@@ -1104,6 +1112,21 @@ class RuneScapeWorldBuilder {
         return count;
     }
     
+    drawTileImage(image, x, y, width, height) {
+        const trim = this.trims && this.trims[image.trimKey];
+        // A regenerated asset no longer has the trimmed size: draw it as the full canvas it is
+        if (!trim || image.width !== trim.size[0] || image.height !== trim.size[1]) {
+            this.ctx.drawImage(image, x, y, width, height);
+            return;
+        }
+        
+        // Cropped sprite: place it where it sat on its original canvas
+        const scaleX = width / trim.canvas[0];
+        const scaleY = height / trim.canvas[1];
+        this.ctx.drawImage(image, x + trim.offset[0] * scaleX, y + trim.offset[1] * scaleY,
+                           image.width * scaleX, image.height * scaleY);
+    }
+    
     render() {
         // If showing interior, render that instead of the world
         if (this.showingInterior) {
@@ -1172,14 +1195,14 @@ class RuneScapeWorldBuilder {
                             this.ctx.save();
                             
                             // Draw the full building image
-                            this.ctx.drawImage(image, screenX, screenY, renderWidth, renderHeight);
+                            this.drawTileImage(image, screenX, screenY, renderWidth, renderHeight);
                             
                             // Restore context
                             this.ctx.restore();
                         }
                     } else {
                         // Single tile - draw normally
-                        this.ctx.drawImage(image, screenX, screenY, renderWidth, renderHeight);
+                        this.drawTileImage(image, screenX, screenY, renderWidth, renderHeight);
                         
                         // Add AI indicator for AI-controlled NPCs
                         if (tile.type && tile.type.startsWith('npc_') && this.openAI_NPCs && this.openAI_NPCs.isAIControlled(worldX, worldY)) {
@@ -2229,12 +2252,12 @@ class RuneScapeWorldBuilder {
                 description: 'A cozy home with fireplace and furniture'
             },
             'house_small': {
-                image: 'house_interior.png',
+                image: 'house_small_interior.png',
                 name: 'Small House', 
                 description: 'A modest dwelling with basic amenities'
             },
             'house_large': {
-                image: 'house_interior.png',
+                image: 'house_large_interior.png',
                 name: 'Large House',
                 description: 'A spacious home with multiple rooms'
             },
@@ -2243,34 +2266,33 @@ class RuneScapeWorldBuilder {
                 name: 'Magic Shop',
                 description: 'Mystical emporium of spells and magical items'
             },
-            // Map other shops to general store for now
             'weapon_shop': {
-                image: 'general_store_interior.png',
+                image: 'weapon_shop_interior.png',
                 name: 'Weapon Shop', 
                 description: 'Swords, axes, and combat equipment'
             },
             'armor_shop': {
-                image: 'general_store_interior.png',
+                image: 'armor_shop_interior.png',
                 name: 'Armor Shop',
                 description: 'Protective gear and defensive equipment'
             },
             'food_shop': {
-                image: 'general_store_interior.png',
+                image: 'food_shop_interior.png',
                 name: 'Food Shop',
                 description: 'Fresh food and cooking supplies'
             },
             'rune_shop': {
-                image: 'magic_shop_interior.png', // Use magic shop for rune shop
+                image: 'rune_shop_interior.png',
                 name: 'Rune Shop',
                 description: 'Magical runes and enchanted stones'
             },
             'archery_shop': {
-                image: 'general_store_interior.png',
+                image: 'archery_shop_interior.png',
                 name: 'Archery Shop',
                 description: 'Bows, arrows, and ranged equipment'
             },
             'inn': {
-                image: 'house_interior.png', // Use house interior for inn
+                image: 'inn_interior.png',
                 name: 'Inn',
                 description: 'Rest and recover at this cozy inn'
             }
@@ -403,7 +403,11 @@ class World {
                 else {
                     // Use different grass variants for less repetition
                     const grassVariant = (tileX * 3 + tileY * 7) % 4;
-                    if (grassVariant === 0 && imageManager.hasImage('grass1')) {
+                    if (imageManager.atlasCount('grass_variants') > 1) {
+                        // One of the batched grass variants, hashed from the tile position
+                        terrainType = 'grass_variants';
+                        tileVariant = ((tileX * 73856093) ^ (tileY * 19349663)) >>> 0;
+                    } else if (grassVariant === 0 && imageManager.hasImage('grass1')) {
                         terrainType = 'grass1';
                     } else if (grassVariant === 1 && imageManager.hasImage('grass2')) {
                         terrainType = 'grass2';
@@ -416,7 +420,11 @@ class World {
                 }
                 
                 // Draw terrain image or fallback to color
-                if (imageManager.isLoaded()) {
+                if (imageManager.isLoaded() && imageManager.hasAnimation(`${terrainType}_anim`)) {
+                    imageManager.drawAnimationFrame(ctx, `${terrainType}_anim`, Date.now(), screenX, screenY, this.tileSize, this.tileSize);
+                } else if (imageManager.isLoaded() && imageManager.atlases[terrainType]) {
+                    imageManager.drawAtlasTile(ctx, terrainType, tileVariant, screenX, screenY, this.tileSize, this.tileSize);
+                } else if (imageManager.isLoaded()) {
                     // Try to get image with variant, will handle loading dynamically
                     const image = imageManager.getImage(terrainType, tileVariant);
                     if (image && image.width) {
@@ -619,7 +627,11 @@ class World {
                 // Render resource image or fallback to emoji
                 if (resource.health > 0) {
                     const imageKey = `tree_${resource.type}`;
-                    if (imageManager.isLoaded() && imageManager.hasImage(imageKey)) {
+                    if (imageManager.isLoaded() && imageManager.atlasCount(`${imageKey}_variants`) > 1) {
+                        // One of the seeded variants of this species (every species in the tree manifest has a strip), hashed from the tree's position
+                        const variant = ((Math.floor(resource.x) * 73856093) ^ (Math.floor(resource.y) * 19349663)) >>> 0;
+                        imageManager.drawAtlasTile(ctx, `${imageKey}_variants`, variant, screenX - 24, screenY - 24, 48, 48);
+                    } else if (imageManager.isLoaded() && imageManager.hasImage(imageKey)) {
                         // Make trees bigger - 48x48 instead of 32x32
                         imageManager.drawImage(ctx, imageKey, screenX - 24, screenY - 24, 48, 48);
                     } else {
@@ -776,10 +788,13 @@ class World {
                 
                 if (fire.burnTime > 0) {
                     // Try to render fire image with animation
+                    const animated = imageManager.isLoaded() && imageManager.hasAnimation('fire_anim');
                     const flicker = Math.sin(Date.now() * 0.01) * 0.2 + 0.8;
-                    ctx.globalAlpha = flicker;
+                    ctx.globalAlpha = animated ? 1 : flicker;
                     
-                    if (imageManager.isLoaded() && imageManager.hasImage('fire')) {
+                    if (animated) {
+                        imageManager.drawAnimationFrame(ctx, 'fire_anim', Date.now(), screenX - 16, screenY - 16, 32, 32);
+                    } else if (imageManager.isLoaded() && imageManager.hasImage('fire')) {
                         imageManager.drawImage(ctx, 'fire', screenX - 16, screenY - 16, 32, 32);
                     } else {
                         // Fallback to animated emoji
@@ -1,55 +1,69 @@
-from PIL import Image
+import argparse
 import os
 
-def make_white_transparent(image_path):
-    """Convert white backgrounds to transparent in an image"""
+from asset_store import AssetStore
+from background_key import DEFAULT_COLOR, DEFAULT_MODE, add_key_arguments, collect_pngs, key_file, key_files, write_report
+from format_manifest import client_keys, drop_stale_webp
+
+def make_white_transparent(image_path, color=DEFAULT_COLOR, threshold=None, softness=None, mode=DEFAULT_MODE):
+    """Convert white backgrounds to transparent in an image (callers drop stale WebPs once per batch)"""
+    # 'flood' only clears background reachable from the edges, so white walls and windows survive
+    options = {'color': color, 'mode': mode}
+    if threshold is not None:
+        options['threshold'] = threshold
+    if softness is not None:
+        options['softness'] = softness
+
     try:
-        # Open the image
-        img = Image.open(image_path)
-        
-        # Convert to RGBA if not already
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA')
-        
-        # Get image data
-        data = img.getdata()
-        
-        # Create new data with white pixels made transparent
-        new_data = []
-        for item in data:
-            # If pixel is white or near-white, make it transparent
-            if item[0] > 240 and item[1] > 240 and item[2] > 240:
-                new_data.append((255, 255, 255, 0))  # Transparent
-            else:
-                new_data.append(item)  # Keep original
-        
-        # Create new image with transparent background
-        img.putdata(new_data)
-        
-        # Save the image
-        img.save(image_path, 'PNG')
-        print(f"Fixed transparency for: {os.path.basename(image_path)}")
-        
+        # Snapshot first so the original can always be restored (revert_building_images.py)
+        store = AssetStore()
+        parent = store.ingest(image_path)
+        result = key_file(image_path, **options)
+        store.record(image_path, f"key:{mode}", parent=parent)
+        store.save()
+        print(f"Fixed transparency for: {os.path.basename(image_path)} ({result['cleared']} pixels cleared)")
+        return result
     except Exception as e:
         print(f"Error processing {image_path}: {e}")
 
-def fix_all_building_images():
+def fix_all_building_images(buildings_dir='client/assets/buildings', **options):
     """Fix transparency for all building images"""
-    buildings_dir = 'client/assets/buildings'
-    
     if not os.path.exists(buildings_dir):
         print(f"Buildings directory not found: {buildings_dir}")
         return
     
     print("Fixing transparency for building images...")
     
-    for filename in os.listdir(buildings_dir):
-        if filename.endswith('.png'):
-            image_path = os.path.join(buildings_dir, filename)
-            make_white_transparent(image_path)
+    store = AssetStore()
+    parents = {str(path): store.ingest(path) for path, _ in collect_pngs([buildings_dir])}
+
+    results = key_files([buildings_dir], **options)
+    for result in results:
+        if 'error' not in result:
+            store.record(result['path'], f"key:{options.get('mode', DEFAULT_MODE)}", parent=parents[result['path']])
+    store.save()
+    drop_stale_webp(client_keys(result['path'] for result in results if 'error' not in result))
+
+    for result in results:
+        if 'error' in result:
+            print(f"Error processing {result['path']}: {result['error']}")
+        else:
+            print(f"Fixed transparency for: {os.path.basename(result['path'])} ({result['cleared']} pixels cleared)")
     
     print("Done! All building images should now have transparent backgrounds.")
     print("Refresh your browser to see the changes.")
+    return results
 
 if __name__ == "__main__":
-    fix_all_building_images()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Make building image backgrounds transparent")
+    parser.add_argument('sources', nargs='*', default=['client/assets/buildings'],
+                        help="PNG files and/or directories (default client/assets/buildings)")
+    add_key_arguments(parser)
+    args = parser.parse_args()
+
+    report = []
+    for source in args.sources:
+        report.extend(fix_all_building_images(source, mode=args.mode, color=args.color,
+                                              threshold=args.threshold, softness=args.softness) or [])
+    if args.report:
+        write_report(report, args.report)
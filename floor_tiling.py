@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Floor Tiling
+============
+
+Pattern-cached floors and furniture stamps for interior layouts. Instead of
+one ``draw.rectangle`` per floor tile or plank, each floor pattern is drawn
+once as a single period and filled over any room size by array indexing:
+
+- checker      alternating light and dark stone tiles with grout lines
+- planks       rows of boards with staggered end joints
+- flagstone    a block of stones in running bond, each a slightly different
+               shade, optionally with marks (runes) on some of them
+
+tile_floor() repeats a pattern over width x height pixels from any offset,
+so neighbouring rooms and doors can line up with the grid.
+
+Furniture works the same way: a drawing function decorated with
+cached_stamp() is drawn once per argument set and kept as an RGBA array,
+and stamp() composites it onto a floor by its alpha with plain array
+slicing, clipped at the room edges. Patterns and stamps are cached per
+process and returned read-only, so a batch of rooms shares them.
+
+Usage:
+    @cached_stamp
+    def counter(width, height):
+        img = Image.new('RGBA', (width, height))
+        ImageDraw.Draw(img).rectangle([0, 0, width - 1, height - 1], fill=(139, 69, 19))
+        return img
+
+    floor = tile_floor(checker(16, (160, 160, 160), (120, 120, 120), (80, 80, 80)), 320, 240)
+    stamp(floor, counter(240, 31), 40, 40)
+    image = to_image(floor)
+"""
+
+from functools import lru_cache, wraps
+from typing import Callable, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from asset_seed import asset_rng
+
+Color = Tuple[int, ...]
+
+
+def frozen(array: np.ndarray) -> np.ndarray:
+    """An RGBA array that can be shared from a cache without being drawn on"""
+    array = np.ascontiguousarray(array, dtype=np.uint8)
+    array.flags.writeable = False
+    return array
+
+
+def solid(width: int, height: int, color: Color) -> np.ndarray:
+    """width x height RGBA array of one colour"""
+    array = np.empty((height, width, 4), dtype=np.uint8)
+    array[:] = tuple(color) + (255,) * (4 - len(color))
+    return array
+
+
+def grout_lines(tile: np.ndarray, every_x: int, every_y: int, grout: Color):
+    """Grout along the top and left edge of every cell, so repeats share one line"""
+    tile[::every_y, :, :3] = grout[:3]
+    tile[:, ::every_x, :3] = grout[:3]
+
+
+@lru_cache(maxsize=None)
+def checker(cell: int, light: Color, dark: Color, grout: Color) -> np.ndarray:
+    """2 x 2 cells of alternating stone tiles"""
+    tile = solid(cell * 2, cell * 2, light)
+    tile[:cell, cell:, :3] = dark[:3]
+    tile[cell:, :cell, :3] = dark[:3]
+    grout_lines(tile, cell, cell, grout)
+    return frozen(tile)
+
+
+@lru_cache(maxsize=None)
+def planks(width: int, colors: Tuple[Color, ...], grout: Color, length: Optional[int] = None) -> np.ndarray:
+    """One row of boards per colour, ``width`` pixels wide; end joints every ``length``, staggered per row"""
+    rows = len(colors)
+    length = length or width * 8
+    tile = np.concatenate([solid(length, width, color) for color in colors])
+    tile[::width, :, :3] = grout[:3]
+    for row in range(rows):
+        tile[row * width:(row + 1) * width, (row * length // rows) % length, :3] = grout[:3]
+    return frozen(tile)
+
+
+@lru_cache(maxsize=None)
+def flagstone(cell: int, colors: Tuple[Color, ...], grout: Color, name: str, stones: int = 4,
+              mark: Optional[Color] = None, mark_chance: float = 0.0) -> np.ndarray:
+    """stones x stones block of stones in running bond, shaded and marked per stone from the asset seed of ``name``"""
+    rng = asset_rng(name)
+    size = cell * stones
+    shades = np.asarray(colors, dtype=int)[rng.integers(0, len(colors), (stones, stones))]
+    shades = np.clip(shades[..., :3] + rng.integers(-4, 5, (stones, stones, 1)), 0, 255)
+
+    tile = solid(size, size, (0, 0, 0))
+    tile[..., :3] = np.repeat(np.repeat(shades, cell, axis=0), cell, axis=1)
+    grout_lines(tile, cell, cell, grout)
+
+    if mark is not None:
+        marked = np.argwhere(rng.random((stones, stones)) < mark_chance)
+        low, high = cell * 2 // 5, cell * 3 // 5
+        for row, column in marked:
+            tile[row * cell + low:row * cell + high, column * cell + low:column * cell + high, :3] = mark[:3]
+
+    # Running bond: every other row of stones shifted by half a stone
+    for row in range(1, stones, 2):
+        tile[row * cell:(row + 1) * cell] = np.roll(tile[row * cell:(row + 1) * cell], cell // 2, axis=1)
+    return frozen(tile)
+
+
+def tile_floor(pattern: np.ndarray, width: int, height: int, offset: Tuple[int, int] = (0, 0)) -> np.ndarray:
+    """A new width x height RGBA floor repeating ``pattern``, starting ``offset`` pixels into it"""
+    rows = (np.arange(height) + offset[1]) % pattern.shape[0]
+    columns = (np.arange(width) + offset[0]) % pattern.shape[1]
+    return pattern[rows[:, None], columns]
+
+
+def cached_stamp(draw: Callable[..., Image.Image]) -> Callable[..., np.ndarray]:
+    """Decorate a furniture drawing function so each argument set is drawn once, as a read-only RGBA array"""
+    @lru_cache(maxsize=None)
+    @wraps(draw)
+    def cached(*args, **kwargs):
+        return frozen(np.asarray(draw(*args, **kwargs).convert('RGBA')))
+    return cached
+
+
+def stamp(canvas: np.ndarray, sprite: np.ndarray, x: int, y: int):
+    """Composite a sprite onto an RGBA canvas by its alpha, top-left at (x, y), clipped at the edges"""
+    height, width = canvas.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + sprite.shape[1], width), min(y + sprite.shape[0], height)
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    source = sprite[y0 - y:y1 - y, x0 - x:x1 - x].astype(np.uint16)
+    target = canvas[y0:y1, x0:x1]
+    alpha = source[..., 3:4]
+    target[..., :3] = (source[..., :3] * alpha + target[..., :3] * (255 - alpha) + 127) // 255
+    target[..., 3] = np.maximum(target[..., 3], source[..., 3])
+
+
+def stamp_all(canvas: np.ndarray, sprite: np.ndarray, positions: Sequence[Tuple[int, int]]):
+    """The same sprite at several positions"""
+    for x, y in positions:
+        stamp(canvas, sprite, x, y)
+
+
+def to_image(canvas: np.ndarray) -> Image.Image:
+    return Image.fromarray(np.ascontiguousarray(canvas), 'RGBA')
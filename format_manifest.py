@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Format Manifest
+===============
+
+``client/assets/format_manifest.json`` lists, per image the client loads, the
+hash of the PNG its formats were made from and the byte size of each format
+(written by png_optimize.py). A WebP sibling is only valid for that PNG.
+
+This module holds just the bookkeeping every PNG writer needs - generation,
+trimming, palettes, post-processing, the build, reverts - so they can import it
+without pulling in the optimizer. Writers call drop_stale_webp() once per batch
+of rewritten files; it deletes siblings whose PNG hash no longer matches and
+forgets their entries, so the next png_optimize run redoes them.
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from image_cache import write_atomic
+
+CLIENT_ROOT = Path("client")
+MANIFEST_PATH = CLIENT_ROOT / "assets" / "format_manifest.json"
+
+# Writers in one process (e.g. generator threads) take turns rewriting the manifest
+MANIFEST_LOCK = threading.Lock()
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def client_key(path: Path) -> str:
+    """Path as the client requests it, e.g. assets/buildings/bank.png"""
+    return Path(path).resolve().relative_to(CLIENT_ROOT.resolve()).as_posix()
+
+
+def client_keys(paths: Iterable[Path]) -> List[str]:
+    """Client keys of the paths inside the client tree; others are skipped"""
+    client = CLIENT_ROOT.resolve()
+    return [client_key(path) for path in paths if Path(path).resolve().is_relative_to(client)]
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> Dict[str, Dict]:
+    try:
+        return json.loads(Path(path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def drop_stale_webp(keys: Optional[Iterable[str]] = None, manifest_path: Path = MANIFEST_PATH) -> int:
+    """Delete WebP siblings whose PNG changed since they were made (every entry, or just ``keys``); returns how many"""
+    with MANIFEST_LOCK:
+        manifest = load_manifest(manifest_path)
+        stale = []
+        for key in manifest if keys is None else [key for key in keys if key in manifest]:
+            entry = manifest[key]
+            if 'webp' not in entry:
+                continue
+            try:
+                current = file_digest((CLIENT_ROOT / key).read_bytes())
+            except OSError:
+                current = None
+            if current != entry.get('sha256'):
+                stale.append(key)
+
+        for key in stale:
+            webp_path = (CLIENT_ROOT / key).with_suffix('.webp')
+            if webp_path.exists():
+                webp_path.unlink()
+            # Forgotten rather than patched, so png_optimize picks the image up again
+            del manifest[key]
+            print(f"Dropped stale WebP: {key}")
+
+        if stale:
+            write_atomic(Path(manifest_path), json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+    return len(stale)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Generate looping animated tiles and effects for RuneScape clone
+Renders every frame of water, lava and fire in one vectorized pass from
+time-periodic noise and writes each animation as one horizontal strip, plus
+client/assets/animation_manifest.json with the frame layout and timing.
+"""
+
+import json
+
+import numpy as np
+
+from asset_registry import AssetJob, run_generator
+from asset_seed import asset_rng
+from tileable import (atlas, colorize, grain, loop_fractal_noise, scroll, seam_error, wrap_put)
+
+ANIMATION_MANIFEST_PATH = 'client/assets/animation_manifest.json'
+FRAME_SIZE = 32
+
+# Strip path (as the client requests it) -> frame count and per-frame duration in ms
+ANIMATIONS = {
+    'assets/tiles/water_anim.png': {'frames': 8, 'duration': 150},
+    'assets/tiles/lava_anim.png': {'frames': 16, 'duration': 150},
+    'assets/effects/fire_anim.png': {'frames': 8, 'duration': 90},
+}
+
+def frame_count(path):
+    return ANIMATIONS[path]['frames']
+
+def strip(frames):
+    """Frames side by side, left to right"""
+    return atlas(frames, len(frames))
+
+def create_water_animation():
+    """Create looping water: drifting swells, travelling wave lines and shimmer"""
+    frames = frame_count('assets/tiles/water_anim.png')
+    rng = asset_rng('tiles/water_anim')
+
+    # Two swell layers drifting different ways
+    swell = (scroll(loop_fractal_noise(rng, frames, FRAME_SIZE, period=2), cycles_x=1) +
+             scroll(loop_fractal_noise(rng, frames, FRAME_SIZE, period=2), cycles_y=1)) / 2
+    tiles = colorize(swell, [(22, 96, 148), (28, 107, 160), (36, 120, 176), (90, 170, 215)])
+
+    # Wave lines every 4th row, moving one wave length (8px) per loop
+    frame, ys, xs = np.mgrid[0:frames, 0:FRAME_SIZE:4, 0:FRAME_SIZE]
+    wave = (xs + ys + frame * 8 // frames) % 8 < 4
+    colors = np.broadcast_to(np.array([40, 120, 180, 160], dtype=np.uint8), (int(wave.sum()), 4))
+    wrap_put(tiles, frame[wave], xs[wave], ys[wave], colors)
+
+    return strip(grain(tiles, 3, rng=rng))
+
+def create_lava_animation():
+    """Create looping lava: slowly churning crust with glowing seams"""
+    frames = frame_count('assets/tiles/lava_anim.png')
+    rng = asset_rng('tiles/lava_anim')
+
+    flow = loop_fractal_noise(rng, frames, FRAME_SIZE, period=2, octaves=4)
+    # Folding the field around its middle turns mid values into bright, thin molten seams
+    heat = 1 - np.abs(flow - 0.5) * 2
+    tiles = colorize(heat ** 2, [(60, 12, 0), (140, 25, 0), (220, 70, 0), (255, 140, 20), (255, 220, 90)])
+
+    return strip(grain(tiles, 4, rng=rng))
+
+def create_fire_animation():
+    """Create a looping fire sprite: rising noise inside a flame-shaped falloff"""
+    frames = frame_count('assets/effects/fire_anim.png')
+    rng = asset_rng('effects/fire_anim')
+
+    # Noise rising two tile heights per loop
+    flicker = scroll(loop_fractal_noise(rng, frames, FRAME_SIZE, period=3, octaves=3), cycles_y=-2)
+
+    # Teardrop: widest near the base, narrowing to a point at the top
+    ys, xs = np.mgrid[0:FRAME_SIZE, 0:FRAME_SIZE] / (FRAME_SIZE - 1)
+    height = np.clip((0.95 - ys) / 0.8, 0, 1)
+    half_width = 0.42 * np.sqrt(np.clip(1 - height, 0, 1)) * np.clip(height * 4, 0, 1)
+    shape = np.clip(1 - np.abs(xs - 0.5) / np.maximum(half_width, 1e-6), 0, 1) * (ys <= 0.95)
+
+    heat = np.clip(shape[None] * (0.55 + 0.9 * flicker) - 0.35, 0, 1)
+    sprite = colorize(heat, [(200, 30, 0), (255, 69, 0), (255, 140, 0), (255, 220, 60), (255, 255, 200)])
+    sprite[..., 3] = np.clip(heat * 4, 0, 1) * 255
+
+    return strip(sprite)
+
+def create_animation_manifest():
+    """Frame layout and timing of every strip, keyed by the path the client requests"""
+    manifest = {
+        path: {
+            'frames': spec['frames'],
+            'frame_size': [FRAME_SIZE, FRAME_SIZE],
+            'durations': [spec['duration']] * spec['frames'],
+        }
+        for path, spec in ANIMATIONS.items()
+    }
+    return json.dumps(manifest, indent=1, sort_keys=True)
+
+def asset_jobs():
+    """Every animation strip and the manifest describing them"""
+    return [
+        AssetJob('client/assets/tiles/water_anim.png', create_water_animation),
+        AssetJob('client/assets/tiles/lava_anim.png', create_lava_animation),
+        AssetJob('client/assets/effects/fire_anim.png', create_fire_animation),
+        AssetJob(ANIMATION_MANIFEST_PATH, create_animation_manifest),
+    ]
+
+if __name__ == "__main__":
+    print("Generating animated tiles and effects...")
+    run_generator(asset_jobs())
+
+    print("\nSeam error of the first frame when repeated (about 1 or less is seamless):")
+    for name, build in (('water', create_water_animation), ('lava', create_lava_animation)):
+        first = np.asarray(build())[:, :FRAME_SIZE]
+        print(f"  {name}: {seam_error(first):.2f}")
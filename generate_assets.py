@@ -5,23 +5,10 @@ Creates simple 32x32 pixel art images in RuneScape style
 """
 
 from PIL import Image, ImageDraw
-import os
 
-def create_directories():
-    """Create asset directories if they don't exist"""
-    dirs = [
-        'client/assets/tiles',
-        'client/assets/resources', 
-        'client/assets/npcs',
-        'client/assets/player',
-        'client/assets/ui',
-        'client/assets/items',
-        'client/assets/effects'
-    ]
-    
-    for dir_path in dirs:
-        os.makedirs(dir_path, exist_ok=True)
-        print(f"Created directory: {dir_path}")
+from asset_registry import AssetJob, run_generator
+from asset_seed import asset_rng
+from pixel_effects import speckle
 
 def create_tile_image(name, base_color, accent_color=None, pattern='solid'):
     """Create a 32x32 tile image"""
@@ -40,18 +27,13 @@ def create_tile_image(name, base_color, accent_color=None, pattern='solid'):
         # Create simple texture
         draw.rectangle([0, 0, 31, 31], fill=base_color)
         if accent_color:
-            # Add random dots for texture
-            import random
-            random.seed(42)  # Consistent randomness
-            for _ in range(20):
-                x, y = random.randint(0, 31), random.randint(0, 31)
-                draw.point((x, y), fill=accent_color)
+            # Add random dots for texture, seeded per tile for consistent randomness
+            speckle(img, 20, [accent_color], rng=asset_rng(f'tiles/{name}'))
     
     # Add border
     draw.rectangle([0, 0, 31, 31], outline=(0, 0, 0, 100), width=1)
     
-    img.save(f'client/assets/tiles/{name}.png')
-    print(f"Created tile: {name}.png")
+    return img
 
 def create_resource_image(name, main_color, accent_color=None, shape='tree'):
     """Create resource images"""
@@ -78,8 +60,7 @@ def create_resource_image(name, main_color, accent_color=None, shape='tree'):
         # Add rings
         draw.ellipse([13, 21, 18, 26], outline=(101, 67, 33), width=1)
     
-    img.save(f'client/assets/resources/{name}.png')
-    print(f"Created resource: {name}.png")
+    return img
 
 def create_npc_image(name, body_color, accent_color=None):
     """Create simple NPC sprites"""
@@ -99,8 +80,7 @@ def create_npc_image(name, body_color, accent_color=None):
     draw.rectangle([13, 26, 15, 30], fill=(101, 67, 33))  # Left leg
     draw.rectangle([16, 26, 18, 30], fill=(101, 67, 33))  # Right leg
     
-    img.save(f'client/assets/npcs/{name}.png')
-    print(f"Created NPC: {name}.png")
+    return img
 
 def create_player_image(name, shirt_color, pants_color):
     """Create player sprite"""
@@ -125,8 +105,7 @@ def create_player_image(name, shirt_color, pants_color):
     # Hair
     draw.rectangle([13, 6, 18, 8], fill=(139, 69, 19))
     
-    img.save(f'client/assets/player/{name}.png')
-    print(f"Created player: {name}.png")
+    return img
 
 def create_item_image(name, main_color, accent_color=None, item_type='generic'):
     """Create item images"""
@@ -161,64 +140,71 @@ def create_item_image(name, main_color, accent_color=None, item_type='generic'):
         if accent_color:
             draw.rectangle([5, 5, 10, 10], fill=accent_color)
     
-    img.save(f'client/assets/items/{name}.png')
-    print(f"Created item: {name}.png")
+    return img
+
+def create_fire_effect():
+    """Create the fire effect sprite"""
+    img = Image.new('RGBA', (32, 32), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    # Draw fire
+    draw.ellipse([12, 20, 19, 30], fill=(255, 69, 0))
+    draw.ellipse([13, 16, 18, 24], fill=(255, 140, 0))
+    draw.ellipse([14, 12, 17, 18], fill=(255, 255, 0))
+    return img
+
+def asset_jobs():
+    """Simple placeholders for every game sprite; generated art replaces most of them"""
+    jobs = [
+        # Tile images
+        ('tiles/grass', create_tile_image, ('grass', (34, 139, 34), (60, 179, 113), 'textured')),
+        ('tiles/dirt', create_tile_image, ('dirt', (139, 69, 19), (160, 82, 45), 'textured')),
+        ('tiles/stone', create_tile_image, ('stone', (105, 105, 105), (128, 128, 128), 'textured')),
+        ('tiles/water', create_tile_image, ('water', (65, 105, 225), (100, 149, 237), 'textured')),
+        
+        # Resource images
+        ('resources/tree_oak', create_resource_image, ('tree_oak', (34, 139, 34), (60, 179, 113), 'tree')),
+        ('resources/tree_willow', create_resource_image, ('tree_willow', (144, 238, 144), (152, 251, 152), 'tree')),
+        ('resources/tree_maple', create_resource_image, ('tree_maple', (255, 99, 71), (255, 127, 80), 'tree')),
+        ('resources/tree_yew', create_resource_image, ('tree_yew', (47, 79, 79), (60, 90, 90), 'tree')),
+        ('resources/stump', create_resource_image, ('stump', (139, 69, 19), (160, 82, 45), 'stump')),
+        
+        ('resources/rock_copper', create_resource_image, ('rock_copper', (205, 133, 63), (222, 184, 135), 'rock')),
+        ('resources/rock_tin', create_resource_image, ('rock_tin', (192, 192, 192), (211, 211, 211), 'rock')),
+        ('resources/rock_iron', create_resource_image, ('rock_iron', (169, 169, 169), (190, 190, 190), 'rock')),
+        ('resources/rock_coal', create_resource_image, ('rock_coal', (47, 47, 47), (64, 64, 64), 'rock')),
+        ('resources/rock_gold', create_resource_image, ('rock_gold', (255, 215, 0), (255, 255, 224), 'rock')),
+        ('resources/rock_depleted', create_resource_image, ('rock_depleted', (105, 105, 105), (128, 128, 128), 'rock')),
+        
+        # NPC images
+        ('npcs/goblin', create_npc_image, ('goblin', (139, 0, 0), (255, 140, 140))),
+        ('npcs/shopkeeper', create_npc_image, ('shopkeeper', (75, 0, 130), (138, 43, 226))),
+        ('npcs/banker', create_npc_image, ('banker', (0, 0, 139), (65, 105, 225))),
+        ('npcs/quest_giver', create_npc_image, ('quest_giver', (139, 69, 19), (205, 133, 63))),
+        
+        # Player images
+        ('player/male', create_player_image, ('male', (0, 100, 200), (25, 25, 112))),
+        ('player/female', create_player_image, ('female', (200, 0, 100), (139, 0, 139))),
+        
+        # Item images
+        ('items/sword', create_item_image, ('sword', (192, 192, 192), (139, 69, 19), 'sword')),
+        ('items/axe', create_item_image, ('axe', (169, 169, 169), None, 'axe')),
+        ('items/pickaxe', create_item_image, ('pickaxe', (160, 160, 160), None, 'axe')),
+        ('items/bread', create_item_image, ('bread', (222, 184, 135), (245, 222, 179), 'bread')),
+        ('items/coins', create_item_image, ('coins', (255, 215, 0), None, 'coins')),
+        
+        # Effect images
+        ('effects/fire', create_fire_effect, ()),
+    ]
+    return [AssetJob(f'client/assets/{name}.png', build, args, fallback=True) for name, build, args in jobs]
 
 def main():
     """Generate all asset images"""
     print("Generating RuneScape-style pixel art assets...")
     
-    create_directories()
-    
-    # Create tile images
-    create_tile_image('grass', (34, 139, 34), (60, 179, 113), 'textured')
-    create_tile_image('dirt', (139, 69, 19), (160, 82, 45), 'textured')
-    create_tile_image('stone', (105, 105, 105), (128, 128, 128), 'textured')
-    create_tile_image('water', (65, 105, 225), (100, 149, 237), 'textured')
-    
-    # Create resource images
-    create_resource_image('tree_oak', (34, 139, 34), (60, 179, 113), 'tree')
-    create_resource_image('tree_willow', (144, 238, 144), (152, 251, 152), 'tree')
-    create_resource_image('tree_maple', (255, 99, 71), (255, 127, 80), 'tree')
-    create_resource_image('tree_yew', (47, 79, 79), (60, 90, 90), 'tree')
-    create_resource_image('stump', (139, 69, 19), (160, 82, 45), 'stump')
-    
-    create_resource_image('rock_copper', (205, 133, 63), (222, 184, 135), 'rock')
-    create_resource_image('rock_tin', (192, 192, 192), (211, 211, 211), 'rock')
-    create_resource_image('rock_iron', (169, 169, 169), (190, 190, 190), 'rock')
-    create_resource_image('rock_coal', (47, 47, 47), (64, 64, 64), 'rock')
-    create_resource_image('rock_gold', (255, 215, 0), (255, 255, 224), 'rock')
-    create_resource_image('rock_depleted', (105, 105, 105), (128, 128, 128), 'rock')
-    
-    # Create NPC images
-    create_npc_image('goblin', (139, 0, 0), (255, 140, 140))
-    create_npc_image('shopkeeper', (75, 0, 130), (138, 43, 226))
-    create_npc_image('banker', (0, 0, 139), (65, 105, 225))
-    create_npc_image('quest_giver', (139, 69, 19), (205, 133, 63))
-    
-    # Create player images
-    create_player_image('male', (0, 100, 200), (25, 25, 112))
-    create_player_image('female', (200, 0, 100), (139, 0, 139))
-    
-    # Create item images
-    create_item_image('sword', (192, 192, 192), (139, 69, 19), 'sword')
-    create_item_image('axe', (169, 169, 169), None, 'axe')
-    create_item_image('pickaxe', (160, 160, 160), None, 'axe')
-    create_item_image('bread', (222, 184, 135), (245, 222, 179), 'bread')
-    create_item_image('coins', (255, 215, 0), None, 'coins')
-    
-    # Create effect images
-    fire_img = Image.new('RGBA', (32, 32), (0, 0, 0, 0))
-    fire_draw = ImageDraw.Draw(fire_img)
-    # Draw fire
-    fire_draw.ellipse([12, 20, 19, 30], fill=(255, 69, 0))
-    fire_draw.ellipse([13, 16, 18, 24], fill=(255, 140, 0))
-    fire_draw.ellipse([14, 12, 17, 18], fill=(255, 255, 0))
-    fire_img.save('client/assets/effects/fire.png')
-    print("Created effect: fire.png")
+    run_generator(asset_jobs())
     
     print(f"\nSuccessfully generated all asset images!")
     print("Assets are now ready for use in the RuneScape clone.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
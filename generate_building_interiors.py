@@ -1,288 +1,318 @@
 from PIL import Image, ImageDraw
-import random
-import os
 
-# Create assets directories if they don't exist
-os.makedirs('client/assets/interiors', exist_ok=True)
+from asset_registry import AssetJob, run_generator
+from floor_tiling import cached_stamp, checker, flagstone, planks, stamp, stamp_all, tile_floor, to_image
 
-def create_bank_interior():
-    """Create a bank interior room layout"""
-    width, height = 320, 240
+INTERIORS_PATH = 'client/assets/interiors'
+
+# Floor patterns, each drawn once and tiled over every room that uses it
+STONE_FLOOR = ((160, 160, 160), (120, 120, 120), (80, 80, 80))
+WOOD_COLORS = ((139, 90, 43), (160, 100, 50))
+WOOD_GROUT = (101, 67, 33)
+MAGIC_STONES = ((40, 40, 60), (44, 42, 66), (36, 36, 56))
+
+# Wood for counters, shelves and crates
+DARK_WOOD = (101, 67, 33)
+WOOD = (139, 69, 19)
+LIGHT_WOOD = (160, 82, 45)
+MAGIC_WOOD = (60, 30, 80)
+MAGIC_TRIM = (40, 20, 60)
+
+@cached_stamp
+def block(width, height, fill, outline=None):
+    """A rectangular piece: counter, shelf, crate, vault, chest or door"""
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    ImageDraw.Draw(img).rectangle([0, 0, width - 1, height - 1], fill=fill, outline=outline)
+    return img
+
+@cached_stamp
+def disc(width, height, fill, outline=None):
+    """A round piece: barrel, torch, lantern, orb or position marker"""
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    ImageDraw.Draw(img).ellipse([0, 0, width - 1, height - 1], fill=fill, outline=outline)
+    return img
+
+@cached_stamp
+def ring(size, color, rings=1, spacing=3):
+    """Concentric outlines: an orb's glow or a door's magical aura"""
+    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for i in range(rings):
+        inset = i * spacing
+        faded = tuple(max(0, c - i * 30) for c in color)
+        draw.ellipse([inset, inset, size - 1 - inset, size - 1 - inset], outline=faded)
+    return img
+
+@cached_stamp
+def fireplace(width, height):
+    """Stone hearth with a fire inside"""
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, width - 1, height - 1], fill=(64, 64, 64), outline=(32, 32, 32))
+    draw.ellipse([5, 5, width - 6, height - 6], fill=(255, 69, 0))
+    draw.ellipse([10, 10, width - 11, height - 11], fill=(255, 215, 0))
+    return img
+
+@cached_stamp
+def bed(width, height, blanket):
+    """Bed frame with a blanket"""
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, width - 1, height - 1], fill=WOOD, outline=DARK_WOOD)
+    draw.rectangle([3, 3, width - 4, height - 4], fill=blanket)
+    return img
+
+@cached_stamp
+def dining_set(table_width, table_height, chair=12, gap=5):
+    """Table with a chair above and below it"""
+    height = table_height + 2 * (chair + gap)
+    img = Image.new('RGBA', (table_width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, chair + gap, table_width - 1, chair + gap + table_height - 1], fill=LIGHT_WOOD, outline=WOOD)
+    left = (table_width - chair) // 2
+    draw.rectangle([left, 0, left + chair - 1, chair - 1], fill=WOOD)
+    draw.rectangle([left, height - chair, left + chair - 1, height - 1], fill=WOOD)
+    return img
+
+@cached_stamp
+def goods_shelf(width, height, goods):
+    """Shelf with a row of stock in the given colours"""
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, width - 1, height - 1], fill=LIGHT_WOOD, outline=WOOD)
+    for i, x in enumerate(range(4, width - 8, 10)):
+        draw.rectangle([x, 4, x + 5, height - 5], fill=goods[i % len(goods)])
+    return img
+
+@cached_stamp
+def staircase(steps, width, step_height=6, spacing=8, color=(80, 60, 100)):
+    """Steps narrowing as they rise, seen from above"""
+    height = (steps - 1) * spacing + step_height
     img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
-    
-    # Stone checkered floor
-    tile_size = 16
-    for x in range(0, width, tile_size):
-        for y in range(0, height, tile_size):
-            tile_x = x // tile_size
-            tile_y = y // tile_size
-            if (tile_x + tile_y) % 2 == 0:
-                color = (160, 160, 160)  # Light gray
-            else:
-                color = (120, 120, 120)  # Dark gray
-            draw.rectangle([x, y, x + tile_size, y + tile_size], fill=color, outline=(80, 80, 80))
-    
+    for i in range(steps):
+        top = height - step_height - i * spacing
+        draw.rectangle([0, top, width - i * width // 10, top + step_height], fill=color)
+    return img
+
+def wood_floor(width, height, board):
+    return tile_floor(planks(board, WOOD_COLORS, WOOD_GROUT), width, height)
+
+# Smallest room each layout fits its furniture into, before pieces start to overlap
+MIN_ROOM_SIZES = {
+    'bank': (180, 120),
+    'general_store': (200, 150),
+    'house': (200, 150),
+    'inn': (200, 160),
+    'magic_shop': (240, 190),
+}
+
+def check_room(layout, width, height):
+    """Raise a clear error for rooms smaller than the layout's declared minimum"""
+    min_width, min_height = MIN_ROOM_SIZES[layout]
+    if width < min_width or height < min_height:
+        raise ValueError(f"{layout} interior needs a room of at least {min_width}x{min_height}, got {width}x{height}")
+
+def place_door(room, width, height, door_width, depth, fill=DARK_WOOD, outline=(80, 50, 25)):
+    """Entrance door centred on the bottom wall; returns its left edge"""
+    x = (width - door_width) // 2
+    stamp(room, block(door_width, depth + 1, fill, outline), x, height - depth)
+    return x
+
+def place_marker(room, x, y):
+    """Yellow disc where the NPC stands"""
+    stamp(room, disc(17, 17, (255, 255, 0), (255, 215, 0)), x - 8, y - 8)
+
+def create_bank_interior(width=320, height=240):
+    """Create a bank interior room layout"""
+    check_room('bank', width, height)
+    room = tile_floor(checker(16, *STONE_FLOOR), width, height)
+
     # Bank counter (top wall)
     counter_y = 40
-    draw.rectangle([40, counter_y, width - 40, counter_y + 30], fill=(139, 69, 19), outline=(101, 67, 33))
-    
-    # Vault doors on side walls
-    vault_width, vault_height = 24, 32
-    # Left wall vaults
-    draw.rectangle([10, 80, 10 + vault_width, 80 + vault_height], fill=(64, 64, 64), outline=(32, 32, 32))
-    draw.rectangle([10, 130, 10 + vault_width, 130 + vault_height], fill=(64, 64, 64), outline=(32, 32, 32))
-    
-    # Right wall vaults
-    draw.rectangle([width - 10 - vault_width, 80, width - 10, 80 + vault_height], fill=(64, 64, 64), outline=(32, 32, 32))
-    draw.rectangle([width - 10 - vault_width, 130, width - 10, 130 + vault_height], fill=(64, 64, 64), outline=(32, 32, 32))
-    
+    stamp(room, block(max(width - 79, 20), 31, WOOD, DARK_WOOD), 40, counter_y)
+
+    # Vault doors on side walls, spread down the wall
+    vault = block(25, 33, (64, 64, 64), (32, 32, 32))
+    rows = range(80, height - 70, 50)
+    stamp_all(room, vault, [(x, y) for y in rows for x in (10, width - 35)])
+
     # Entrance door at bottom
-    door_width = 40
-    door_x = (width - door_width) // 2
-    draw.rectangle([door_x, height - 20, door_x + door_width, height], fill=(101, 67, 33), outline=(80, 50, 25))
-    
+    place_door(room, width, height, 41, 20)
+
     # Bank clerk position marker
-    clerk_x = width // 2
-    clerk_y = counter_y - 20
-    draw.ellipse([clerk_x - 8, clerk_y - 8, clerk_x + 8, clerk_y + 8], fill=(255, 255, 0), outline=(255, 215, 0))
-    
+    place_marker(room, width // 2, counter_y - 20)
+
     # Wall torches
-    draw.ellipse([60, 20, 70, 30], fill=(255, 165, 0))  # Left torch
-    draw.ellipse([width - 70, 20, width - 60, 30], fill=(255, 165, 0))  # Right torch
-    
-    img.save('client/assets/interiors/bank_interior.png')
-    print("Created bank_interior.png (320x240)")
-
-def create_general_store_interior():
-    """Create a general store interior room layout"""
-    width, height = 280, 200
-    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Wooden plank floor
-    plank_width = 20
-    for y in range(0, height, plank_width):
-        # Alternate plank colors for wood grain effect
-        color = (139, 90, 43) if (y // plank_width) % 2 == 0 else (160, 100, 50)
-        draw.rectangle([0, y, width, y + plank_width], fill=color, outline=(101, 67, 33))
-    
+    stamp_all(room, disc(11, 11, (255, 165, 0)), [(60, 20), (width - 70, 20)])
+
+    return to_image(room)
+
+def create_general_store_interior(width=280, height=200, goods=((200, 170, 90), (120, 120, 120), (150, 60, 40)),
+                                  crate=WOOD):
+    """Create a shop interior room layout; goods and crate colours tell the shops apart"""
+    check_room('general_store', width, height)
+    room = wood_floor(width, height, 20)
+
     # Shop counter (left wall)
     counter_x = 20
-    draw.rectangle([counter_x, 40, counter_x + 30, height - 60], fill=(139, 69, 19), outline=(101, 67, 33))
-    
-    # Shelving units on walls
-    shelf_depth = 15
-    # Top wall shelves
-    draw.rectangle([60, 10, width - 60, 10 + shelf_depth], fill=(160, 82, 45), outline=(139, 69, 19))
-    draw.rectangle([60, 25, width - 60, 25 + shelf_depth], fill=(160, 82, 45), outline=(139, 69, 19))
-    
-    # Right wall shelves
-    draw.rectangle([width - 25, 50, width - 10, height - 80], fill=(160, 82, 45), outline=(139, 69, 19))
-    
-    # Storage barrels and crates
-    # Barrels
-    draw.ellipse([80, 120, 100, 140], fill=(101, 67, 33), outline=(80, 50, 25))
-    draw.ellipse([110, 140, 130, 160], fill=(101, 67, 33), outline=(80, 50, 25))
-    
-    # Crates
-    draw.rectangle([200, 130, 220, 150], fill=(139, 69, 19), outline=(101, 67, 33))
-    draw.rectangle([210, 110, 230, 130], fill=(139, 69, 19), outline=(101, 67, 33))
-    
+    stamp(room, block(31, max(height - 99, 20), WOOD, DARK_WOOD), counter_x, 40)
+
+    # Shelving units on walls: two along the top wall, one down the right wall
+    shelf = goods_shelf(max(width - 119, 20), 16, goods)
+    stamp_all(room, shelf, [(60, 10), (60, 25)])
+    stamp(room, block(16, max(height - 129, 16), LIGHT_WOOD, WOOD), width - 25, 50)
+
+    # Storage barrels and crates, towards the back right of the floor
+    stamp_all(room, disc(21, 21, DARK_WOOD, (80, 50, 25)), [(80, height - 80), (110, height - 60)])
+    stamp_all(room, block(21, 21, crate, DARK_WOOD), [(width - 80, height - 70), (width - 70, height - 90)])
+
     # Entrance door at bottom
-    door_width = 35
-    door_x = (width - door_width) // 2
-    draw.rectangle([door_x, height - 15, door_x + door_width, height], fill=(101, 67, 33), outline=(80, 50, 25))
-    
+    place_door(room, width, height, 36, 15)
+
     # Shopkeeper position marker
-    shopkeeper_x = counter_x - 15
-    shopkeeper_y = 100
-    draw.ellipse([shopkeeper_x - 8, shopkeeper_y - 8, shopkeeper_x + 8, shopkeeper_y + 8], fill=(255, 255, 0), outline=(255, 215, 0))
-    
+    place_marker(room, counter_x - 15, height // 2)
+
     # Hanging lanterns
-    draw.ellipse([100, 60, 110, 70], fill=(255, 215, 0))
-    draw.ellipse([180, 60, 190, 70], fill=(255, 215, 0))
-    
-    img.save('client/assets/interiors/general_store_interior.png')
-    print("Created general_store_interior.png (280x200)")
-
-def create_house_interior():
-    """Create a house interior room layout"""
-    width, height = 240, 180
-    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Wooden plank floor with rug
-    # Base floor
-    for y in range(0, height, 15):
-        color = (139, 90, 43) if (y // 15) % 2 == 0 else (160, 100, 50)
-        draw.rectangle([0, y, width, y + 15], fill=color, outline=(101, 67, 33))
-    
+    stamp_all(room, disc(11, 11, (255, 215, 0)), [(width * 5 // 14, 60), (width * 9 // 14, 60)])
+
+    return to_image(room)
+
+def create_house_interior(width=240, height=180, blanket=(0, 100, 200)):
+    """Create a house interior room layout; larger rooms get more beds"""
+    check_room('house', width, height)
+    room = wood_floor(width, height, 15)
+
     # Center rug
-    rug_x, rug_y = 80, 80
-    rug_w, rug_h = 80, 60
-    draw.rectangle([rug_x, rug_y, rug_x + rug_w, rug_y + rug_h], fill=(128, 0, 0), outline=(100, 0, 0))
-    
+    rug_x, rug_y = width // 3, height * 4 // 9
+    stamp(room, block(81, 61, (128, 0, 0), (100, 0, 0)), rug_x, rug_y)
+
     # Fireplace (left wall)
-    fireplace_w, fireplace_h = 40, 30
-    draw.rectangle([10, 40, 10 + fireplace_w, 40 + fireplace_h], fill=(64, 64, 64), outline=(32, 32, 32))
-    # Fire
-    draw.ellipse([15, 45, 45, 65], fill=(255, 69, 0))
-    draw.ellipse([20, 50, 40, 60], fill=(255, 215, 0))
-    
-    # Dining table (center)
-    table_w, table_h = 50, 30
-    table_x = (width - table_w) // 2
-    table_y = 90
-    draw.rectangle([table_x, table_y, table_x + table_w, table_y + table_h], fill=(160, 82, 45), outline=(139, 69, 19))
-    
-    # Chairs around table
-    chair_size = 12
-    # Top chair
-    draw.rectangle([table_x + table_w//2 - chair_size//2, table_y - chair_size - 5, 
-                   table_x + table_w//2 + chair_size//2, table_y - 5], fill=(139, 69, 19))
-    # Bottom chair
-    draw.rectangle([table_x + table_w//2 - chair_size//2, table_y + table_h + 5, 
-                   table_x + table_w//2 + chair_size//2, table_y + table_h + chair_size + 5], fill=(139, 69, 19))
-    
-    # Bed (top right corner)
-    bed_w, bed_h = 35, 50
-    bed_x = width - bed_w - 15
-    bed_y = 20
-    draw.rectangle([bed_x, bed_y, bed_x + bed_w, bed_y + bed_h], fill=(139, 69, 19), outline=(101, 67, 33))
-    # Blanket
-    draw.rectangle([bed_x + 3, bed_y + 3, bed_x + bed_w - 3, bed_y + bed_h - 3], fill=(0, 100, 200))
-    
+    stamp(room, fireplace(41, 31), 10, 40)
+
+    # Dining table with chairs, on the rug
+    stamp(room, dining_set(51, 31), rug_x + 15, rug_y - 7)
+
+    # Beds along the top right wall, one per 120px of room width beyond the first 120
+    beds = max(1, (width - 120) // 120)
+    stamp_all(room, bed(36, 51, blanket), [(width - 50 - i * 45, 20) for i in range(beds)])
+
     # Storage chest (bottom right)
-    chest_w, chest_h = 25, 20
-    draw.rectangle([width - chest_w - 15, height - chest_h - 30, width - 15, height - 30], 
-                  fill=(101, 67, 33), outline=(80, 50, 25))
-    
+    stamp(room, block(26, 21, DARK_WOOD, (80, 50, 25)), width - 40, height - 50)
+
     # Bookshelf (right wall)
-    shelf_w, shelf_h = 20, 60
-    draw.rectangle([width - shelf_w - 10, 90, width - 10, 90 + shelf_h], fill=(160, 82, 45), outline=(139, 69, 19))
-    
+    stamp(room, block(21, 61, LIGHT_WOOD, WOOD), width - 30, height // 2)
+
     # Entrance door at bottom
-    door_width = 30
-    door_x = (width - door_width) // 2
-    draw.rectangle([door_x, height - 12, door_x + door_width, height], fill=(101, 67, 33), outline=(80, 50, 25))
-    
+    place_door(room, width, height, 31, 12)
+
     # Windows
-    window_size = 15
-    # Left window
-    draw.rectangle([10, 10, 10 + window_size, 10 + window_size], fill=(173, 216, 230), outline=(0, 0, 0))
-    # Right window
-    draw.rectangle([width - 25, 10, width - 10, 25], fill=(173, 216, 230), outline=(0, 0, 0))
-    
-    img.save('client/assets/interiors/house_interior.png')
-    print("Created house_interior.png (240x180)")
-
-def create_magic_shop_interior():
+    stamp_all(room, block(16, 16, (173, 216, 230), (0, 0, 0)), [(10, 10), (width - 25, 10)])
+
+    return to_image(room)
+
+def create_inn_interior(width=320, height=240):
+    """Create an inn interior: a bar along the top wall and as many tables as the room fits"""
+    check_room('inn', width, height)
+    room = wood_floor(width, height, 16)
+
+    # Bar counter with barrels behind it
+    stamp(room, block(max(width - 119, 30), 25, WOOD, DARK_WOOD), 60, 40)
+    stamp_all(room, disc(17, 17, DARK_WOOD, (80, 50, 25)), [(x, 15) for x in range(70, width - 70, 30)])
+    place_marker(room, width // 2, 28)
+
+    # Tables in a grid over the rest of the floor
+    table = dining_set(41, 21)
+    columns = range(70, width - 70, 80)
+    rows = range(85, height - 70, 75)
+    stamp_all(room, table, [(x, y) for y in rows for x in columns])
+
+    # Fireplace (left wall) and entrance door
+    stamp(room, fireplace(31, 41), 10, height // 2 - 20)
+    place_door(room, width, height, 36, 15)
+
+    # Hanging lanterns
+    stamp_all(room, disc(11, 11, (255, 215, 0)), [(width // 4, 75), (width * 3 // 4, 75)])
+
+    return to_image(room)
+
+def create_magic_shop_interior(width=300, height=220, rune=(150, 100, 255),
+                               crystals=((150, 100, 255), (100, 150, 255), (255, 100, 150)), name='magic_shop'):
     """Create a magic shop interior room layout"""
-    width, height = 300, 220
-    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
+    check_room('magic_shop', width, height)
     # Dark stone floor with magical runes
-    tile_size = 20
-    for x in range(0, width, tile_size):
-        for y in range(0, height, tile_size):
-            draw.rectangle([x, y, x + tile_size, y + tile_size], fill=(40, 40, 60), outline=(20, 20, 40))
-            # Add magical rune symbols occasionally
-            if random.random() < 0.1:
-                draw.ellipse([x + 8, y + 8, x + 12, y + 12], fill=(150, 100, 255))
-    
-    # Curved counter (following tower shape)
-    counter_points = []
-    center_x, center_y = width // 2, 60
-    radius = 80
-    for angle in range(-45, 46, 5):
-        x = center_x + radius * (angle / 90)
-        y = center_y
-        counter_points.extend([x, y])
-        counter_points.extend([x, y + 25])
-    
-    if len(counter_points) >= 8:
-        draw.polygon(counter_points[:8], fill=(60, 30, 80), outline=(40, 20, 60))
-    
-    # Magical shop counter (simplified)
-    draw.rectangle([80, 50, 220, 75], fill=(60, 30, 80), outline=(40, 20, 60))
-    
-    # Crystal displays on counter
-    draw.ellipse([100, 45, 110, 55], fill=(150, 100, 255))
-    draw.ellipse([150, 45, 160, 55], fill=(100, 150, 255))
-    draw.ellipse([200, 45, 210, 55], fill=(255, 100, 150))
-    
+    floor = flagstone(20, MAGIC_STONES, (20, 20, 40), f'interiors/{name}_floor', stones=4, mark=rune,
+                      mark_chance=0.1)
+    room = tile_floor(floor, width, height)
+
+    # Magical shop counter with crystal displays
+    stamp(room, block(max(width - 159, 30), 26, MAGIC_WOOD, MAGIC_TRIM), 80, 50)
+    crystal_xs = [100 + i * max(width - 200, 0) // max(len(crystals) - 1, 1) for i in range(len(crystals))]
+    for x, color in zip(crystal_xs, crystals):
+        stamp(room, disc(11, 11, color), x, 45)
+
     # Tall bookshelves
-    shelf_w, shelf_h = 25, 100
-    # Left bookshelf
-    draw.rectangle([20, 80, 20 + shelf_w, 80 + shelf_h], fill=(80, 60, 100), outline=(60, 40, 80))
-    # Right bookshelf
-    draw.rectangle([width - 20 - shelf_w, 80, width - 20, 80 + shelf_h], fill=(80, 60, 100), outline=(60, 40, 80))
-    
-    # Magical workbench (left side)
-    bench_w, bench_h = 40, 25
-    draw.rectangle([30, 120, 30 + bench_w, 120 + bench_h], fill=(60, 30, 80), outline=(40, 20, 60))
-    
-    # Cauldron on workbench
-    draw.ellipse([40, 115, 60, 130], fill=(20, 20, 20), outline=(0, 0, 0))
-    
+    shelf = block(26, 101, (80, 60, 100), (60, 40, 80))
+    stamp_all(room, shelf, [(20, 80), (width - 45, 80)])
+
+    # Magical workbench (left side) with a cauldron on it
+    stamp(room, block(41, 26, MAGIC_WOOD, MAGIC_TRIM), 30, 120)
+    stamp(room, disc(21, 16, (20, 20, 20), (0, 0, 0)), 40, 115)
+
     # Crystal ball (right side)
-    draw.ellipse([220, 110, 240, 130], fill=(200, 200, 255), outline=(150, 150, 255))
-    
+    stamp(room, disc(21, 21, (200, 200, 255), (150, 150, 255)), width - 80, 110)
+
     # Spiral staircase (partial view in corner)
-    stair_x, stair_y = width - 60, height - 60
-    for i in range(5):
-        step_y = stair_y - i * 8
-        step_w = 50 - i * 5
-        draw.rectangle([stair_x, step_y, stair_x + step_w, step_y + 6], fill=(80, 60, 100))
-    
+    stamp(room, staircase(5, 51), width - 60, height - 92)
+
     # Entrance door at bottom with magical aura
-    door_width = 35
-    door_x = (width - door_width) // 2
-    draw.rectangle([door_x, height - 15, door_x + door_width, height], fill=(60, 30, 80), outline=(40, 20, 60))
-    
-    # Magical aura around door
-    for i in range(3):
-        aura_size = 40 + i * 10
-        draw.ellipse([door_x + door_width//2 - aura_size//2, height - 15 - aura_size//2,
-                     door_x + door_width//2 + aura_size//2, height - 15 + aura_size//2], 
-                    outline=(150 - i*30, 100 - i*20, 255 - i*30))
-    
+    door_x = place_door(room, width, height, 36, 15, MAGIC_WOOD, MAGIC_TRIM)
+    aura = ring(61, rune, rings=3, spacing=5)
+    stamp(room, aura, door_x + 18 - 30, height - 15 - 30)
+
     # Magic shop keeper position marker
-    keeper_x = width // 2
-    keeper_y = 35
-    draw.ellipse([keeper_x - 8, keeper_y - 8, keeper_x + 8, keeper_y + 8], fill=(255, 255, 0), outline=(255, 215, 0))
-    
-    # Magical orbs floating around room
-    orb_positions = [(60, 40), (240, 40), (50, 160), (250, 160)]
-    colors = [(150, 100, 255), (100, 150, 255), (255, 100, 150), (100, 255, 150)]
-    
-    for (x, y), color in zip(orb_positions, colors):
-        draw.ellipse([x - 5, y - 5, x + 5, y + 5], fill=color)
-        # Glow effect
-        draw.ellipse([x - 8, y - 8, x + 8, y + 8], outline=color)
-    
+    place_marker(room, width // 2, 35)
+
+    # Magical orbs floating around room, with a glow
+    orbs = [(60, 40), (width - 60, 40), (50, height - 60), (width - 50, height - 60)]
+    for (x, y), color in zip(orbs, [*crystals, (100, 255, 150)]):
+        stamp(room, disc(11, 11, color), x - 5, y - 5)
+        stamp(room, ring(17, color), x - 8, y - 8)
+
     # Wall runes for lighting
-    rune_positions = [(40, 20), (width - 40, 20), (20, height//2), (width - 20, height//2)]
-    for x, y in rune_positions:
-        draw.ellipse([x - 6, y - 6, x + 6, y + 6], fill=(150, 100, 255))
-    
-    img.save('client/assets/interiors/magic_shop_interior.png')
-    print("Created magic_shop_interior.png (300x220)")
-
-# Generate all interior layouts
-print("Generating building interior layouts...")
-
-create_bank_interior()
-create_general_store_interior()
-create_house_interior()
-create_magic_shop_interior()
-
-print("\nBuilding interiors generated successfully!")
-print("Interior rooms created:")
-print("- Bank Interior (320x240) - Stone floor, counter, vaults, clerk position")
-print("- General Store Interior (280x200) - Wooden shop, shelves, barrels, shopkeeper position")
-print("- House Interior (240x180) - Cozy home with fireplace, bed, table, storage")
-print("- Magic Shop Interior (300x220) - Mystical tower with magical elements, spell components")
-print("\nReplace these placeholder images with your AI-generated interiors!")
\ No newline at end of file
+    stamp_all(room, disc(13, 13, rune), [(34, 14), (width - 46, 14), (14, height // 2 - 6), (width - 26, height // 2 - 6)])
+
+    return to_image(room)
+
+# World builder building type -> layout and its arguments (room size first); shared layouts are
+# told apart by size, goods and colours
+INTERIORS = {
+    'bank': (create_bank_interior, (320, 240)),
+    'general_store': (create_general_store_interior, (280, 200)),
+    'weapon_shop': (create_general_store_interior, (280, 200, ((150, 150, 160), (110, 110, 120), (120, 80, 40)))),
+    'armor_shop': (create_general_store_interior, (300, 220, ((170, 170, 180), (90, 90, 100)), (100, 100, 110))),
+    'food_shop': (create_general_store_interior, (260, 200, ((200, 40, 40), (230, 200, 60), (80, 160, 60)))),
+    'archery_shop': (create_general_store_interior, (280, 200, ((160, 110, 60), (200, 200, 200)), (120, 80, 40))),
+    'house': (create_house_interior, (240, 180)),
+    'house_small': (create_house_interior, (200, 150, (120, 60, 160))),
+    'house_large': (create_house_interior, (360, 260, (0, 120, 90))),
+    'inn': (create_inn_interior, (320, 240)),
+    'magic_shop': (create_magic_shop_interior, (300, 220)),
+    'rune_shop': (create_magic_shop_interior, (260, 200, (230, 120, 60),
+                                                ((230, 120, 60), (80, 160, 255), (240, 240, 240)), 'rune_shop')),
+}
+
+def asset_jobs():
+    """Placeholder interior layouts; generated art replaces them"""
+    return [AssetJob(f'{INTERIORS_PATH}/{building}_interior.png', build, args, fallback=True)
+            for building, (build, args) in INTERIORS.items()]
+
+if __name__ == "__main__":
+    print("Generating building interior layouts...")
+    run_generator(asset_jobs())
+
+    print("\nBuilding interiors generated successfully!")
+    print("Interior rooms created:")
+    for building, (build, args) in INTERIORS.items():
+        print(f"- {building.replace('_', ' ').title()} ({args[0]}x{args[1]})")
+    print("\nReplace these placeholder images with your AI-generated interiors!")
@@ -1,126 +1,78 @@
+import json
+import time
+from functools import lru_cache
+
 from PIL import Image, ImageDraw
-import random
-import math
-import os
 
-# Create assets directories if they don't exist
-os.makedirs('client/assets/resources', exist_ok=True)
+from asset_registry import AssetJob, run_generator
+from asset_seed import asset_random, asset_rng
+from tileable import atlas, to_images
+from tree_renderer import TreeSpec, render_trees
 
-def create_high_quality_tree(name, trunk_color, leaf_color, style='oak'):
-    """Create a high-quality 48x48 tree sprite"""
-    img = Image.new('RGBA', (48, 48), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    if style == 'oak':
-        # Oak tree - classic RuneScape style
-        # Trunk
-        trunk_points = [
-            (20, 48), (28, 48),  # Base
-            (22, 30), (26, 30)   # Top
-        ]
-        draw.polygon(trunk_points, fill=trunk_color)
-        
-        # Main canopy circle
-        draw.ellipse([8, 8, 40, 40], fill=leaf_color)
-        
-        # Smaller overlapping circles for natural look
-        draw.ellipse([12, 12, 36, 36], fill=(leaf_color[0] + 10, leaf_color[1] + 10, leaf_color[2] + 10))
-        draw.ellipse([6, 14, 26, 34], fill=(leaf_color[0] - 5, leaf_color[1] - 5, leaf_color[2] - 5))
-        draw.ellipse([22, 14, 42, 34], fill=(leaf_color[0] - 5, leaf_color[1] - 5, leaf_color[2] - 5))
-        draw.ellipse([14, 6, 34, 26], fill=(leaf_color[0] - 8, leaf_color[1] - 8, leaf_color[2] - 8))
-        
-        # Trunk texture
-        draw.line([(21, 30), (21, 48)], fill=(trunk_color[0] - 20, trunk_color[1] - 20, trunk_color[2] - 20), width=1)
-        draw.line([(27, 30), (27, 48)], fill=(trunk_color[0] - 20, trunk_color[1] - 20, trunk_color[2] - 20), width=1)
-        
-    elif style == 'willow':
-        # Willow tree - drooping branches
-        # Trunk
-        draw.rectangle([22, 25, 26, 48], fill=trunk_color)
-        
-        # Main canopy (smaller and higher)
-        draw.ellipse([12, 5, 36, 25], fill=leaf_color)
-        
-        # Drooping branches
-        for i in range(8):
-            start_x = 14 + i * 3
-            start_y = 20
-            end_x = start_x + random.randint(-2, 2)
-            end_y = start_y + random.randint(10, 18)
-            
-            # Create curved drooping effect
-            for j in range(int(end_y - start_y)):
-                curve_x = start_x + int(math.sin(j * 0.3) * 2)
-                branch_y = start_y + j
-                if branch_y < 48:
-                    draw.point((curve_x, branch_y), fill=(leaf_color[0] - 10, leaf_color[1] - 10, leaf_color[2] - 10))
-                    # Add leaves along branches
-                    if j % 3 == 0:
-                        draw.ellipse([curve_x - 1, branch_y - 1, curve_x + 1, branch_y + 1], fill=leaf_color)
-    
-    elif style == 'maple':
-        # Maple tree - fuller, rounded canopy
-        # Trunk
-        draw.polygon([(19, 48), (29, 48), (25, 30), (23, 30)], fill=trunk_color)
-        
-        # Large main canopy
-        draw.ellipse([4, 6, 44, 38], fill=leaf_color)
-        
-        # Multiple overlapping sections for maple fullness
-        draw.ellipse([8, 10, 32, 34], fill=(leaf_color[0] + 15, leaf_color[1] + 5, leaf_color[2] + 5))
-        draw.ellipse([16, 10, 40, 34], fill=(leaf_color[0] + 15, leaf_color[1] + 5, leaf_color[2] + 5))
-        draw.ellipse([12, 4, 36, 28], fill=(leaf_color[0] + 20, leaf_color[1] + 10, leaf_color[2] + 10))
-        
-        # Add some texture spots
-        for _ in range(10):
-            x = random.randint(8, 40)
-            y = random.randint(8, 32)
-            if 8 <= x <= 40 and 8 <= y <= 32:
-                draw.ellipse([x-1, y-1, x+1, y+1], fill=(leaf_color[0] + 30, leaf_color[1] + 15, leaf_color[2] + 15))
-    
-    elif style == 'yew':
-        # Yew tree - coniferous, dark and dense
-        # Trunk
-        draw.rectangle([22, 30, 26, 48], fill=trunk_color)
-        
-        # Coniferous layers from bottom to top
-        layers = [
-            (18, 28, 30, 35),  # Bottom layer
-            (16, 22, 32, 30),  # Middle layer
-            (14, 16, 34, 25),  # Top layer
-            (20, 10, 28, 18),  # Peak
-        ]
-        
-        for layer in layers:
-            x1, y1, x2, y2 = layer
-            # Draw triangular/elliptical sections
-            draw.ellipse([x1, y1, x2, y2], fill=leaf_color)
-            # Add darker inner sections
-            draw.ellipse([x1+2, y1+1, x2-2, y2-1], fill=(leaf_color[0] - 15, leaf_color[1] - 15, leaf_color[2] - 15))
-    
-    # Add highlights and shadows for depth
-    # Highlights (lighter spots)
-    for _ in range(5):
-        x = random.randint(5, 42)
-        y = random.randint(5, 35)
-        if img.getpixel((x, y))[3] > 200:  # Only on solid pixels
-            draw.point((x, y), fill=(255, 255, 255, 100))
-    
-    # Shadows (darker spots)
-    for _ in range(8):
-        x = random.randint(5, 42)
-        y = random.randint(5, 35)
-        if img.getpixel((x, y))[3] > 200:  # Only on solid pixels
-            current = img.getpixel((x, y))
-            darker = (max(0, current[0] - 30), max(0, current[1] - 30), max(0, current[2] - 30), current[3])
-            draw.point((x, y), fill=darker)
-    
-    return img
+RESOURCES_PATH = 'client/assets/resources'
+TREE_MANIFEST_PATH = f'{RESOURCES_PATH}/tree_manifest.json'
+
+# world.js draws every tree at 48x48; the renderer takes any size
+TREE_SIZE = 48
+TREE_SIZES = (32, 48, 64, 96)
+
+# Seeded variants per species, written as one strip per species for world.js to pick from per tree
+TREE_VARIANTS = 8
+
+# Every woodcutting tier, lowest level first
+SPECIES = {
+    'normal': TreeSpec(bark=(101, 67, 33), leaves=(34, 139, 34), blobs=6, branches=2),
+    # Broad, heavy crown on a thick trunk
+    'oak': TreeSpec(bark=(101, 67, 33), leaves=(46, 125, 50), trunk_width=0.16, crown_width=0.4,
+                    crown_height=0.28, blobs=10, blob_size=(0.13, 0.21), branches=3),
+    # Small crown high up, curtained by drooping strands
+    'willow': TreeSpec(bark=(139, 90, 43), leaves=(120, 200, 110), trunk_height=0.55, crown_y=0.24,
+                       crown_width=0.32, crown_height=0.16, blobs=5, blob_size=(0.08, 0.14), strands=11),
+    # Full, rounded autumn crown
+    'maple': TreeSpec(bark=(101, 67, 33), leaves=(178, 34, 34), crown_width=0.42, crown_height=0.3,
+                      blobs=12, blob_size=(0.12, 0.19), texture=0.45),
+    # Dark, broad and squat layered conifer
+    'yew': TreeSpec(bark=(85, 60, 42), leaves=(0, 100, 0), trunk_height=0.3, trunk_width=0.16, crown_y=0.5,
+                    crown_width=0.4, crown_height=0.3, tiers=3, tone=6),
+    # Purple glowing leaves with sparkles
+    'magic': TreeSpec(bark=(90, 80, 110), leaves=(110, 70, 170), crown_width=0.38, blobs=9, branches=2,
+                      fruit=6, fruit_color=(220, 200, 255), fruit_size=0.022),
+    # Bowed trunk, fronds and coconuts
+    'palm': TreeSpec(bark=(150, 110, 60), leaves=(60, 150, 60), trunk_height=0.62, trunk_width=0.09, taper=0.7,
+                     bend=0.12, crown_y=0.32, crown_width=0.1, crown_height=0.05, fronds=7, fruit=3),
+    # Bare, forked branches
+    'dead': TreeSpec(bark=(110, 95, 80), leaves=(0, 0, 0), trunk_height=0.5, trunk_width=0.13, branches=5,
+                     branch_length=0.3),
+    # Tall, narrow conifer
+    'pine': TreeSpec(bark=(90, 60, 35), leaves=(20, 90, 50), trunk_height=0.25, trunk_width=0.1, crown_y=0.45,
+                     crown_width=0.3, crown_height=0.42, tiers=5, tone=5),
+}
+
+@lru_cache(maxsize=None)
+def tree_batch(size):
+    """Every variant of every species at one size, rendered in one batch (species by species)"""
+    specs = [spec for spec in SPECIES.values() for _ in range(TREE_VARIANTS)]
+    rngs = [asset_rng(f'resources/tree_{name}', variant) for name in SPECIES for variant in range(TREE_VARIANTS)]
+    return render_trees(specs, size, rngs)
+
+def tree_variants(name, size=TREE_SIZE):
+    """All variants of one species"""
+    index = list(SPECIES).index(name) * TREE_VARIANTS
+    return tree_batch(size)[index:index + TREE_VARIANTS]
+
+def create_high_quality_tree(name, size=TREE_SIZE):
+    """Create a tree sprite: the first variant of the species"""
+    return to_images(tree_variants(name, size)[:1])[0]
+
+def create_tree_variants(name, size=TREE_SIZE):
+    """Every variant of a species side by side, for world.js to pick from per tree"""
+    return atlas(tree_variants(name, size), TREE_VARIANTS)
 
 def create_detailed_stump():
     """Create a detailed tree stump"""
     img = Image.new('RGBA', (48, 48), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
+    rand = asset_random('resources/stump')
     
     # Main stump oval
     draw.ellipse([16, 32, 32, 46], fill=(101, 67, 33))
@@ -137,7 +89,7 @@ def create_detailed_stump():
     for i in range(15):
         y = 32 + i
         if y < 46:
-            variation = random.randint(-10, 10)
+            variation = rand.randint(-10, 10)
             color = (101 + variation, 67 + variation, 33 + variation)
             draw.line([(16, y), (32, y)], fill=color)
     
@@ -146,38 +98,43 @@ def create_detailed_stump():
     
     return img
 
-# Generate high-quality trees
-print("Generating high-quality tree sprites...")
-
-# Oak - traditional green
-oak_img = create_high_quality_tree('oak', (101, 67, 33), (46, 125, 50), 'oak')
-oak_img.save('client/assets/resources/tree_oak.png')
-print("Created tree_oak.png")
-
-# Willow - light green with drooping
-willow_img = create_high_quality_tree('willow', (139, 90, 43), (144, 238, 144), 'willow')
-willow_img.save('client/assets/resources/tree_willow.png')
-print("Created tree_willow.png")
-
-# Maple - reddish autumn colors
-maple_img = create_high_quality_tree('maple', (101, 67, 33), (178, 34, 34), 'maple')
-maple_img.save('client/assets/resources/tree_maple.png')
-print("Created tree_maple.png")
-
-# Yew - dark green, coniferous
-yew_img = create_high_quality_tree('yew', (85, 60, 42), (0, 100, 0), 'yew')
-yew_img.save('client/assets/resources/tree_yew.png')
-print("Created tree_yew.png")
-
-# Stump
-stump_img = create_detailed_stump()
-stump_img.save('client/assets/resources/stump.png')
-print("Created stump.png")
-
-print("\nHigh-quality tree sprites generated!")
-print("Features:")
-print("- Clean, RuneScape-style appearance")
-print("- Proper trunk proportions")
-print("- Layered canopies for depth")
-print("- Species-specific characteristics")
-print("- 48x48 size (1.5x player size)")
\ No newline at end of file
+def create_tree_manifest():
+    """Sprite, variant strip and cell size of every species, so the client registers whatever is drawn here"""
+    client_path = RESOURCES_PATH.removeprefix('client/')
+    manifest = {
+        name: {
+            'sprite': f'{client_path}/tree_{name}.png',
+            'variants': f'{client_path}/tree_{name}_variants.png',
+            'cell': TREE_SIZE,
+            'count': TREE_VARIANTS,
+        }
+        for name in SPECIES
+    }
+    return json.dumps(manifest, indent=1, sort_keys=True)
+
+def asset_jobs():
+    """Every tree sprite and variant strip this script draws, the stump and the manifest listing the species"""
+    return [
+        *(AssetJob(f'{RESOURCES_PATH}/tree_{name}.png', create_high_quality_tree, (name,)) for name in SPECIES),
+        *(AssetJob(f'{RESOURCES_PATH}/tree_{name}_variants.png', create_tree_variants, (name,)) for name in SPECIES),
+        # Stump
+        AssetJob(f'{RESOURCES_PATH}/stump.png', create_detailed_stump),
+        AssetJob(TREE_MANIFEST_PATH, create_tree_manifest),
+    ]
+
+if __name__ == "__main__":
+    print("Generating high-quality tree sprites...")
+    run_generator(asset_jobs())
+
+    print(f"\nAll {len(SPECIES)} species x {TREE_VARIANTS} variants in one batch per size:")
+    for size in TREE_SIZES:
+        start = time.perf_counter()
+        tree_batch.__wrapped__(size)
+        print(f"  {size}x{size}: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    print("\nHigh-quality tree sprites generated!")
+    print("Features:")
+    print("- Trunks, canopy blobs, strands and fronds drawn as shape fields at any size")
+    print(f"- {TREE_VARIANTS} seeded variants per species")
+    print("- Lit from the upper left, with darker rims between clumps")
+    print("- Species-specific characteristics")
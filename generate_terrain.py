@@ -1,311 +1,231 @@
-from PIL import Image, ImageDraw
-import random
-import os
-
-# Create assets directories if they don't exist
-os.makedirs('client/assets/tiles', exist_ok=True)
-
-def add_noise(img, variation=10):
-    """Add subtle noise to make textures less uniform"""
-    pixels = img.load()
-    width, height = img.size
-    for x in range(width):
-        for y in range(height):
-            r, g, b, a = pixels[x, y]
-            # Add random variation
-            r = max(0, min(255, r + random.randint(-variation, variation)))
-            g = max(0, min(255, g + random.randint(-variation, variation)))
-            b = max(0, min(255, b + random.randint(-variation, variation)))
-            pixels[x, y] = (r, g, b, a)
-    return img
+from functools import lru_cache
+
+import numpy as np
+
+from asset_registry import AssetJob, run_generator
+from asset_seed import asset_rng
+from tileable import (atlas, colorize, fractal_noise, grain, seam_error, to_images, wrap_put, wrap_speckle,
+                      wrap_stamps, wrap_strokes)
+
+TILES_PATH = 'client/assets/tiles'
+TILE_SIZE = 32
+
+# Base colour of the plain grass tile and of grass1..grass3
+GRASS_BASES = [
+    (46, 125, 50),   # Medium green
+    (50, 135, 45),
+    (42, 128, 48),
+    (48, 140, 52),
+]
+
+# Batched grass variants for world.js, written as one atlas (GRASS_ATLAS_COLUMNS tiles wide)
+GRASS_VARIANT_COUNT = 64
+GRASS_ATLAS_COLUMNS = 8
+
+# Grass blades and single dots
+BLADE_COLORS = [
+    (34, 139, 34),   # Forest green
+    (46, 125, 50),   # Medium green
+    (60, 121, 60),   # Slightly lighter
+    (50, 130, 50),   # Mid green
+]
+
+def shade_ramp(base, spread):
+    """Dark -> base -> light colour stops around a base colour"""
+    return [tuple(max(0, c - spread) for c in base), tuple(base), tuple(min(255, c + spread) for c in base)]
+
+def draw_grass(rng, bases, blades, dots, spots, persistence=0.5):
+    """len(bases) grass tiles in one pass; every other argument is one value for all or one per tile"""
+    count = len(bases)
+
+    # Rolling light and dark patches in each tile's own colour
+    field = fractal_noise(rng, count, TILE_SIZE, period=4, octaves=3, persistence=persistence)
+    tiles = colorize(field, [shade_ramp(base, 16) for base in bases])
+
+    wrap_strokes(tiles, blades, BLADE_COLORS, dx=(-1, 1), dy=-2, rng=rng)
+    wrap_speckle(tiles, dots, BLADE_COLORS, variation=15, rng=rng)
 
-def create_grass_tile():
-    """Create a detailed RuneScape-style grass tile"""
-    img = Image.new('RGBA', (32, 32), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Base grass color with variation
-    base_colors = [
-        (34, 139, 34),   # Forest green
-        (46, 125, 50),   # Medium green
-        (60, 121, 60),   # Slightly lighter
-        (50, 130, 50),   # Mid green
-    ]
-    
-    # Fill with base color
-    draw.rectangle([0, 0, 31, 31], fill=(46, 125, 50, 255))
-    
-    # Add grass texture pattern
-    for i in range(200):
-        x = random.randint(0, 31)
-        y = random.randint(0, 31)
-        color = random.choice(base_colors)
-        # Draw small grass blades
-        if random.random() > 0.5:
-            draw.line([(x, y), (x, y-2)], fill=(*color, 255), width=1)
-        else:
-            draw.point((x, y), fill=(*color, 255))
-    
     # Add darker spots for depth
-    for i in range(30):
-        x = random.randint(2, 29)
-        y = random.randint(2, 29)
-        size = random.randint(1, 2)
-        draw.ellipse([x, y, x+size, y+size], fill=(30, 100, 30, 100))
-    
+    wrap_stamps(tiles, spots, [(30, 100, 30, 100)], width=(1, 2), rng=rng)
+
     # Add highlights
-    for i in range(20):
-        x = random.randint(0, 31)
-        y = random.randint(0, 31)
-        draw.point((x, y), fill=(80, 160, 80, 200))
-    
-    img = add_noise(img, 5)
-    img.save('client/assets/tiles/grass.png')
-    print("Created grass.png")
+    wrap_speckle(tiles, 20, [(80, 160, 80, 200)], rng=rng)
+
+    return grain(tiles, 4, rng=rng)
+
+@lru_cache(maxsize=None)
+def grass_set():
+    """Every grass tile (plain grass and its variants) in one batched pass"""
+    # The variants get denser patterns
+    return draw_grass(asset_rng('tiles/grass'), GRASS_BASES, blades=[100, 120, 130, 140],
+                      dots=[100, 150, 180, 210], spots=30)
+
+def grass_variants(count, rng=None):
+    """count grass tiles in one pass, each with its own colour, patchiness and blade, dot and spot counts"""
+    rng = rng if rng is not None else asset_rng('tiles/grass_variants', count)
+
+    # Jitter around the plain grass colour: a slight brightness shift plus a slighter per-channel tint,
+    # small enough that neighbouring variants do not read as a patchwork
+    base = np.array(GRASS_BASES[0])
+    bases = np.clip(base + rng.integers(-4, 5, (count, 1)) + rng.integers(-2, 3, (count, 3)), 0, 255)
+    return draw_grass(rng, [tuple(color) for color in bases.tolist()],
+                      blades=rng.integers(70, 171, count), dots=rng.integers(80, 231, count),
+                      spots=rng.integers(15, 46, count), persistence=rng.uniform(0.35, 0.65, count))
+
+def create_grass_atlas(count=GRASS_VARIANT_COUNT, columns=GRASS_ATLAS_COLUMNS):
+    """Every batched grass variant on one image for world.js to pick from per tile"""
+    return atlas(grass_variants(count), columns)
+
+def create_grass_tile():
+    """Create a detailed RuneScape-style grass tile"""
+    return to_images(grass_set()[:1])[0]
 
 def create_grass_variant(variant_num):
     """Create grass variants for less repetition"""
-    img = Image.new('RGBA', (32, 32), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Slightly different base colors for variants
-    if variant_num == 1:
-        base = (50, 135, 45)
-    elif variant_num == 2:
-        base = (42, 128, 48)
-    else:
-        base = (48, 140, 52)
-    
-    draw.rectangle([0, 0, 31, 31], fill=(*base, 255))
-    
-    # Different pattern density
-    density = 150 + (variant_num * 30)
-    for i in range(density):
-        x = random.randint(0, 31)
-        y = random.randint(0, 31)
-        variation = random.randint(-15, 15)
-        color = (base[0] + variation, base[1] + variation, base[2] + variation)
-        color = tuple(max(0, min(255, c)) for c in color)
-        draw.point((x, y), fill=(*color, 255))
-    
-    # Add some texture
-    for i in range(20 + variant_num * 5):
-        x = random.randint(1, 30)
-        y = random.randint(1, 30)
-        if random.random() > 0.5:
-            draw.line([(x, y), (x+1, y)], fill=(30, 100, 30, 150), width=1)
-    
-    img = add_noise(img, 4)
-    img.save(f'client/assets/tiles/grass{variant_num}.png')
-    print(f"Created grass{variant_num}.png")
+    return to_images(grass_set()[variant_num:variant_num + 1])[0]
 
 def create_dirt_tile():
     """Create a detailed RuneScape-style dirt/path tile"""
-    img = Image.new('RGBA', (32, 32), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
+    rng = asset_rng('tiles/dirt')
+
     # Base dirt color
+    tile = colorize(fractal_noise(rng, 1, TILE_SIZE, period=4, octaves=3),
+                    [(125, 78, 35), (145, 85, 40), (160, 95, 48)])
+
+    # Add dirt texture
     base_colors = [
         (139, 90, 43),   # Saddle brown
         (160, 82, 45),   # Sienna
         (150, 85, 40),   # Dirt brown
         (130, 80, 35),   # Darker dirt
     ]
-    
-    draw.rectangle([0, 0, 31, 31], fill=(145, 85, 40, 255))
-    
-    # Add dirt texture
-    for i in range(300):
-        x = random.randint(0, 31)
-        y = random.randint(0, 31)
-        color = random.choice(base_colors)
-        draw.point((x, y), fill=(*color, 255))
-    
+    wrap_speckle(tile, 200, base_colors, rng=rng)
+
     # Add small stones/pebbles
-    for i in range(15):
-        x = random.randint(2, 29)
-        y = random.randint(2, 29)
-        size = random.randint(1, 2)
-        stone_color = (100 + random.randint(-20, 20), 90 + random.randint(-20, 20), 80)
-        draw.ellipse([x, y, x+size, y+size], fill=(*stone_color, 255))
-    
+    wrap_stamps(tile, 15, [(100, 90, 80)], width=(1, 2), variation=20, rng=rng)
+
     # Add cracks/lines
-    for i in range(5):
-        x1 = random.randint(0, 31)
-        y1 = random.randint(0, 31)
-        x2 = x1 + random.randint(-5, 5)
-        y2 = y1 + random.randint(-5, 5)
-        draw.line([(x1, y1), (x2, y2)], fill=(100, 60, 30, 150), width=1)
-    
-    img = add_noise(img, 8)
-    img.save('client/assets/tiles/dirt.png')
-    print("Created dirt.png")
+    wrap_strokes(tile, 5, [(100, 60, 30, 150)], dx=(-5, 5), dy=(-5, 5), rng=rng)
+
+    return to_images(grain(tile, 8, rng=rng))[0]
 
 def create_path_tile():
     """Create a worn path tile"""
-    img = Image.new('RGBA', (32, 32), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
+    rng = asset_rng('tiles/path')
+
     # Lighter dirt for paths
-    draw.rectangle([0, 0, 31, 31], fill=(165, 125, 85, 255))
-    
+    tile = colorize(fractal_noise(rng, 1, TILE_SIZE, period=2, octaves=4),
+                    [(150, 110, 72), (165, 125, 85), (180, 140, 100)])
+
     # Add worn texture
-    for i in range(200):
-        x = random.randint(0, 31)
-        y = random.randint(0, 31)
-        variation = random.randint(-20, 20)
-        color = (165 + variation, 125 + variation, 85 + variation)
-        color = tuple(max(0, min(255, c)) for c in color)
-        draw.point((x, y), fill=(*color, 255))
-    
+    wrap_speckle(tile, 150, [(165, 125, 85)], variation=20, rng=rng)
+
     # Add foot traffic wear
-    for i in range(10):
-        x = random.randint(5, 26)
-        y = random.randint(5, 26)
-        draw.ellipse([x, y, x+3, y+2], fill=(155, 115, 75, 100))
-    
-    img = add_noise(img, 6)
-    img.save('client/assets/tiles/path.png')
-    print("Created path.png")
+    wrap_stamps(tile, 10, [(155, 115, 75, 100)], width=3, height=2, rng=rng)
+
+    return to_images(grain(tile, 6, rng=rng))[0]
 
 def create_stone_tile():
     """Create a detailed stone/rock tile"""
-    img = Image.new('RGBA', (32, 32), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Base stone color
-    draw.rectangle([0, 0, 31, 31], fill=(105, 105, 105, 255))
-    
-    # Add stone texture with cracks
-    for i in range(250):
-        x = random.randint(0, 31)
-        y = random.randint(0, 31)
-        variation = random.randint(-25, 25)
-        gray = 105 + variation
-        gray = max(0, min(255, gray))
-        draw.point((x, y), fill=(gray, gray, gray, 255))
-    
+    rng = asset_rng('tiles/stone')
+
+    # Base stone color in blocky value noise
+    tile = colorize(fractal_noise(rng, 1, TILE_SIZE, period=4, octaves=2, kind='value'),
+                    [(82, 82, 82), (105, 105, 105), (128, 128, 128)])
+
+    # Add stone texture
+    wrap_speckle(tile, 200, [(105, 105, 105)], variation=25, rng=rng)
+
     # Add darker cracks
-    for i in range(8):
-        x1 = random.randint(0, 31)
-        y1 = random.randint(0, 31)
-        x2 = x1 + random.randint(-8, 8)
-        y2 = y1 + random.randint(-8, 8)
-        draw.line([(x1, y1), (x2, y2)], fill=(60, 60, 60, 200), width=1)
-    
+    wrap_strokes(tile, 8, [(60, 60, 60, 200)], dx=(-8, 8), dy=(-8, 8), rng=rng)
+
     # Add some moss/weathering
-    for i in range(5):
-        x = random.randint(2, 29)
-        y = random.randint(2, 29)
-        draw.ellipse([x, y, x+3, y+3], fill=(85, 105, 85, 80))
-    
-    img = add_noise(img, 10)
-    img.save('client/assets/tiles/stone.png')
-    print("Created stone.png")
+    wrap_stamps(tile, 5, [(85, 105, 85, 80)], width=3, rng=rng)
+
+    return to_images(grain(tile, 10, rng=rng))[0]
 
 def create_water_tile():
     """Create an animated-looking water tile"""
-    img = Image.new('RGBA', (32, 32), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Base water color
-    draw.rectangle([0, 0, 31, 31], fill=(28, 107, 160, 255))
-    
+    rng = asset_rng('tiles/water')
+
+    # Base water color with slow swells
+    tile = colorize(fractal_noise(rng, 1, TILE_SIZE, period=2, octaves=3),
+                    [(22, 96, 148), (28, 107, 160), (38, 122, 180)])
+
     # Add water ripples
-    for i in range(100):
-        x = random.randint(0, 31)
-        y = random.randint(0, 31)
-        variation = random.randint(-20, 30)
-        blue = 160 + variation
-        blue = max(0, min(255, blue))
-        draw.point((x, y), fill=(28, 107, blue, 255))
-    
-    # Add wave patterns
-    for y in range(0, 32, 4):
-        for x in range(32):
-            if (x + y) % 8 < 4:
-                draw.point((x, y), fill=(40, 120, 180, 200))
-    
+    wrap_speckle(tile, 100, [(28, 107, blue) for blue in range(140, 191)], rng=rng)
+
+    # Add wave patterns (every 4th row, period 8 along x, so they continue across edges)
+    ys, xs = np.mgrid[0:TILE_SIZE:4, 0:TILE_SIZE]
+    wave = (xs + ys) % 8 < 4
+    colors = np.broadcast_to(np.array([40, 120, 180, 200], dtype=np.uint8), (int(wave.sum()), 4))
+    wrap_put(tile, np.zeros(len(colors), dtype=int), xs[wave], ys[wave], colors)
+
     # Add highlights for water shimmer
-    for i in range(15):
-        x = random.randint(0, 31)
-        y = random.randint(0, 31)
-        draw.point((x, y), fill=(100, 180, 220, 180))
-    
-    img = add_noise(img, 5)
-    img.save('client/assets/tiles/water.png')
-    print("Created water.png")
+    wrap_speckle(tile, 15, [(100, 180, 220, 180)], rng=rng)
+
+    return to_images(grain(tile, 5, rng=rng))[0]
 
 def create_sand_tile():
     """Create a sandy beach tile"""
-    img = Image.new('RGBA', (32, 32), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Base sand color
-    draw.rectangle([0, 0, 31, 31], fill=(238, 203, 173, 255))
-    
+    rng = asset_rng('tiles/sand')
+
+    # Base sand color with gentle dunes
+    tile = colorize(fractal_noise(rng, 1, TILE_SIZE, period=2, octaves=3),
+                    [(226, 190, 160), (238, 203, 173), (246, 214, 186)])
+
     # Add sand texture
-    for i in range(400):
-        x = random.randint(0, 31)
-        y = random.randint(0, 31)
-        variation = random.randint(-15, 15)
-        color = (238 + variation, 203 + variation, 173 + variation)
-        color = tuple(max(0, min(255, c)) for c in color)
-        draw.point((x, y), fill=(*color, 255))
-    
+    wrap_speckle(tile, 250, [(238, 203, 173)], variation=15, rng=rng)
+
     # Add small shells/stones
-    for i in range(5):
-        x = random.randint(2, 29)
-        y = random.randint(2, 29)
-        draw.point((x, y), fill=(255, 240, 220, 255))
-    
-    img = add_noise(img, 5)
-    img.save('client/assets/tiles/sand.png')
-    print("Created sand.png")
+    wrap_speckle(tile, 5, [(255, 240, 220)], rng=rng)
+
+    return to_images(grain(tile, 5, rng=rng))[0]
 
 def create_mud_tile():
     """Create a muddy/swamp tile"""
-    img = Image.new('RGBA', (32, 32), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
+    rng = asset_rng('tiles/mud')
+
     # Base mud color
-    draw.rectangle([0, 0, 31, 31], fill=(74, 65, 42, 255))
-    
+    tile = colorize(fractal_noise(rng, 1, TILE_SIZE, period=4, octaves=3),
+                    [(62, 54, 34), (74, 65, 42), (86, 76, 50)])
+
     # Add mud texture
-    for i in range(300):
-        x = random.randint(0, 31)
-        y = random.randint(0, 31)
-        variation = random.randint(-10, 10)
-        color = (74 + variation, 65 + variation, 42 + variation)
-        color = tuple(max(0, min(255, c)) for c in color)
-        draw.point((x, y), fill=(*color, 255))
-    
+    wrap_speckle(tile, 200, [(74, 65, 42)], variation=10, rng=rng)
+
     # Add wet spots
-    for i in range(8):
-        x = random.randint(3, 28)
-        y = random.randint(3, 28)
-        draw.ellipse([x, y, x+4, y+3], fill=(60, 55, 35, 150))
-    
-    img = add_noise(img, 8)
-    img.save('client/assets/tiles/mud.png')
-    print("Created mud.png")
-
-# Generate all tiles
-print("Generating RuneScape-style terrain tiles...")
-create_grass_tile()
-create_grass_variant(1)
-create_grass_variant(2)
-create_grass_variant(3)
-create_dirt_tile()
-create_path_tile()
-create_stone_tile()
-create_water_tile()
-create_sand_tile()
-create_mud_tile()
-
-print("\nAll terrain tiles generated successfully!")
-print("Tiles are more detailed with:")
-print("- Texture variation and noise")
-print("- Multiple grass variants to reduce repetition")
-print("- Proper RuneScape-style colors")
-print("- Details like grass blades, stones, cracks")
\ No newline at end of file
+    wrap_stamps(tile, 8, [(60, 55, 35, 150)], width=4, height=3, rng=rng)
+
+    return to_images(grain(tile, 8, rng=rng))[0]
+
+def asset_jobs():
+    """Every terrain tile this script draws"""
+    return [
+        AssetJob(f'{TILES_PATH}/grass.png', create_grass_tile),
+        *(AssetJob(f'{TILES_PATH}/grass{variant}.png', create_grass_variant, (variant,)) for variant in (1, 2, 3)),
+        AssetJob(f'{TILES_PATH}/grass_variants.png', create_grass_atlas),
+        AssetJob(f'{TILES_PATH}/dirt.png', create_dirt_tile),
+        AssetJob(f'{TILES_PATH}/path.png', create_path_tile),
+        AssetJob(f'{TILES_PATH}/stone.png', create_stone_tile),
+        AssetJob(f'{TILES_PATH}/water.png', create_water_tile),
+        AssetJob(f'{TILES_PATH}/sand.png', create_sand_tile),
+        AssetJob(f'{TILES_PATH}/mud.png', create_mud_tile),
+    ]
+
+if __name__ == "__main__":
+    print("Generating RuneScape-style terrain tiles...")
+    run_generator(asset_jobs())
+
+    print("\nSeam error when repeated (about 1 or less is seamless):")
+    for job in asset_jobs():
+        if job.build is not create_grass_atlas:
+            print(f"  {job.output}: {seam_error(job.build(*job.args)):.2f}")
+    variant_errors = seam_error(grass_variants(GRASS_VARIANT_COUNT))
+    print(f"  {TILES_PATH}/grass_variants.png: {variant_errors.mean():.2f} average, {variant_errors.max():.2f} worst")
+
+    print("\nAll terrain tiles generated successfully!")
+    print("Tiles are more detailed with:")
+    print("- Seamless noise and details that wrap across tile edges")
+    print(f"- {GRASS_VARIANT_COUNT} batched grass variants in one atlas to reduce repetition")
+    print("- Proper RuneScape-style colors")
+    print("- Details like grass blades, stones, cracks")
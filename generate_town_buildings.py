@@ -1,255 +1,135 @@
-from PIL import Image, ImageDraw
-import random
+import json
 import os
+import time
 
-# Create assets directories if they don't exist
-os.makedirs('client/assets/buildings', exist_ok=True)
+import numpy as np
+from PIL import Image, ImageDraw
 
-def create_building_base(width, height, wall_color, roof_color):
-    """Create a basic building structure"""
-    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Calculate roof height (about 1/3 of total height)
-    roof_height = height // 3
-    wall_height = height - roof_height
-    
-    # Draw walls
-    draw.rectangle([0, roof_height, width-1, height-1], fill=wall_color, outline=(0, 0, 0))
-    
-    # Draw roof (triangle)
-    roof_points = [
-        (0, roof_height),           # Left base
-        (width//2, 0),              # Peak
-        (width-1, roof_height)      # Right base
-    ]
-    draw.polygon(roof_points, fill=roof_color, outline=(0, 0, 0))
-    
-    return img, draw, roof_height, wall_height
+from asset_registry import AssetJob, run_generator
+from asset_seed import asset_rng
+from building_parts import DOORS, ROOFS, WALLS, WINDOWS, BuildingLayout, PartsAtlas, compose
+from floor_tiling import to_image
 
-def create_bank():
-    """Create a RuneScape-style bank building"""
-    width, height = 96, 80
-    img, draw, roof_height, wall_height = create_building_base(
-        width, height,
-        (180, 150, 120),  # Light stone walls
-        (120, 80, 60)     # Brown roof
-    )
-    
-    # Bank entrance (double doors)
-    door_width = 16
-    door_height = 24
-    door_x = (width - door_width) // 2
-    door_y = height - door_height
-    
-    # Draw double doors
-    draw.rectangle([door_x, door_y, door_x + door_width//2 - 1, height-1], 
-                  fill=(80, 50, 30), outline=(60, 40, 20))
-    draw.rectangle([door_x + door_width//2 + 1, door_y, door_x + door_width, height-1], 
-                  fill=(80, 50, 30), outline=(60, 40, 20))
-    
-    # Door handles
-    draw.ellipse([door_x + 3, door_y + door_height//2 - 1, door_x + 5, door_y + door_height//2 + 1], 
-                fill=(255, 215, 0))  # Gold handle
-    draw.ellipse([door_x + door_width - 5, door_y + door_height//2 - 1, door_x + door_width - 3, door_y + door_height//2 + 1], 
-                fill=(255, 215, 0))  # Gold handle
-    
-    # Bank windows
-    window_size = 12
-    window_y = roof_height + 8
-    
-    # Left window
-    draw.rectangle([15, window_y, 15 + window_size, window_y + window_size], 
-                  fill=(100, 150, 255), outline=(0, 0, 0))
-    draw.line([(15 + window_size//2, window_y), (15 + window_size//2, window_y + window_size)], 
-             fill=(0, 0, 0))
-    draw.line([(15, window_y + window_size//2), (15 + window_size, window_y + window_size//2)], 
-             fill=(0, 0, 0))
-    
-    # Right window
-    draw.rectangle([width - 15 - window_size, window_y, width - 15, window_y + window_size], 
-                  fill=(100, 150, 255), outline=(0, 0, 0))
-    draw.line([(width - 15 - window_size//2, window_y), (width - 15 - window_size//2, window_y + window_size)], 
-             fill=(0, 0, 0))
-    draw.line([(width - 15 - window_size, window_y + window_size//2), (width - 15, window_y + window_size//2)], 
-             fill=(0, 0, 0))
-    
-    # Bank sign above door
-    sign_width = 32
-    sign_height = 8
-    sign_x = (width - sign_width) // 2
-    sign_y = door_y - 12
-    
-    draw.rectangle([sign_x, sign_y, sign_x + sign_width, sign_y + sign_height], 
-                  fill=(255, 215, 0), outline=(0, 0, 0))
-    
-    # Add roof tiles texture
-    for i in range(0, width, 8):
-        for j in range(5, roof_height, 6):
-            if i < width - 4 and j < roof_height - 2:
-                # Simple tile pattern
-                tile_y = int(j + (i % 16) * 0.1)  # Slight offset for realism
-                if tile_y < roof_height:
-                    draw.rectangle([i, tile_y, i + 6, tile_y + 4], 
-                                 fill=(100, 65, 45), outline=(80, 50, 35))
-    
-    img.save('client/assets/buildings/bank.png')
-    print("Created bank.png (96x80)")
+BUILDINGS_PATH = 'client/assets/buildings'
+TOWN_PATH = f'{BUILDINGS_PATH}/town'
+TOWN_MANIFEST_PATH = f'{TOWN_PATH}/town_manifest.json'
 
-def create_general_store():
-    """Create a general store building"""
-    width, height = 80, 64
-    img, draw, roof_height, wall_height = create_building_base(
-        width, height,
-        (150, 120, 90),   # Wooden walls
-        (100, 60, 40)     # Dark brown roof
-    )
-    
-    # Store entrance
-    door_width = 12
-    door_height = 20
-    door_x = (width - door_width) // 2
-    door_y = height - door_height
-    
-    draw.rectangle([door_x, door_y, door_x + door_width, height-1], 
-                  fill=(80, 50, 30), outline=(60, 40, 20))
-    
-    # Door handle
-    draw.ellipse([door_x + door_width - 4, door_y + door_height//2 - 1, 
-                 door_x + door_width - 2, door_y + door_height//2 + 1], 
-                fill=(139, 69, 19))
-    
-    # Store window (larger, for displaying goods)
-    window_width = 20
-    window_height = 14
-    window_x = 12
-    window_y = roof_height + 6
-    
-    draw.rectangle([window_x, window_y, window_x + window_width, window_y + window_height], 
-                  fill=(100, 150, 255), outline=(0, 0, 0))
-    
-    # Window cross pattern
-    draw.line([(window_x + window_width//2, window_y), (window_x + window_width//2, window_y + window_height)], 
-             fill=(0, 0, 0))
-    draw.line([(window_x, window_y + window_height//2), (window_x + window_width, window_y + window_height//2)], 
-             fill=(0, 0, 0))
-    
-    # Shop sign
-    sign_width = 28
-    sign_height = 6
-    sign_x = (width - sign_width) // 2
-    sign_y = door_y - 10
-    
-    draw.rectangle([sign_x, sign_y, sign_x + sign_width, sign_y + sign_height], 
-                  fill=(200, 180, 120), outline=(0, 0, 0))
-    
-    img.save('client/assets/buildings/general_store.png')
-    print("Created general_store.png (80x64)")
+# Random town buildings written as one packed sheet per scale (.env: TOWN_BUILDINGS,
+# TOWN_BUILDING_SCALES), plus a manifest of where each building sits
+TOWN_BUILDINGS = int(os.getenv('TOWN_BUILDINGS', '200'))
+TOWN_SCALES = tuple(int(scale) for scale in os.getenv('TOWN_BUILDING_SCALES', '1,2,3').split(','))
 
-def create_house():
-    """Create a regular house"""
-    width, height = 64, 48
-    img, draw, roof_height, wall_height = create_building_base(
-        width, height,
-        (160, 140, 100),  # Light brown walls
-        (120, 80, 60)     # Brown roof
-    )
-    
-    # House door
-    door_width = 10
-    door_height = 16
-    door_x = (width - door_width) // 2
-    door_y = height - door_height
-    
-    draw.rectangle([door_x, door_y, door_x + door_width, height-1], 
-                  fill=(100, 60, 40), outline=(80, 50, 30))
-    
-    # Door handle
-    draw.ellipse([door_x + door_width - 3, door_y + door_height//2 - 1, 
-                 door_x + door_width - 1, door_y + door_height//2 + 1], 
-                fill=(139, 69, 19))
-    
-    # House windows
-    window_size = 8
-    window_y = roof_height + 4
-    
-    # Left window
-    draw.rectangle([8, window_y, 8 + window_size, window_y + window_size], 
-                  fill=(100, 150, 255), outline=(0, 0, 0))
-    draw.line([(8 + window_size//2, window_y), (8 + window_size//2, window_y + window_size)], 
-             fill=(0, 0, 0))
-    draw.line([(8, window_y + window_size//2), (8 + window_size, window_y + window_size//2)], 
-             fill=(0, 0, 0))
-    
-    # Right window
-    draw.rectangle([width - 8 - window_size, window_y, width - 8, window_y + window_size], 
-                  fill=(100, 150, 255), outline=(0, 0, 0))
-    draw.line([(width - 8 - window_size//2, window_y), (width - 8 - window_size//2, window_y + window_size)], 
-             fill=(0, 0, 0))
-    draw.line([(width - 8 - window_size, window_y + window_size//2), (width - 8, window_y + window_size//2)], 
-             fill=(0, 0, 0))
-    
-    img.save('client/assets/buildings/house.png')
-    print("Created house.png (64x48)")
+# Sheet width in 1x pixels; rects are 1x too, so every scale shares one packing
+TOWN_SHEET_WIDTH = 1024
+
+# The town's own buildings
+LAYOUTS = {
+    # Large, official building with gold accents
+    'bank': BuildingLayout(96, 80, wall='stone', wall_color=(180, 150, 120), roof='tiled', roof_color=(120, 80, 60),
+                           door='double', door_size=(16, 24), handle_color=(255, 215, 0), window_size=(12, 12),
+                           sign=(255, 215, 0), sign_size=(32, 8)),
+    # Shop with large display window
+    'general_store': BuildingLayout(80, 64, wall='wood', wall_color=(150, 120, 90), roof='gable',
+                                    roof_color=(100, 60, 40), window_size=(20, 14), windows=1,
+                                    sign=(200, 180, 120), hanging_sign=True),
+    # Residential building
+    'house': BuildingLayout(64, 48, wall='plaster', wall_color=(160, 140, 100), roof='gable', roof_color=(120, 80, 60),
+                            door_size=(10, 16), door_color=(100, 60, 40), chimney=(140, 70, 50)),
+    # Mystical purple building
+    'magic_shop': BuildingLayout(72, 64, wall='stone', wall_color=(80, 60, 100), roof='gable', roof_color=(60, 40, 80),
+                                 door='arched', door_size=(12, 18), door_color=(60, 30, 80),
+                                 handle_color=(150, 100, 255), window='arched', window_size=(10, 12),
+                                 glass=(100, 50, 255), crest=(200, 150, 255)),
+}
 
-def create_magic_shop():
-    """Create a magic shop with mystical appearance"""
-    width, height = 72, 64
-    img, draw, roof_height, wall_height = create_building_base(
+# What random town buildings are made of
+WALL_COLORS = [(180, 150, 120), (150, 120, 90), (160, 140, 100), (170, 90, 70), (200, 190, 170), (120, 110, 100)]
+ROOF_COLORS = [(120, 80, 60), (100, 60, 40), (140, 50, 40), (70, 70, 80), (90, 110, 60)]
+DOOR_COLORS = [(80, 50, 30), (100, 60, 40), (60, 70, 90), (120, 40, 30)]
+SIGN_COLORS = [(255, 215, 0), (200, 180, 120), (180, 60, 50), (90, 120, 200)]
+
+# One atlas per scale, shared by every building composed in this process
+ATLASES = {}
+
+def parts_atlas(scale=1):
+    if scale not in ATLASES:
+        ATLASES[scale] = PartsAtlas(scale)
+    return ATLASES[scale]
+
+def pick(rng, options):
+    return options[rng.integers(len(options))]
+
+def random_layout(rng):
+    """A distinct town building: size, materials, door, windows and extras all drawn from rng"""
+    width = int(rng.integers(6, 15)) * 8
+    height = max(48, width * 3 // 4 // 8 * 8)
+    door_height = height // 3 + int(rng.integers(0, 5))
+    return BuildingLayout(
         width, height,
-        (80, 60, 100),    # Purple-tinted walls
-        (60, 40, 80)      # Purple roof
+        wall=pick(rng, list(WALLS)), wall_color=pick(rng, WALL_COLORS),
+        roof=pick(rng, ROOFS), roof_color=pick(rng, ROOF_COLORS),
+        door=pick(rng, DOORS), door_size=(10 + 2 * int(rng.integers(0, 4)), door_height),
+        door_color=pick(rng, DOOR_COLORS),
+        window=pick(rng, WINDOWS), window_size=(8 + 2 * int(rng.integers(0, 3)),) * 2,
+        windows=int(rng.integers(1, width // 24 + 1)),
+        sign=pick(rng, SIGN_COLORS) if rng.random() < 0.3 else None, hanging_sign=bool(rng.random() < 0.5),
+        chimney=(140, 70, 50) if rng.random() < 0.4 else None,
     )
-    
-    # Magic shop door
-    door_width = 12
-    door_height = 18
-    door_x = (width - door_width) // 2
-    door_y = height - door_height
-    
-    draw.rectangle([door_x, door_y, door_x + door_width, height-1], 
-                  fill=(60, 30, 80), outline=(40, 20, 60))
-    
-    # Mystical door handle (glowing)
-    draw.ellipse([door_x + door_width - 4, door_y + door_height//2 - 1, 
-                 door_x + door_width - 2, door_y + door_height//2 + 1], 
-                fill=(150, 100, 255))
-    
-    # Arched window
-    window_width = 16
-    window_height = 12
-    window_x = (width - window_width) // 2
-    window_y = roof_height + 5
-    
-    # Window base
-    draw.rectangle([window_x, window_y + 4, window_x + window_width, window_y + window_height], 
-                  fill=(50, 20, 100), outline=(0, 0, 0))
-    
-    # Window arch
-    draw.arc([window_x, window_y, window_x + window_width, window_y + 8], 
-            start=0, end=180, fill=(0, 0, 0))
-    
-    # Mystical glow effect
-    for i in range(3):
-        glow_size = 2 + i * 2
-        glow_alpha = 100 - i * 30
-        draw.ellipse([window_x + window_width//2 - glow_size, window_y + window_height//2 - glow_size,
-                     window_x + window_width//2 + glow_size, window_y + window_height//2 + glow_size], 
-                    fill=(100, 50, 255, glow_alpha))
-    
-    # Crystal on roof peak
-    crystal_size = 4
-    crystal_x = width//2 - crystal_size//2
-    crystal_y = 2
-    
-    draw.polygon([
-        (crystal_x + crystal_size//2, crystal_y),
-        (crystal_x, crystal_y + crystal_size),
-        (crystal_x + crystal_size, crystal_y + crystal_size)
-    ], fill=(200, 150, 255), outline=(0, 0, 0))
-    
-    img.save('client/assets/buildings/magic_shop.png')
-    print("Created magic_shop.png (72x64)")
+
+def town_layouts(count, rng=None):
+    """count distinct random building layouts"""
+    rng = rng if rng is not None else asset_rng('buildings/town', count)
+    return [random_layout(rng) for _ in range(count)]
+
+def town_buildings(count, scale=1, rng=None):
+    """count distinct random buildings as RGBA arrays, composed from one parts atlas"""
+    atlas = parts_atlas(scale)
+    return [compose(layout, atlas) for layout in town_layouts(count, rng)]
+
+def pack_rows(sizes, width):
+    """(x, y) of every (width, height) box packed into rows, tallest first; returns positions and total height"""
+    positions = [None] * len(sizes)
+    x = y = row = 0
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        box_w, box_h = sizes[i]
+        if x + box_w > width:
+            x, y, row = 0, y + row, 0
+        positions[i] = (x, y)
+        x += box_w
+        row = max(row, box_h)
+    return positions, y + row
+
+def town_rects(count):
+    """[x, y, width, height] of every town building on the sheet, in 1x pixels"""
+    sizes = [(layout.width, layout.height) for layout in town_layouts(count)]
+    positions, height = pack_rows(sizes, TOWN_SHEET_WIDTH)
+    return [[x, y, w, h] for (x, y), (w, h) in zip(positions, sizes)], height
+
+def create_town_sheet(count, scale):
+    """Every town building composed at one scale, packed onto one sheet"""
+    rects, height = town_rects(count)
+    sheet = np.zeros((height * scale, TOWN_SHEET_WIDTH * scale, 4), dtype=np.uint8)
+    for (x, y, w, h), sprite in zip(rects, town_buildings(count, scale)):
+        sheet[y * scale:(y + h) * scale, x * scale:(x + w) * scale] = sprite
+    return to_image(sheet)
+
+def create_town_manifest(count, scales):
+    """Sheet per scale and each building's rect and look, for the client to draw them by index"""
+    client_path = TOWN_PATH.removeprefix('client/')
+    rects, _ = town_rects(count)
+    manifest = {
+        'sheets': {str(scale): f'{client_path}/town_{scale}x.png' for scale in scales},
+        'buildings': [
+            {'rect': rect, 'wall': layout.wall, 'roof': layout.roof, 'door': layout.door,
+             'sign': layout.sign is not None}
+            for rect, layout in zip(rects, town_layouts(count))
+        ],
+    }
+    return json.dumps(manifest, indent=1, sort_keys=True)
+
+def create_building(name, scale=1):
+    """Compose one of the town's buildings from the parts atlas"""
+    return to_image(compose(LAYOUTS[name], parts_atlas(scale)))
 
 def create_well():
     """Create a town well/fountain"""
@@ -278,8 +158,7 @@ def create_well():
     draw.line([(width//2, 2), (width//2, 10)], fill=(139, 90, 43), width=2)
     draw.rectangle([width//2 - 2, 8, width//2 + 2, 12], fill=(80, 60, 40), outline=(0, 0, 0))
     
-    img.save('client/assets/buildings/well.png')
-    print("Created well.png (32x24)")
+    return img
 
 def create_fence():
     """Create fence sections for town boundaries"""
@@ -301,24 +180,36 @@ def create_fence():
     # Bottom rail
     draw.rectangle([0, 10, width, 10 + rail_height], fill=(101, 67, 33), outline=(80, 50, 25))
     
-    img.save('client/assets/buildings/fence.png')
-    print("Created fence.png (32x16)")
+    return img
+
+def asset_jobs():
+    """Placeholder building sprites (generated art replaces them) and the random town sheets"""
+    return [
+        *(AssetJob(f'{BUILDINGS_PATH}/{name}.png', create_building, (name,), fallback=True) for name in LAYOUTS),
+        AssetJob(f'{BUILDINGS_PATH}/well.png', create_well, fallback=True),
+        AssetJob(f'{BUILDINGS_PATH}/fence.png', create_fence, fallback=True),
+        *(AssetJob(f'{TOWN_PATH}/town_{scale}x.png', create_town_sheet, (TOWN_BUILDINGS, scale))
+          for scale in TOWN_SCALES),
+        AssetJob(TOWN_MANIFEST_PATH, create_town_manifest, (TOWN_BUILDINGS, TOWN_SCALES)),
+    ]
 
-# Generate all building sprites
-print("Generating RuneScape-style town buildings...")
+if __name__ == "__main__":
+    print("Generating RuneScape-style town buildings...")
+    run_generator(asset_jobs())
 
-create_bank()
-create_general_store()
-create_house()
-create_magic_shop()
-create_well()
-create_fence()
+    print("\nTown buildings generated successfully!")
+    print("Buildings created:")
+    for name, layout in LAYOUTS.items():
+        print(f"- {name.replace('_', ' ').title()} ({layout.width}x{layout.height}) - "
+              f"{layout.wall} walls, {layout.roof} roof, {layout.door} door")
+    print("- Well (32x24) - Town center water source")
+    print("- Fence (32x16) - Boundary and decoration")
 
-print("\nTown buildings generated successfully!")
-print("Buildings created:")
-print("- Bank (96x80) - Large, official building with gold accents")
-print("- General Store (80x64) - Shop with large display window")
-print("- House (64x48) - Residential building")
-print("- Magic Shop (72x64) - Mystical purple building")
-print("- Well (32x24) - Town center water source")
-print("- Fence (32x16) - Boundary and decoration")
\ No newline at end of file
+    print(f"\n{TOWN_BUILDINGS} random town buildings, one sheet per scale in {TOWN_PATH}:")
+    for scale in TOWN_SCALES:
+        start = time.perf_counter()
+        sheet = create_town_sheet(TOWN_BUILDINGS, scale)
+        elapsed = time.perf_counter() - start
+        atlas = parts_atlas(scale)
+        print(f"  {scale}x: {sheet.width}x{sheet.height} sheet in {elapsed * 1000:.0f} ms, "
+              f"{len(atlas.slots)} parts on a {atlas.image().width}x{atlas.image().height} atlas")
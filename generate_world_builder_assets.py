@@ -1,9 +1,8 @@
 from PIL import Image, ImageDraw
-import os
 
-# Create directories
-os.makedirs('client/assets/world_builder', exist_ok=True)
-os.makedirs('client/assets/world_builder/prompts', exist_ok=True)
+from asset_registry import AssetJob, run_generator
+
+WORLD_BUILDER_PATH = 'client/assets/world_builder'
 
 def create_placeholder_image(name, size, color, symbol=''):
     """Create a simple placeholder image"""
@@ -16,15 +15,11 @@ def create_placeholder_image(name, size, color, symbol=''):
     # Add border
     draw.rectangle([0, 0, size[0]-1, size[1]-1], outline=(0, 0, 0, 255), width=1)
     
-    # Save image
-    img.save(f'client/assets/world_builder/{name}.png')
-    return f'client/assets/world_builder/{name}.png'
+    return img
 
 def create_ai_prompt(name, prompt):
-    """Create AI prompt file"""
-    with open(f'client/assets/world_builder/prompts/{name}.txt', 'w') as f:
-        f.write(prompt)
-    return f'client/assets/world_builder/prompts/{name}.txt'
+    """Create AI prompt file contents"""
+    return prompt
 
 # Define all assets with colors, sizes, and AI prompts
 assets = {
@@ -372,44 +367,45 @@ assets = {
     }
 }
 
+def create_index():
+    """Create the README index of every placeholder"""
+    lines = [
+        "RuneScape World Builder Assets\n",
+        "==============================\n\n",
+        "This folder contains placeholder images and AI prompts for the world builder.\n\n",
+        "To create high-quality assets:\n",
+        "1. Check the 'prompts' folder for AI generation prompts\n",
+        "2. Use your preferred AI image generator (DALL-E, Midjourney, etc.)\n",
+        "3. Replace the placeholder PNG files with your generated images\n",
+        "4. Keep the same filenames and dimensions\n\n",
+        "Image List:\n",
+    ]
+    for name, config in assets.items():
+        lines.append(f"- {name}.png ({config['size'][0]}x{config['size'][1]})\n")
+    return ''.join(lines)
+
+def asset_jobs():
+    """Placeholder images (kept once replaced), their AI prompts and the index"""
+    jobs = []
+    for name, config in assets.items():
+        jobs.append(AssetJob(f'{WORLD_BUILDER_PATH}/{name}.png', create_placeholder_image,
+                             (name, config['size'], config['color']), fallback=True))
+        jobs.append(AssetJob(f'{WORLD_BUILDER_PATH}/prompts/{name}.txt', create_ai_prompt, (name, config['prompt'])))
+    jobs.append(AssetJob(f'{WORLD_BUILDER_PATH}/README.txt', create_index))
+    return jobs
+
 def generate_all_assets():
     print("Generating World Builder assets...")
     
-    created_images = []
-    created_prompts = []
-    
-    for name, config in assets.items():
-        # Create placeholder image
-        img_path = create_placeholder_image(name, config['size'], config['color'])
-        created_images.append(img_path)
-        
-        # Create AI prompt file
-        prompt_path = create_ai_prompt(name, config['prompt'])
-        created_prompts.append(prompt_path)
-        
-        print(f"Created: {name}.png ({config['size'][0]}x{config['size'][1]}) + prompt")
+    run_generator(asset_jobs())
     
-    print(f"\nGenerated {len(created_images)} placeholder images")
-    print(f"Generated {len(created_prompts)} AI prompt files")
+    print(f"\nGenerated {len(assets)} placeholder images")
+    print(f"Generated {len(assets)} AI prompt files")
     print("\nTo replace with high-quality images:")
     print("1. Use the AI prompts in the 'prompts' folder")
     print("2. Generate images with your preferred AI tool")
     print("3. Replace the placeholder images in 'client/assets/world_builder/'")
     print("4. Maintain the exact same filenames and dimensions")
-    
-    # Create index file
-    with open('client/assets/world_builder/README.txt', 'w') as f:
-        f.write("RuneScape World Builder Assets\n")
-        f.write("==============================\n\n")
-        f.write("This folder contains placeholder images and AI prompts for the world builder.\n\n")
-        f.write("To create high-quality assets:\n")
-        f.write("1. Check the 'prompts' folder for AI generation prompts\n")
-        f.write("2. Use your preferred AI image generator (DALL-E, Midjourney, etc.)\n")
-        f.write("3. Replace the placeholder PNG files with your generated images\n")
-        f.write("4. Keep the same filenames and dimensions\n\n")
-        f.write("Image List:\n")
-        for name, config in assets.items():
-            f.write(f"- {name}.png ({config['size'][0]}x{config['size'][1]})\n")
 
 if __name__ == "__main__":
-    generate_all_assets()
\ No newline at end of file
+    generate_all_assets()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Concurrent Generation Engine
+============================
+
+Asyncio-based replacement for the serial generate-then-sleep loop used by the
+tile image generators. Keeps several DALL-E requests in flight and paces them
+with a token bucket, so a full backfill scales with the account's quota
+instead of a hard-coded delay.
+
+The engine does not talk to the API itself - every request goes through
+``TileImageGenerator.request_image``, the same code path used by
+``generate_image`` in the interactive modes. When given a ``JobJournal`` it
+records each job's progress so an interrupted batch can resume.
+
+Configuration (.env):
+    IMAGE_REQUESTS_PER_MINUTE   requests allowed per minute (default 5)
+    IMAGE_MAX_CONCURRENCY       requests kept in flight (default 3)
+"""
+
+import asyncio
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from image_cache import cache_key
+
+# OpenAI reports reset windows as e.g. "1s", "6m0s", "20ms" or "1h2m3.5s"
+DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+DURATION_SECONDS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse an x-ratelimit-reset-* header value into seconds"""
+    if not value:
+        return None
+
+    parts = DURATION_PART.findall(value.strip())
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+    return sum(float(amount) * DURATION_SECONDS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """Token bucket limiter refilled at requests_per_minute / 60 tokens per second"""
+
+    def __init__(self, requests_per_minute: float, capacity: Optional[float] = None):
+        self.rate = max(requests_per_minute, 0.1) / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, min(requests_per_minute, 10))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def update_from_headers(self, headers: Dict[str, str]):
+        """Adapt to the x-ratelimit-* headers returned by the API"""
+        if not headers:
+            return
+
+        headers = {key.lower(): value for key, value in headers.items()}
+        self._refill()
+
+        limit = headers.get('x-ratelimit-limit-requests')
+        if limit:
+            try:
+                self.rate = max(float(limit), 0.1) / 60.0
+            except ValueError:
+                pass
+
+        remaining = headers.get('x-ratelimit-remaining-requests')
+        if remaining is not None:
+            try:
+                self.tokens = min(self.tokens, float(remaining))
+            except ValueError:
+                pass
+
+            if self.tokens < 1:
+                reset = parse_reset_duration(headers.get('x-ratelimit-reset-requests'))
+                if reset:
+                    self.pause(reset)
+
+    def pause(self, seconds: float):
+        """Hold back all acquirers for the given number of seconds"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+        self.updated = time.monotonic()
+
+
+class GenerationEngine:
+    """Keeps N generation requests in flight behind a shared token bucket"""
+
+    def __init__(self, generator, concurrency: Optional[int] = None,
+                 requests_per_minute: Optional[float] = None, bypass_cache: bool = False,
+                 journal=None):
+        self.generator = generator
+        self.bypass_cache = bypass_cache
+        self.journal = journal
+        self.concurrency = max(1, concurrency or generator.max_concurrency)
+        self.requests_per_minute = requests_per_minute or generator.requests_per_minute
+        self.bucket = TokenBucket(self.requests_per_minute)
+
+    def estimate_seconds(self, job_count: int) -> float:
+        """Rough wall-clock estimate for a batch of jobs at the configured quota"""
+        return max(0.0, job_count - self.bucket.capacity) * 60.0 / self.requests_per_minute
+
+    async def _worker(self, queue: asyncio.Queue, executor: ThreadPoolExecutor,
+                      results: List[Tuple[str, Dict, bool]],
+                      on_result: Optional[Callable[[str, Dict, bool], None]]):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            try:
+                file_path, prompt_data = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            number = prompt_data['number']
+
+            # Cache hits are answered locally and don't spend a token
+            image_data = None
+            if not self.bypass_cache:
+                image_data = await loop.run_in_executor(
+                    executor, self.generator.cached_image, prompt_data['prompt']
+                )
+
+            if not image_data:
+                await self.bucket.acquire()
+                self._mark(file_path, number, 'requested')
+
+                image_data, headers = await loop.run_in_executor(
+                    executor, self.generator.request_image,
+                    prompt_data['prompt'], prompt_data['style'], True
+                )
+                self.bucket.update_from_headers(headers)
+
+            success = False
+            error = 'generation failed'
+            if image_data:
+                key = cache_key(self.generator.build_payload(prompt_data['prompt']))
+                self._mark(file_path, number, 'downloaded', cache_key=key)
+
+                outputs = await loop.run_in_executor(
+                    executor, self.generator.post_process,
+                    image_data, file_path, number
+                )
+                error = 'post-processing failed'
+
+                if outputs is not None:
+                    self._mark(file_path, number, 'post_processed')
+                    success = await loop.run_in_executor(
+                        executor, self.generator.save_image,
+                        image_data, file_path, number, outputs
+                    )
+                    error = 'save failed'
+
+            if success:
+                self._mark(file_path, number, 'saved')
+            else:
+                self._mark(file_path, number, 'failed', error=error)
+
+            results.append((file_path, prompt_data, success))
+            if on_result:
+                on_result(file_path, prompt_data, success)
+
+    def _mark(self, file_path: str, number: int, state: str, **details):
+        if self.journal:
+            self.journal.mark(file_path, number, state, **details)
+
+    async def run_async(self, jobs: List[Tuple[str, Dict]],
+                        on_result: Optional[Callable[[str, Dict, bool], None]] = None) -> int:
+        """Generate and save every (prompt file, prompt data) job, returns success count"""
+        if self.journal:
+            self.journal.enqueue(jobs)
+
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+
+        results = []
+        workers = min(self.concurrency, len(jobs))
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            await asyncio.gather(*(
+                self._worker(queue, executor, results, on_result) for _ in range(workers)
+            ))
+
+        return sum(1 for _, _, success in results if success)
+
+    def run(self, jobs: List[Tuple[str, Dict]],
+            on_result: Optional[Callable[[str, Dict, bool], None]] = None) -> int:
+        """Blocking wrapper around run_async for the console interfaces"""
+        if not jobs:
+            return 0
+        return asyncio.run(self.run_async(jobs, on_result))
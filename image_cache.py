@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Image Cache
+=============================
+
+On-disk cache for DALL-E generations. Each entry is keyed by a SHA-256 of the
+full request payload (model, prompt, size, quality, ...), so an identical
+request is answered locally instead of paying for a new image.
+
+Layout:
+    .image_cache/objects/ab/abcdef...bin    raw image bytes
+    .image_cache/objects/ab/abcdef...json   metadata (payload, size, timestamps)
+
+Configuration (.env):
+    IMAGE_CACHE_DIR             cache location (default .image_cache)
+    IMAGE_CACHE_MAX_MB          total size before least-recently-used eviction (default 2048)
+    IMAGE_CACHE_MAX_AGE_DAYS    entries older than this are dropped (default 90, 0 = never)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Request fields that only change how the response is delivered, not the image itself
+TRANSPORT_ONLY_FIELDS = ('response_format', 'user')
+
+# Puts between full scans, so entries past max age still get dropped while under the size budget
+PRUNE_EVERY = 500
+# Eviction frees down to this share of the budget, so a full cache is not rescanned on every put
+PRUNE_TARGET = 0.9
+
+
+def cache_key(payload: Dict) -> str:
+    """Stable hash of a generation request payload"""
+    relevant = {k: v for k, v in payload.items() if k not in TRANSPORT_ONLY_FIELDS}
+    canonical = json.dumps(relevant, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write bytes to a temp file next to path, then rename over it"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ImageCache:
+    """Size- and age-bounded content-addressed store for generated images"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None,
+                 max_age_days: Optional[float] = None):
+        self.cache_dir = Path(cache_dir or os.getenv('IMAGE_CACHE_DIR', '.image_cache'))
+        self.objects_dir = self.cache_dir / 'objects'
+
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('IMAGE_CACHE_MAX_MB', '2048')) * 1024 * 1024)
+        if max_age_days is None:
+            max_age_days = float(os.getenv('IMAGE_CACHE_MAX_AGE_DAYS', '90'))
+
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.hits = 0
+        self.misses = 0
+
+        # Running byte total, seeded by the first full prune; puts only rescan the disk when over budget
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None
+        self._puts_since_prune = 0
+
+    def _paths(self, key: str):
+        folder = self.objects_dir / key[:2]
+        return folder / f"{key}.bin", folder / f"{key}.json"
+
+    def get(self, payload: Dict) -> Optional[bytes]:
+        """Return cached bytes for an identical request, or None"""
+        key = cache_key(payload)
+        data_path, meta_path = self._paths(key)
+
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            if self.max_age and time.time() - meta['created'] > self.max_age:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            data = data_path.read_bytes()
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        if hashlib.sha256(data).hexdigest() != meta.get('sha256'):
+            # Truncated or corrupted entry
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        # Touch metadata so eviction is least-recently-used
+        now = time.time()
+        os.utime(meta_path, (now, now))
+        self.hits += 1
+        return data
+
+    def put(self, payload: Dict, data: bytes, **extra) -> str:
+        """Store bytes for a request payload, returns the cache key"""
+        key = cache_key(payload)
+        data_path, meta_path = self._paths(key)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+
+        meta = {
+            'key': key,
+            'payload': payload,
+            'size': len(data),
+            'sha256': hashlib.sha256(data).hexdigest(),
+            'created': time.time(),
+        }
+        meta.update(extra)
+
+        try:
+            replaced = data_path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+
+        write_atomic(data_path, data)
+        write_atomic(meta_path, json.dumps(meta, indent=2).encode('utf-8'))
+
+        with self._lock:
+            if self._total is not None:
+                self._total += len(data) - replaced
+                self._puts_since_prune += 1
+            due = (self._total is None or self._total > self.max_bytes
+                   or self._puts_since_prune >= PRUNE_EVERY)
+        if due:
+            self.prune()
+        return key
+
+    def _remove(self, key: str):
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def entries(self) -> List[Dict]:
+        """List metadata for every entry, with last-access time"""
+        entries = []
+        if not self.objects_dir.exists():
+            return entries
+
+        for meta_path in self.objects_dir.glob('*/*.json'):
+            try:
+                meta = json.loads(meta_path.read_text(encoding='utf-8'))
+                meta['accessed'] = meta_path.stat().st_mtime
+                entries.append(meta)
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def prune(self) -> int:
+        """Evict expired entries, then least-recently-used ones until back under the size budget"""
+        entries = self.entries()
+        removed = 0
+        now = time.time()
+
+        if self.max_age:
+            for meta in [m for m in entries if now - m.get('created', 0) > self.max_age]:
+                self._remove(meta['key'])
+                entries.remove(meta)
+                removed += 1
+
+        total = sum(m.get('size', 0) for m in entries)
+        target = self.max_bytes * PRUNE_TARGET if total > self.max_bytes else self.max_bytes
+        for meta in sorted(entries, key=lambda m: m['accessed']):
+            if total <= target:
+                break
+            self._remove(meta['key'])
+            total -= meta.get('size', 0)
+            removed += 1
+
+        with self._lock:
+            self._total = total
+            self._puts_since_prune = 0
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count, total bytes and hit/miss counters for this session"""
+        entries = self.entries()
+        return {
+            'entries': len(entries),
+            'bytes': sum(m.get('size', 0) for m in entries),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
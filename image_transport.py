@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Image API Transport
+===================
+
+Single-roundtrip HTTP layer for the DALL-E generators. Each worker thread gets
+its own pooled keep-alive ``requests.Session``, and images are requested as
+``b64_json`` so the bytes arrive in the generation response itself - no second
+download, no second TLS handshake.
+
+URL mode is kept as a fallback (the image is then downloaded over the same
+pooled session). Every request's latency is recorded so the saving is visible.
+
+Configuration (.env):
+    IMAGE_RESPONSE_FORMAT   b64_json (default) or url
+    OPENAI_BASE_URL         API root (default https://api.openai.com/v1), e.g. a
+                            local mock_image_server.py for offline testing
+"""
+
+import base64
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = 'https://api.openai.com/v1'
+
+
+class TransportResult:
+    """Outcome of one generation request"""
+
+    def __init__(self, image_data: Optional[bytes] = None, status_code: int = 0,
+                 headers: Optional[Dict[str, str]] = None, error: Optional[str] = None,
+                 latency: float = 0.0, response_format: str = 'b64_json'):
+        self.image_data = image_data
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.error = error
+        self.latency = latency
+        self.response_format = response_format
+        self.attempts = 1
+
+    @property
+    def ok(self) -> bool:
+        return self.image_data is not None
+
+
+class ImageTransport:
+    """Pooled, per-thread HTTP sessions for the image generation endpoint"""
+
+    def __init__(self, api_key: str, response_format: Optional[str] = None,
+                 pool_size: int = 4, timeout: float = 60, base_url: Optional[str] = None):
+        self.api_key = api_key
+        self.base_url = (base_url or os.getenv('OPENAI_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+        self.generations_url = f"{self.base_url}/images/generations"
+        self.response_format = response_format or os.getenv('IMAGE_RESPONSE_FORMAT', 'b64_json')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.latencies: List[Dict] = []
+
+    @property
+    def session(self) -> requests.Session:
+        """Keep-alive session owned by the calling worker thread"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update({
+                'Authorization': f'Bearer {self.api_key}',
+                'Content-Type': 'application/json'
+            })
+            self._local.session = session
+        return session
+
+    def generate(self, payload: Dict) -> TransportResult:
+        """POST a generation request and return the decoded image bytes"""
+        response_format = self.response_format
+        body = dict(payload, response_format=response_format)
+        start = time.perf_counter()
+
+        try:
+            response = self.session.post(self.generations_url, json=body, timeout=self.timeout)
+        except requests.RequestException as e:
+            return self._record(TransportResult(error=str(e), latency=time.perf_counter() - start,
+                                                response_format=response_format))
+
+        result = TransportResult(status_code=response.status_code, headers=dict(response.headers),
+                                 response_format=response_format)
+
+        if response.status_code != 200:
+            result.error = response.text
+        else:
+            try:
+                item = response.json()['data'][0]
+                if item.get('b64_json'):
+                    result.image_data = base64.b64decode(item['b64_json'])
+                else:
+                    result.image_data = self._download(item['url'], result)
+            except (ValueError, KeyError, IndexError, requests.RequestException) as e:
+                result.error = f"Malformed image response: {e}"
+
+        result.latency = time.perf_counter() - start
+        return self._record(result)
+
+    def _download(self, image_url: str, result: TransportResult) -> Optional[bytes]:
+        """URL-mode fallback: fetch the image over the same pooled session"""
+        response = self.session.get(image_url, timeout=30, headers={'Authorization': None})
+        if response.status_code != 200:
+            result.error = f"Failed to download image: {response.status_code}"
+            return None
+        return response.content
+
+    def _record(self, result: TransportResult) -> TransportResult:
+        with self._lock:
+            self.latencies.append({
+                'latency': result.latency,
+                'status': result.status_code,
+                'format': result.response_format,
+                'bytes': len(result.image_data) if result.image_data else 0,
+            })
+        return result
+
+    def latency_summary(self) -> Dict[str, float]:
+        """Request count plus mean / p50 / p95 latency in seconds"""
+        with self._lock:
+            values = sorted(entry['latency'] for entry in self.latencies)
+
+        if not values:
+            return {'requests': 0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0}
+
+        return {
+            'requests': len(values),
+            'mean': sum(values) / len(values),
+            'p50': values[len(values) // 2],
+            'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+        }
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Generation Job Journal
+======================
+
+Crash-safe SQLite journal of every image variant a batch run is working on.
+Each job moves through:
+
+    queued -> requested -> downloaded -> post_processed -> saved
+
+with 'failed' recorded when a step gives up. A restarted batch reads the
+unfinished jobs straight from the journal instead of re-scanning the asset
+tree. Jobs that reached 'downloaded' have their bytes in the image cache, so
+they are saved without paying for the generation again.
+
+Configuration (.env):
+    IMAGE_JOURNAL_PATH      journal database (default .generation_journal.sqlite)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+JOB_STATES = ('queued', 'requested', 'downloaded', 'post_processed', 'saved', 'failed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    tile_path   TEXT NOT NULL,
+    number      INTEGER NOT NULL,
+    style       TEXT,
+    prompt      TEXT,
+    state       TEXT NOT NULL,
+    cache_key   TEXT,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    error       TEXT,
+    updated     REAL NOT NULL,
+    PRIMARY KEY (tile_path, number)
+)
+"""
+
+
+class JobJournal:
+    """Persistent per-variant job states shared by all generation workers"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.getenv('IMAGE_JOURNAL_PATH', '.generation_journal.sqlite')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+
+        with self._lock:
+            # WAL keeps committed state intact if the process is killed mid-write
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(SCHEMA)
+
+    def enqueue(self, jobs: List[Tuple[str, Dict]]):
+        """Record (prompt file, prompt data) jobs as queued"""
+        now = time.time()
+        rows = [
+            (tile_path, p['number'], p['style'], p['prompt'], now)
+            for tile_path, p in jobs
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("""
+                INSERT INTO jobs (tile_path, number, style, prompt, state, updated)
+                VALUES (?, ?, ?, ?, 'queued', ?)
+                ON CONFLICT (tile_path, number) DO UPDATE SET
+                    style = excluded.style,
+                    prompt = excluded.prompt,
+                    state = CASE WHEN jobs.state = 'saved' THEN 'queued' ELSE jobs.state END,
+                    updated = excluded.updated
+            """, rows)
+            self._conn.execute("COMMIT")
+
+    def mark(self, tile_path: str, number: int, state: str,
+             cache_key: Optional[str] = None, error: Optional[str] = None):
+        """Move a job to a new state"""
+        if state not in JOB_STATES:
+            raise ValueError(f"Unknown job state: {state}")
+
+        with self._lock:
+            self._conn.execute("""
+                UPDATE jobs SET
+                    state = ?,
+                    cache_key = COALESCE(?, cache_key),
+                    error = ?,
+                    attempts = attempts + (CASE WHEN ? = 'requested' THEN 1 ELSE 0 END),
+                    updated = ?
+                WHERE tile_path = ? AND number = ?
+            """, (state, cache_key, error, state, time.time(), tile_path, number))
+
+    def pending(self) -> List[Tuple[str, Dict]]:
+        """Every job that has not been saved, as (prompt file, prompt data) pairs"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT * FROM jobs WHERE state != 'saved' ORDER BY tile_path, number
+            """).fetchall()
+
+        return [
+            (row['tile_path'], {
+                'style': row['style'],
+                'prompt': row['prompt'],
+                'number': row['number'],
+                'state': row['state'],
+                'cache_key': row['cache_key'],
+            })
+            for row in rows
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each state"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) AS n FROM jobs GROUP BY state"
+            ).fetchall()
+        return {row['state']: row['n'] for row in rows}
+
+    def clear_saved(self):
+        """Drop finished jobs so the journal only tracks outstanding work"""
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE state = 'saved'")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
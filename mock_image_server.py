@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Mock Image Generation Server
+============================
+
+Local stand-in for ``/v1/images/generations`` (plus the image download URL)
+so the generation pipeline can be tested and benchmarked with no network and
+no API key.
+
+- Deterministic PNG payloads: the same prompt always returns the same bytes,
+  drawn as a 16x16 grid of coloured blocks like a DALL-E "pixel art" image
+- Tunable latency: fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA
+- Error injection: 429 (with Retry-After) and 5xx at configurable rates
+- Optional requests-per-minute quota with x-ratelimit-* headers
+
+Usage:
+    python mock_image_server.py --port 8089 --latency lognormal:2,0.4 --rate-429 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python tile_image_generator.py
+
+    # End-to-end load test of the batch engine against an in-process server
+    python mock_image_server.py --benchmark 200 --concurrency 8 --latency uniform:0.5,1.5
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import math
+import os
+import random
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+
+def parse_latency(spec: str):
+    """Turn a latency spec into a zero-argument sampler returning seconds"""
+    kind, _, args = spec.partition(':')
+    values = [float(v) for v in args.split(',') if v] if args else []
+
+    if kind == 'fixed':
+        return lambda: values[0] if values else 0.0
+    if kind == 'uniform':
+        low, high = values
+        return lambda: random.uniform(low, high)
+    if kind == 'lognormal':
+        median, sigma = values
+        return lambda: random.lognormvariate(math.log(median), sigma)
+
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+
+def make_png(seed: str, size: int = 1024, grid: int = 16) -> bytes:
+    """Deterministic RGBA PNG: a grid x grid sprite upscaled to size x size"""
+    digest = hashlib.sha256(seed.encode('utf-8')).digest()
+    rng = random.Random(digest)
+    palette = [bytes((rng.randrange(256), rng.randrange(256), rng.randrange(256), 255)) for _ in range(6)]
+    palette.append(b'\x00\x00\x00\x00')  # Transparent background cells
+
+    block = max(1, size // grid)
+    rows = []
+    for _ in range(grid):
+        cells = [palette[rng.randrange(len(palette))] for _ in range(grid)]
+        scanline = b'\x00' + b''.join(cell * block for cell in cells)
+        scanline = scanline.ljust(1 + size * 4, b'\x00')[:1 + size * 4]
+        rows.append(scanline * block)
+
+    raw = b''.join(rows)
+    raw = raw.ljust((1 + size * 4) * size, b'\x00')
+
+    header = struct.pack('>IIBBBBB', size, size, 8, 6, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', header)
+            + png_chunk(b'IDAT', zlib.compress(raw, 6)) + png_chunk(b'IEND', b''))
+
+
+class MockImageServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the mock's configuration and state"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], latency: str = 'fixed:0',
+                 rate_429: float = 0.0, rate_5xx: float = 0.0,
+                 requests_per_minute: Optional[int] = None, seed: Optional[int] = None):
+        super().__init__(address, MockImageHandler)
+        self.sample_latency = parse_latency(latency)
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.requests_per_minute = requests_per_minute
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.recent = deque()
+        self.images: Dict[str, bytes] = {}
+        self.png_cache: Dict[Tuple[str, int], bytes] = {}
+        self.stats = {'requests': 0, '200': 0, '429': 0, '5xx': 0}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def image_for(self, prompt: str, size: int) -> bytes:
+        key = (prompt, size)
+        with self.lock:
+            cached = self.png_cache.get(key)
+        if cached is None:
+            cached = make_png(prompt, size)
+            with self.lock:
+                self.png_cache[key] = cached
+        return cached
+
+    def admit(self) -> Tuple[Optional[int], Dict[str, str]]:
+        """Decide the fate of a request: None to serve it, else an error status"""
+        with self.lock:
+            self.stats['requests'] += 1
+            now = time.monotonic()
+            headers = {}
+
+            if self.requests_per_minute:
+                while self.recent and now - self.recent[0] > 60:
+                    self.recent.popleft()
+
+                remaining = self.requests_per_minute - len(self.recent)
+                reset = 60 - (now - self.recent[0]) if self.recent else 0
+                headers = {
+                    'x-ratelimit-limit-requests': str(self.requests_per_minute),
+                    'x-ratelimit-remaining-requests': str(max(0, remaining - 1)),
+                    'x-ratelimit-reset-requests': f"{reset:.2f}s",
+                }
+                if remaining <= 0:
+                    headers['Retry-After'] = f"{math.ceil(reset)}"
+                    self.stats['429'] += 1
+                    return 429, headers
+                self.recent.append(now)
+
+            roll = self.random.random()
+            if roll < self.rate_429:
+                headers['Retry-After'] = '1'
+                self.stats['429'] += 1
+                return 429, headers
+            if roll < self.rate_429 + self.rate_5xx:
+                self.stats['5xx'] += 1
+                return self.random.choice((500, 502, 503)), headers
+
+            self.stats['200'] += 1
+            return None, headers
+
+
+class MockImageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_json(400, {'error': {'message': 'Invalid JSON', 'type': 'invalid_request_error'}})
+            return
+
+        if self.path.rstrip('/') != '/v1/images/generations':
+            self.send_json(404, {'error': {'message': f'Unknown path {self.path}'}})
+            return
+
+        time.sleep(max(0.0, self.server.sample_latency()))
+
+        status, headers = self.server.admit()
+        if status == 429:
+            self.send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'requests',
+                                           'code': 'rate_limit_exceeded'}}, headers)
+            return
+        if status:
+            self.send_json(status, {'error': {'message': 'Mock server error', 'type': 'server_error'}}, headers)
+            return
+
+        prompt = body.get('prompt', '')
+        size = int(str(body.get('size', '1024x1024')).split('x')[0])
+        png = self.server.image_for(prompt, size)
+
+        if body.get('response_format') == 'b64_json':
+            item = {'b64_json': base64.b64encode(png).decode('ascii'), 'revised_prompt': prompt}
+        else:
+            image_id = hashlib.sha256(f"{prompt}|{size}".encode('utf-8')).hexdigest()[:32]
+            with self.server.lock:
+                self.server.images[image_id] = png
+            host, port = self.server.server_address[:2]
+            item = {'url': f"http://{host}:{port}/images/{image_id}.png", 'revised_prompt': prompt}
+
+        self.send_json(200, {'created': int(time.time()), 'data': [item]}, headers)
+
+    def do_GET(self):
+        image_id = self.path.rsplit('/', 1)[-1].replace('.png', '')
+        with self.server.lock:
+            png = self.server.images.get(image_id)
+
+        if not self.path.startswith('/images/') or png is None:
+            self.send_json(404, {'error': {'message': 'Image not found'}})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(png)))
+        self.end_headers()
+        self.wfile.write(png)
+
+
+def start_mock_server(port: int = 0, **options) -> MockImageServer:
+    """Start a mock server on a background thread (port 0 picks a free port)"""
+    server = MockImageServer(('127.0.0.1', port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_benchmark(server: MockImageServer, job_count: int, concurrency: int, requests_per_minute: float):
+    """Drive the real batch engine against the mock server and report throughput"""
+    workdir = tempfile.mkdtemp(prefix='mock_image_bench_')
+    os.environ['OPENAI_BASE_URL'] = server.base_url
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-mock-local-benchmark')
+    os.environ['IMAGE_CACHE_DIR'] = os.path.join(workdir, 'cache')
+    os.environ['IMAGE_JOURNAL_PATH'] = os.path.join(workdir, 'journal.sqlite')
+    os.environ['IMAGE_MAX_CONCURRENCY'] = str(concurrency)
+    os.environ['IMAGE_REQUESTS_PER_MINUTE'] = str(requests_per_minute)
+
+    from pathlib import Path
+    from generation_engine import GenerationEngine
+    from tile_image_generator import TileImageGenerator
+
+    generator = TileImageGenerator()
+    generator.base_path = Path(workdir) / 'world_builder'
+    generator.masters_path = Path(workdir) / 'masters'
+
+    jobs = []
+    for index in range(job_count):
+        tile_path = f"bench/tile_{index // 10}/prompts.txt"
+        jobs.append((tile_path, {'style': f"Bench {index}", 'prompt': f"benchmark prompt {index}",
+                                 'number': index % 10 + 1}))
+
+    engine = GenerationEngine(generator, bypass_cache=True, journal=generator.journal)
+    start = time.perf_counter()
+    saved = engine.run(jobs)
+    elapsed = time.perf_counter() - start
+
+    latency = generator.transport.latency_summary()
+    print(f"\nBENCHMARK: {saved}/{job_count} images saved in {elapsed:.1f}s "
+          f"({saved / elapsed:.2f} images/s, concurrency {engine.concurrency})")
+    print(f"Latency: mean {latency['mean']:.2f}s, p50 {latency['p50']:.2f}s, p95 {latency['p95']:.2f}s "
+          f"over {latency['requests']} requests")
+    print(f"Server: {server.stats}")
+    print(f"Output: {workdir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the image generation API")
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', default='fixed:0', help="fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA")
+    parser.add_argument('--rate-429', type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument('--rate-5xx', type=float, default=0.0, help="fraction of requests answered with 5xx")
+    parser.add_argument('--rpm', type=int, default=None, help="enforce a requests-per-minute quota")
+    parser.add_argument('--seed', type=int, default=None, help="seed for latency and error injection")
+    parser.add_argument('--benchmark', type=int, default=0, metavar='JOBS',
+                        help="run the batch engine against an in-process server and exit")
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    options = dict(latency=args.latency, rate_429=args.rate_429, rate_5xx=args.rate_5xx,
+                   requests_per_minute=args.rpm, seed=args.seed)
+
+    if args.benchmark:
+        server = start_mock_server(0, **options)
+        run_benchmark(server, args.benchmark, args.concurrency, args.rpm or 100000)
+        server.shutdown()
+        return
+
+    server = MockImageServer(('127.0.0.1', args.port), **options)
+    print(f"Mock image API listening on {server.base_url}")
+    print(f"Set OPENAI_BASE_URL={server.base_url} to point the generators at it")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+
+if __name__ == "__main__":
+    main()
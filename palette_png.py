@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Indexed Palette PNGs
+====================
+
+Pixel art uses a few dozen colours but is saved as 32-bit RGBA. This module
+rewrites assets as palette PNGs (8-bit or smaller; Pillow picks the bit depth)
+with alpha carried in the tRNS chunk:
+
+- exact: images with at most 256 distinct RGBA values are indexed as-is and
+  always round-trip losslessly
+- locked: with ``--palette`` every pixel is mapped to the nearest colour of a
+  shared project palette (``--build-palette`` derives one from existing art)
+- adaptive: with ``--lossy`` and no palette, each image gets its own 255-colour
+  palette
+
+Nearest-colour mapping builds a lookup table from each image's distinct
+colours to palette indices in chunked vectorized passes, then maps every pixel
+with one indexing operation. Each (colour, alpha) pair becomes a palette entry,
+so semi-transparent pixels keep their exact alpha. Every written file is decoded again and compared
+with the source; lossy conversions are only written with ``--lossy``.
+
+Usage:
+    python palette_png.py                                 # lossless only, client/assets
+    python palette_png.py --build-palette client/assets/tiles client/assets/resources
+    python palette_png.py client/assets/tiles --palette asset_palette.json --lossy
+"""
+
+import argparse
+import io
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from asset_store import AssetStore
+from format_manifest import client_key, client_keys, drop_stale_webp, file_digest
+from image_cache import write_atomic
+from sprite_trim import MANIFEST_PATH as TRIM_MANIFEST_PATH, load_manifest, pixel_digest
+
+PALETTE_PATH = Path("asset_palette.json")
+
+# Alpha levels are kept exactly unless that needs more than 256 palette entries;
+# then pixels below this become transparent and the rest opaque
+ALPHA_CUTOFF = 128
+
+# Distinct colours matched against the palette per vectorized step
+CHUNK = 8192
+
+
+def pack_rgba(rgba: np.ndarray) -> np.ndarray:
+    """One uint32 per pixel, so colours can be compared and sorted as scalars"""
+    return np.ascontiguousarray(rgba).view(np.uint32).reshape(rgba.shape[:-1])
+
+
+def exact_indexed(rgba: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(indices, RGBA palette) when the image has at most 256 distinct colours"""
+    colors, inverse = np.unique(pack_rgba(rgba).ravel(), return_inverse=True)
+    if len(colors) > 256:
+        return None
+    palette = colors.view(np.uint8).reshape(-1, 4)
+    return inverse.reshape(rgba.shape[:2]).astype(np.uint8), palette
+
+
+def nearest_indices(colors: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """Index of the nearest palette colour for each RGB colour"""
+    palette = palette.astype(np.int32)
+    best = np.empty(len(colors), dtype=np.uint8)
+    # Chunked so the colours x palette distance matrix stays small
+    for start in range(0, len(colors), CHUNK):
+        delta = colors[start:start + CHUNK, None, :].astype(np.int32) - palette[None, :, :]
+        best[start:start + CHUNK] = np.einsum('npc,npc->np', delta, delta).argmin(axis=1)
+    return best
+
+
+def map_to_palette(rgba: np.ndarray, palette_rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Map an image onto palette colours, keeping its alpha levels; returns (indices, RGBA palette)"""
+    palette_rgb = np.asarray(palette_rgb, dtype=np.uint8)
+
+    # Only the image's distinct colours are matched, then broadcast back to every pixel
+    opaque = np.concatenate([rgba[..., :3], np.full(rgba.shape[:2] + (1,), 255, np.uint8)], axis=-1)
+    colors, inverse = np.unique(pack_rgba(opaque).ravel(), return_inverse=True)
+    lookup = nearest_indices(colors.view(np.uint8).reshape(-1, 4)[:, :3], palette_rgb)
+    rgb_index = lookup[inverse].reshape(rgba.shape[:2]).astype(np.int32)
+
+    # Each (colour, alpha) pair used becomes a palette entry, so tRNS carries alpha exactly
+    alpha = rgba[..., 3].astype(np.int32)
+    pairs, indices = np.unique(np.where(alpha == 0, -1, rgb_index * 256 + alpha), return_inverse=True)
+    if len(pairs) > 256:
+        alpha = np.where(alpha >= ALPHA_CUTOFF, 255, 0)
+        pairs, indices = np.unique(np.where(alpha == 0, -1, rgb_index * 256 + alpha), return_inverse=True)
+    if len(pairs) > 256:
+        raise ValueError("More than 256 colours after mapping; use a palette of at most 255 colours")
+
+    palette = np.zeros((len(pairs), 4), np.uint8)
+    visible = pairs >= 0
+    palette[visible, :3] = palette_rgb[pairs[visible] // 256]
+    palette[visible, 3] = pairs[visible] % 256
+    return indices.reshape(rgba.shape[:2]).astype(np.uint8), palette
+
+
+def adaptive_palette(rgba: np.ndarray, colors: int = 255) -> np.ndarray:
+    """Per-image RGB palette from Pillow's median cut over the opaque pixels"""
+    opaque = rgba[rgba[..., 3] >= ALPHA_CUTOFF][:, :3]
+    if len(opaque) == 0:
+        return np.zeros((1, 3), np.uint8)
+    sample = Image.fromarray(opaque.reshape(1, -1, 3), 'RGB')
+    quantized = sample.quantize(colors, method=Image.Quantize.MEDIANCUT)
+    used = len(quantized.getcolors(colors))
+    return np.asarray(quantized.getpalette()[:used * 3], dtype=np.uint8).reshape(-1, 3)
+
+
+def indexed_png(indices: np.ndarray, palette: np.ndarray) -> bytes:
+    """Encode indices + RGBA palette as a palette PNG with tRNS alpha"""
+    img = Image.fromarray(indices, 'P')
+    img.putpalette(palette[:, :3].tobytes())
+    options = {'optimize': True}
+    if (palette[:, 3] < 255).any():
+        options['transparency'] = palette[:, 3].tobytes()
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG', **options)
+    return buffer.getvalue()
+
+
+def decode_rgba(data: bytes) -> np.ndarray:
+    with Image.open(io.BytesIO(data)) as img:
+        return np.asarray(img.convert('RGBA'))
+
+
+def encode(rgba: np.ndarray, palette_rgb: Optional[np.ndarray] = None,
+           lossy: bool = False) -> Optional[Tuple[bytes, str, bool]]:
+    """Return (png bytes, mode, lossless) or None when no allowed conversion exists"""
+    exact = exact_indexed(rgba)
+    if exact is not None and palette_rgb is None:
+        data = indexed_png(*exact)
+        mode = 'exact'
+    elif palette_rgb is not None:
+        data = indexed_png(*map_to_palette(rgba, palette_rgb))
+        mode = 'locked'
+    elif lossy:
+        data = indexed_png(*map_to_palette(rgba, adaptive_palette(rgba)))
+        mode = 'adaptive'
+    else:
+        return None
+
+    # The round trip is the only proof that counts
+    lossless = np.array_equal(decode_rgba(data), rgba)
+    if not lossless and not lossy:
+        return None
+    return data, mode, lossless
+
+
+def load_palette(path: Path = PALETTE_PATH) -> np.ndarray:
+    return np.asarray(json.loads(Path(path).read_text(encoding='utf-8'))['colors'], dtype=np.uint8)
+
+
+def build_palette(sources: List[str], colors: int = 255, path: Path = PALETTE_PATH) -> np.ndarray:
+    """Derive a shared palette from the opaque pixels of existing assets"""
+    pixels = []
+    for image_path in collect_pngs(sources):
+        try:
+            rgba = decode_rgba(image_path.read_bytes())
+        except (OSError, ValueError):
+            continue
+        pixels.append(rgba[rgba[..., 3] >= ALPHA_CUTOFF][:, :3])
+
+    opaque = np.concatenate(pixels)
+    rgba = np.concatenate([opaque, np.full((len(opaque), 1), 255, np.uint8)], axis=1)
+    palette = adaptive_palette(rgba.reshape(1, -1, 4), colors)
+    path.write_text(json.dumps({'colors': palette.tolist()}, indent=1), encoding='utf-8')
+    return palette
+
+
+def collect_pngs(sources: List[str]) -> List[Path]:
+    files = []
+    for source in map(Path, sources):
+        files.extend([source] if source.is_file() else source.rglob('*.png'))
+    return sorted(set(path for path in files if not path.name.startswith('.')))
+
+
+def convert_tree(sources: List[str], palette_rgb: Optional[np.ndarray] = None, lossy: bool = False,
+                 dry_run: bool = False, store: Optional[AssetStore] = None) -> Dict[str, Dict[str, int]]:
+    """Rewrite every PNG that gets smaller as an indexed PNG; returns per-directory byte totals"""
+    report: Dict[str, Dict[str, int]] = defaultdict(lambda: {'files': 0, 'converted': 0, 'lossy': 0,
+                                                             'bytes_before': 0, 'bytes_after': 0})
+    trims = load_manifest(TRIM_MANIFEST_PATH)
+    trims_changed = False
+    written = []
+
+    for path in collect_pngs(sources):
+        totals = report[str(path.parent)]
+        data = path.read_bytes()
+        totals['files'] += 1
+        totals['bytes_before'] += len(data)
+
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                already_indexed = img.mode in ('P', '1', 'L')
+                rgba = np.asarray(img.convert('RGBA'))
+            result = None if already_indexed else encode(rgba, palette_rgb, lossy)
+        except (OSError, ValueError):
+            result = None
+
+        if result is None or len(result[0]) >= len(data):
+            totals['bytes_after'] += len(data)
+            continue
+
+        encoded, mode, lossless = result
+        totals['converted'] += 1
+        totals['lossy'] += not lossless
+        totals['bytes_after'] += len(encoded)
+
+        if not dry_run:
+            parent = store.ingest(path) if store else None
+            write_atomic(path, encoded)
+            written.append(path)
+            if store:
+                store.record(path, f"palette:{mode}", parent=parent)
+
+            # Same geometry, new bytes: keep trimmed sprites recognised as already trimmed
+            trim = trims.get(client_key(path)) if trims else None
+            if trim and trim.get('sha256') == file_digest(data):
+                trim['sha256'] = file_digest(encoded)
+                trim['pixels'] = pixel_digest(rgba if lossless else decode_rgba(encoded))
+                trims_changed = True
+
+    if not dry_run:
+        if trims_changed:
+            write_atomic(TRIM_MANIFEST_PATH, json.dumps(trims, indent=1, sort_keys=True).encode('utf-8'))
+        if store:
+            store.save()
+        drop_stale_webp(client_keys(written))
+    return dict(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite pixel art as indexed palette PNGs")
+    parser.add_argument('sources', nargs='*', default=['client/assets'])
+    parser.add_argument('--palette', help="lock colours to a shared palette file (JSON)")
+    parser.add_argument('--build-palette', action='store_true',
+                        help=f"derive a shared palette from the sources into {PALETTE_PATH} and exit")
+    parser.add_argument('--lossy', action='store_true', help="allow conversions that change pixels")
+    parser.add_argument('--dry-run', action='store_true', help="report savings without writing")
+    parser.add_argument('--no-store', action='store_true', help="don't snapshot originals into the asset store")
+    args = parser.parse_args()
+
+    if args.build_palette:
+        palette = build_palette(args.sources)
+        print(f"🎨 Wrote {len(palette)} colours to {PALETTE_PATH}")
+        return
+
+    palette = load_palette(Path(args.palette)) if args.palette else None
+    store = None if args.no_store or args.dry_run else AssetStore()
+    report = convert_tree(args.sources, palette, args.lossy, args.dry_run, store)
+
+    total_before = total_after = 0
+    for directory, totals in sorted(report.items()):
+        total_before += totals['bytes_before']
+        total_after += totals['bytes_after']
+        if totals['converted']:
+            print(f"{directory}: {totals['converted']}/{totals['files']} indexed "
+                  f"({totals['lossy']} lossy), {totals['bytes_before'] / 1024:.0f} KB -> "
+                  f"{totals['bytes_after'] / 1024:.0f} KB")
+
+    print(f"\n📉 {total_before / 1e6:.2f} MB -> {total_after / 1e6:.2f} MB "
+          f"({'would save' if args.dry_run else 'saved'} {(total_before - total_after) / 1e6:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Lossless PNG Optimizer
+======================
+
+Every generator saves PNGs with Pillow's defaults: one filter heuristic, zlib
+level 6 and whatever metadata came along. This stage re-encodes each image
+several ways and keeps the smallest result whose decoded pixels are identical
+to the source:
+
+- colour type: RGBA is reduced to RGB, grey or an 8-bit palette when that
+  loses nothing (palette candidates come from palette_png.py)
+- filters: None, Sub, Up, Average, Paeth and a per-row adaptive choice, all
+  computed on whole NumPy arrays
+- zlib: every filter is screened with the cheap RLE strategy, then the best two
+  are deflated with the slower strategies (level 9 throughout with ``--effort max``)
+
+Only IHDR, PLTE, tRNS, IDAT and IEND are written, so text, time and other
+ancillary chunks are stripped. With ``--webp`` a lossless WebP sibling
+(``name.webp``) is written next to each PNG when it is smaller.
+
+``client/assets/format_manifest.json`` lists the byte size of each format per
+image (keyed by the path the client loads) and the hash of the PNG it was made
+with, so the game fetches WebP where the browser supports it. The manifest also
+remembers what was optimized: unchanged images are skipped on the next run.
+
+A WebP sibling is only valid for the PNG it was made with. Every tool that
+rewrites PNGs calls format_manifest.drop_stale_webp() after each batch, which
+deletes siblings whose PNG hash no longer matches and forgets their entries, so
+the next run redoes them.
+
+Usage:
+    python png_optimize.py                      # client/assets, all cores
+    python png_optimize.py --webp --dry-run     # report savings only
+    python png_optimize.py client/assets/tiles --effort max --workers 2
+"""
+
+import argparse
+import io
+import json
+import os
+import struct
+import time
+import zlib
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from asset_store import AssetStore
+from image_cache import cache_key, write_atomic
+from palette_png import exact_indexed, indexed_png
+from format_manifest import MANIFEST_LOCK, MANIFEST_PATH, client_key, file_digest, load_manifest
+from sprite_trim import MANIFEST_PATH as TRIM_MANIFEST_PATH
+
+ASSETS_PATH = Path("client/assets")
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+SUPPORTED_MODES = ('RGBA', 'RGB', 'LA', 'L', 'P')
+
+# PNG filter types; 'adaptive' picks the best one per row
+FILTERS = (0, 1, 2, 3, 4, 'adaptive')
+
+# Filters carried from the RLE screening pass into the slow deflate trials
+FINALISTS = 2
+
+# (zlib level, strategy) trials per effort; the first one screens every filter
+EFFORTS = {
+    'fast': [(9, zlib.Z_RLE), (6, zlib.Z_FILTERED)],
+    'max': [(9, zlib.Z_RLE), (9, zlib.Z_FILTERED), (9, zlib.Z_DEFAULT_STRATEGY)],
+}
+
+# libwebp effort per optimizer effort; method 6 is ~15x slower than 4 for ~2% less
+WEBP_METHOD = {'fast': 4, 'max': 6}
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def filter_rows(raw: np.ndarray, bpp: int, kind: int) -> np.ndarray:
+    """Apply one PNG filter to every row of an H x (W * bpp) byte array"""
+    x = raw.astype(np.int16)
+    if kind == 0:
+        return raw
+
+    # Filters predict from the unfiltered neighbours, so every row is independent
+    left = np.zeros_like(x)
+    left[:, bpp:] = x[:, :-bpp]
+    up = np.zeros_like(x)
+    up[1:] = x[:-1]
+
+    if kind == 1:
+        predicted = left
+    elif kind == 2:
+        predicted = up
+    elif kind == 3:
+        predicted = (left + up) >> 1
+    else:
+        up_left = np.zeros_like(x)
+        up_left[1:, bpp:] = x[:-1, :-bpp]
+        estimate = left + up - up_left
+        distance_left = np.abs(estimate - left)
+        distance_up = np.abs(estimate - up)
+        distance_up_left = np.abs(estimate - up_left)
+        predicted = np.where((distance_left <= distance_up) & (distance_left <= distance_up_left), left,
+                             np.where(distance_up <= distance_up_left, up, up_left))
+    return ((x - predicted) & 0xFF).astype(np.uint8)
+
+
+def filtered_stream(raw: np.ndarray, bpp: int, kind) -> bytes:
+    """Filter-type byte + filtered bytes for every row, ready for zlib"""
+    if kind == 'adaptive':
+        candidates = np.stack([filter_rows(raw, bpp, k) for k in range(5)])
+        # Usual heuristic: smallest sum of bytes read as signed deltas
+        cost = np.abs(candidates.view(np.int8).astype(np.int32)).sum(axis=2)
+        types = cost.argmin(axis=0).astype(np.uint8)
+        rows = candidates[types, np.arange(raw.shape[0])]
+    else:
+        types = np.full(raw.shape[0], kind, np.uint8)
+        rows = filter_rows(raw, bpp, kind)
+    return np.concatenate([types[:, None], rows], axis=1).tobytes()
+
+
+def deflate(data: bytes, level: int, strategy: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(data) + compressor.flush()
+
+
+def reductions(rgba: np.ndarray) -> List[Tuple[int, np.ndarray, Optional[np.ndarray]]]:
+    """Lossless (PNG colour type, H x W x channels pixels, RGBA palette) encodings of an image"""
+    opaque = bool((rgba[..., 3] == 255).all())
+    grey = bool((rgba[..., 0] == rgba[..., 1]).all() and (rgba[..., 1] == rgba[..., 2]).all())
+
+    if grey:
+        options = [(0, rgba[..., :1], None)] if opaque else [(4, rgba[..., [0, 3]], None)]
+    else:
+        options = [(2, rgba[..., :3], None)] if opaque else [(6, rgba, None)]
+
+    exact = exact_indexed(rgba)
+    if exact is not None:
+        options.append((3, exact[0][..., None], exact[1]))
+    return options
+
+
+def encode_png(pixels: np.ndarray, color_type: int, compressed: bytes,
+               palette: Optional[np.ndarray] = None) -> bytes:
+    """Assemble a minimal 8-bit PNG around an already deflated stream"""
+    height, width = pixels.shape[:2]
+    chunks = [png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))]
+    if palette is not None:
+        chunks.append(png_chunk(b'PLTE', palette[:, :3].tobytes()))
+        translucent = np.flatnonzero(palette[:, 3] < 255)
+        if len(translucent):
+            chunks.append(png_chunk(b'tRNS', palette[:translucent[-1] + 1, 3].tobytes()))
+    chunks.append(png_chunk(b'IDAT', compressed))
+    chunks.append(png_chunk(b'IEND', b''))
+    return PNG_SIGNATURE + b''.join(chunks)
+
+
+def decode_rgba(data: bytes) -> np.ndarray:
+    with Image.open(io.BytesIO(data)) as img:
+        return np.asarray(img.convert('RGBA'))
+
+
+def smallest_png(rgba: np.ndarray, effort: str = 'fast') -> Tuple[bytes, str]:
+    """Smallest verified PNG encoding of an image and a description of how it was made"""
+    screen, *trials = EFFORTS[effort]
+    best: Optional[Tuple[bytes, str]] = None
+
+    def consider(data: bytes, how: str):
+        nonlocal best
+        if best is None or len(data) < len(best[0]):
+            best = (data, how)
+
+    for color_type, pixels, palette in reductions(rgba):
+        raw = np.ascontiguousarray(pixels).reshape(pixels.shape[0], -1)
+        bpp = pixels.shape[2]
+
+        streams = {kind: filtered_stream(raw, bpp, kind) for kind in FILTERS}
+        screened = sorted(streams, key=lambda kind: len(deflate(streams[kind], *screen)))
+        for kind in screened[:FINALISTS]:
+            for level, strategy in [screen] + trials:
+                consider(encode_png(pixels, color_type, deflate(streams[kind], level, strategy), palette),
+                         f"type {color_type}, filter {kind}, zlib {level}/{strategy}")
+
+        if palette is not None:
+            # Pillow packs small palettes below 8 bits per pixel
+            consider(indexed_png(raw, palette), f"type {color_type}, packed palette")
+
+    data, how = best
+    if not np.array_equal(decode_rgba(data), rgba):
+        raise ValueError(f"Optimized PNG does not round-trip ({how})")
+    return data, how
+
+
+def lossless_webp(rgba: np.ndarray, effort: str = 'fast') -> Optional[bytes]:
+    """Lossless WebP of an image, or None if it doesn't decode to identical pixels"""
+    buffer = io.BytesIO()
+    # exact keeps the colour of fully transparent pixels, so the round trip is bit-exact
+    Image.fromarray(rgba, 'RGBA').save(buffer, 'WEBP', lossless=True, quality=100,
+                                       method=WEBP_METHOD[effort], exact=True)
+    data = buffer.getvalue()
+    return data if np.array_equal(decode_rgba(data), rgba) else None
+
+
+def optimize_job(job: Tuple[str, Dict]) -> Dict:
+    """Find the smallest PNG (and WebP) for one image (pool worker)"""
+    path, options = job
+    data = Path(path).read_bytes()
+    result = {'path': path, 'input_hash': file_digest(data), 'before': len(data), 'png': None, 'webp': None}
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if img.mode not in SUPPORTED_MODES:
+                raise ValueError(f"Unsupported mode {img.mode}")
+            rgba = np.asarray(img.convert('RGBA'))
+
+        png, how = smallest_png(rgba, options['effort'])
+        if len(png) < len(data):
+            result.update(png=png, how=how)
+        if options['webp']:
+            result['webp'] = lossless_webp(rgba, options['effort'])
+    except (OSError, ValueError, SyntaxError) as e:
+        result['error'] = str(e)
+    return result
+
+
+def collect_pngs(sources: List[str]) -> List[Path]:
+    files = []
+    for source in map(Path, sources):
+        files.extend([source] if source.is_file() else source.rglob('*.png'))
+    return sorted(set(path for path in files if not path.name.startswith('.')))
+
+
+class PngOptimizer:
+    """Parallel, incremental lossless re-encoding of an asset tree"""
+
+    def __init__(self, effort: str = 'fast', webp: bool = False, workers: Optional[int] = None,
+                 manifest_path: Path = MANIFEST_PATH, store: Optional[AssetStore] = None):
+        self.options = {'effort': effort, 'webp': webp}
+        self.config = cache_key(self.options)
+        self.workers = workers or os.cpu_count() or 1
+        self.manifest_path = Path(manifest_path)
+        self.manifest = load_manifest(self.manifest_path)
+        self.store = store
+
+    def pending(self, sources: List[str], force: bool = False) -> List[Path]:
+        """Images that are new, changed or were optimized with other settings"""
+        paths = []
+        for path in collect_pngs(sources):
+            entry = self.manifest.get(client_key(path))
+            if force or not entry or entry.get('config') != self.config \
+                    or entry.get('sha256') != file_digest(path.read_bytes()):
+                paths.append(path)
+        return paths
+
+    def run(self, sources: List[str], force: bool = False, dry_run: bool = False) -> Dict:
+        start = time.perf_counter()
+        paths = self.pending(sources, force)
+        stats = {'images': len(paths), 'rewritten': 0, 'webp': 0, 'errors': 0,
+                 'bytes_before': 0, 'bytes_after': 0, 'webp_bytes': 0}
+        jobs = [(str(path), self.options) for path in paths]
+        trims = load_manifest(TRIM_MANIFEST_PATH)
+        trims_changed = False
+
+        if jobs:
+            with Pool(min(self.workers, len(jobs))) as pool:
+                for result in pool.imap_unordered(optimize_job, jobs, chunksize=1):
+                    path = Path(result['path'])
+                    if 'error' in result:
+                        stats['errors'] += 1
+                        print(f"❌ {path}: {result['error']}")
+                        # Recorded so a broken file isn't retried until it changes
+                        if not dry_run:
+                            self.manifest[client_key(path)] = {'config': self.config, 'sha256': result['input_hash'],
+                                                               'error': result['error']}
+                        continue
+
+                    png = result['png']
+                    size = len(png) if png else result['before']
+                    stats['bytes_before'] += result['before']
+                    stats['bytes_after'] += size
+                    if png:
+                        stats['rewritten'] += 1
+                        print(f"{'Would optimize' if dry_run else 'Optimized'}: {path} "
+                              f"{result['before']:,} -> {size:,} bytes ({result['how']})")
+
+                    webp = result['webp'] if result['webp'] and len(result['webp']) < size else None
+                    if webp:
+                        stats['webp'] += 1
+                        stats['webp_bytes'] += len(webp)
+                    if dry_run:
+                        continue
+
+                    if png:
+                        parent = self.store.ingest(path) if self.store else None
+                        write_atomic(path, png)
+                        if self.store:
+                            self.store.record(path, f"optimize:{self.config}", parent=parent)
+
+                    webp_path = path.with_suffix('.webp')
+                    if webp:
+                        write_atomic(webp_path, webp)
+                    elif webp_path.exists():
+                        webp_path.unlink()
+
+                    key = client_key(path)
+                    output_hash = file_digest(png) if png else result['input_hash']
+                    entry = {'config': self.config, 'sha256': output_hash, 'png': size}
+                    if webp:
+                        entry['webp'] = len(webp)
+                    self.manifest[key] = entry
+
+                    # Same pixels, new bytes: keep trimmed sprites recognised as already trimmed
+                    trim = trims.get(key)
+                    if trim and trim.get('sha256') == result['input_hash'] and png:
+                        trim['sha256'] = output_hash
+                        trims_changed = True
+
+        if not dry_run:
+            write_atomic(self.manifest_path, json.dumps(self.manifest, indent=1, sort_keys=True).encode('utf-8'))
+            if trims_changed:
+                write_atomic(TRIM_MANIFEST_PATH, json.dumps(trims, indent=1, sort_keys=True).encode('utf-8'))
+            if self.store:
+                self.store.save()
+        stats['seconds'] = time.perf_counter() - start
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Losslessly shrink PNGs and emit WebP variants")
+    parser.add_argument('sources', nargs='*', default=[str(ASSETS_PATH)])
+    parser.add_argument('--effort', choices=sorted(EFFORTS), default='fast',
+                        help="fast (default) or max: zlib level 9 for every trial and slowest WebP")
+    parser.add_argument('--webp', action='store_true', help="also write lossless WebP siblings when smaller")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default one per core)")
+    parser.add_argument('--force', action='store_true', help="re-optimize images the manifest says are done")
+    parser.add_argument('--dry-run', action='store_true', help="report savings without writing")
+    parser.add_argument('--no-store', action='store_true', help="don't snapshot originals into the asset store")
+    args = parser.parse_args()
+
+    store = None if args.no_store or args.dry_run else AssetStore()
+    optimizer = PngOptimizer(args.effort, args.webp, args.workers, store=store)
+    stats = optimizer.run(args.sources, args.force, args.dry_run)
+
+    print(f"\n🎉 {stats['rewritten']}/{stats['images']} PNGs smaller, {stats['errors']} errors "
+          f"in {stats['seconds']:.1f}s")
+    print(f"📉 PNG: {stats['bytes_before'] / 1e6:.2f} MB -> {stats['bytes_after'] / 1e6:.2f} MB")
+    if args.webp:
+        print(f"📉 WebP siblings: {stats['webp']} images, {stats['webp_bytes'] / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Retry Policy and Circuit Breaker
+================================
+
+Wraps image API requests so transient failures don't leave holes in a batch:
+
+- Retryable errors (timeouts, 408/409/429, 5xx) are retried with jittered
+  exponential backoff, honouring ``Retry-After`` / ``retry-after-ms``.
+- Fatal errors (bad request / content policy, auth, exhausted quota) fail
+  immediately.
+- A shared circuit breaker trips when the recent error rate spikes and holds
+  every worker - serial or concurrent - until a cooldown has passed and a
+  single probe request succeeds. 429s are left to Retry-After and the token
+  bucket; they don't count as endpoint failures.
+
+Configuration (.env):
+    IMAGE_MAX_ATTEMPTS          attempts per image including the first (default 5)
+    IMAGE_BREAKER_COOLDOWN      seconds the breaker stays open (default 60)
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# 429s caused by billing rather than rate never clear up by waiting
+FATAL_ERROR_CODES = ('insufficient_quota', 'billing_hard_limit_reached')
+
+
+def is_retryable(result) -> bool:
+    """Decide whether a failed TransportResult is worth retrying"""
+    if result.ok:
+        return False
+    if result.status_code == 0:
+        # Connection error or timeout
+        return True
+    if any(code in (result.error or '') for code in FATAL_ERROR_CODES):
+        return False
+    return result.status_code in RETRYABLE_STATUS or result.status_code >= 500
+
+
+def retry_after_seconds(headers: Dict[str, str]) -> Optional[float]:
+    """Read Retry-After (seconds or HTTP date) or retry-after-ms from response headers"""
+    headers = {key.lower(): value for key, value in (headers or {}).items()}
+
+    if headers.get('retry-after-ms'):
+        try:
+            return float(headers['retry-after-ms']) / 1000.0
+        except ValueError:
+            pass
+
+    value = headers.get('retry-after')
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Pauses all callers when the recent failure ratio gets too high"""
+
+    def __init__(self, window: int = 50, failure_ratio: float = 0.5,
+                 min_requests: int = 20, cooldown: Optional[float] = None):
+        self.window = deque(maxlen=window)
+        self.failure_ratio = failure_ratio
+        self.min_requests = min_requests
+        self.cooldown = cooldown if cooldown is not None else float(os.getenv('IMAGE_BREAKER_COOLDOWN', '60'))
+        self.state = 'closed'
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._cond = threading.Condition()
+
+    def before_request(self):
+        """Block while the breaker is open; let a single probe through when half-open"""
+        with self._cond:
+            while True:
+                if self.state == 'closed':
+                    return
+
+                if self.state == 'open':
+                    remaining = self.opened_at + self.cooldown - time.monotonic()
+                    if remaining <= 0:
+                        self.state = 'half_open'
+                        continue
+                    self._cond.wait(remaining)
+                    continue
+
+                # Half-open: one probe at a time decides whether to close again
+                if not self._probe_in_flight:
+                    self._probe_in_flight = True
+                    return
+                self._cond.wait()
+
+    def record(self, success: Optional[bool]):
+        """Feed the outcome of a request; None says nothing about the endpoint's health and only frees the probe slot"""
+        with self._cond:
+            if self.state == 'half_open':
+                self._probe_in_flight = False
+                if success:
+                    self.state = 'closed'
+                    self.window.clear()
+                    print("✅ Circuit breaker probe succeeded, resuming requests")
+                elif success is False:
+                    self._trip()
+                self._cond.notify_all()
+                return
+
+            if success is None:
+                return
+            self.window.append(success)
+            failures = self.window.count(False)
+            if (self.state == 'closed' and len(self.window) >= self.min_requests
+                    and failures / len(self.window) >= self.failure_ratio):
+                self._trip()
+                self._cond.notify_all()
+
+    def _trip(self):
+        self.state = 'open'
+        self.opened_at = time.monotonic()
+        self.window.clear()
+        print(f"⛔ Error rate too high, pausing all requests for {self.cooldown:.0f}s")
+
+
+class RetryPolicy:
+    """Jittered exponential backoff around a request callable"""
+
+    def __init__(self, max_attempts: Optional[int] = None, base_delay: float = 2.0,
+                 max_delay: float = 60.0, breaker: Optional[CircuitBreaker] = None):
+        self.max_attempts = max_attempts or int(os.getenv('IMAGE_MAX_ATTEMPTS', '5'))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker
+
+    def delay_for(self, attempt: int, headers: Dict[str, str]) -> float:
+        """Seconds to wait before the next attempt"""
+        retry_after = retry_after_seconds(headers)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay * 5) + random.uniform(0, 0.5)
+
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def call(self, send: Callable[[], object]):
+        """Call send() until it succeeds, fails fatally or runs out of attempts"""
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.breaker:
+                self.breaker.before_request()
+
+            try:
+                result = send()
+            except BaseException:
+                if self.breaker:
+                    # Free the half-open probe slot, or every other worker waits on it forever
+                    self.breaker.record(False)
+                raise
+            retryable = is_retryable(result)
+
+            if self.breaker:
+                if result.ok:
+                    self.breaker.record(True)
+                elif result.status_code == 429 or not retryable:
+                    # Rate limits are handled by Retry-After and the token bucket, and fatal
+                    # client errors (bad request, auth, quota) say nothing about the endpoint's health
+                    self.breaker.record(None)
+                else:
+                    self.breaker.record(False)
+
+            result.attempts = attempt
+            if result.ok or not retryable or attempt >= self.max_attempts:
+                return result
+
+            delay = self.delay_for(attempt, result.headers)
+            reason = result.status_code or result.error
+            print(f"⏱️ {reason}, retrying (attempt {attempt + 1}/{self.max_attempts}) in {delay:.1f}s")
+            time.sleep(delay)
@@ -1,21 +1,32 @@
 from PIL import Image
 import os
 
-def restore_building_images():
-    """Restore the original building images by regenerating them"""
+from asset_store import AssetStore
+from format_manifest import client_keys, drop_stale_webp
+
+def restore_building_images(buildings_dir='client/assets/buildings'):
+    """Restore the original building images from the asset store"""
     print("Restoring original building images...")
     
-    # We need to regenerate the original building images since we don't have backups
-    # Let's create proper placeholder images that match the original generated ones
-    
-    buildings_dir = 'client/assets/buildings'
-    
     if not os.path.exists(buildings_dir):
         os.makedirs(buildings_dir)
     
-    # Since we don't have the original AI-generated images, 
-    # we need to tell the user to regenerate them
-    print("ERROR: Original images were modified and cannot be automatically restored.")
+    # Every image fix_building_transparency.py or batch_postprocess.py touches is
+    # snapshotted into the asset store first, so originals can be served again
+    store = AssetStore()
+    names = store.paths_under([buildings_dir])
+    for name in names:
+        store.revert(name)
+        print(f"Restored: {name}")
+    store.save()
+    drop_stale_webp(client_keys(names))
+    
+    if names:
+        print(f"\nRestored {len(names)} building images to their originals.")
+        return
+    
+    # Images modified before the asset store existed have no snapshot
+    print("ERROR: No snapshots of the building images were found in the asset store.")
     print("You need to regenerate the building images using your AI image generator.")
     print("\nPlease regenerate these files:")
     print("- client/assets/buildings/bank.png")
@@ -27,4 +38,4 @@ def restore_building_images():
     print("\nUse the AI prompts I provided earlier to regenerate them with proper transparency.")
 
 if __name__ == "__main__":
-    restore_building_images()
\ No newline at end of file
+    restore_building_images()
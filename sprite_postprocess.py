@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Sprite Post-Processing
+======================
+
+Turns the 1024x1024 images DALL-E returns into game-ready sprites:
+
+- ``N.png`` in the served tree is written at the size declared for the asset
+  (32x32 for terrain, the ``size`` entries in generate_world_builder_assets.py
+  for everything else), anchored bottom-centre on a transparent canvas
+- ``mips/N_16.png`` ... ``mips/N_128.png`` hold a small mip chain
+- the untouched original is archived under ``asset_masters/`` outside the
+  served tree, so derivatives can always be rebuilt
+- when the image is blocky "pixel art", pixel_grid.py recovers the true
+  low-res sprite first and it is scaled up by a whole factor, so the served
+  sprite stays crisp instead of blurred
+
+Configuration (.env):
+    SPRITE_GRID_RECOVERY    1 (default) to rebuild pixel-art grids, 0 to always resample
+
+Usage:
+    python sprite_postprocess.py --backfill            # convert existing images
+    python sprite_postprocess.py --backfill --dry-run  # report only
+"""
+
+import argparse
+import io
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    print("⚠️ Pillow not available, images will be saved without post-processing")
+
+try:
+    import numpy as np
+    from pixel_grid import recover_sprite
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from format_manifest import client_keys, drop_stale_webp
+from image_cache import write_atomic
+
+WORLD_BUILDER_PATH = Path("client/assets/world_builder")
+MASTERS_PATH = Path(os.getenv('ASSET_MASTERS_DIR', 'asset_masters')) / 'world_builder'
+
+MIP_SIZES = (16, 32, 64, 128)
+
+GRID_RECOVERY = os.getenv('SPRITE_GRID_RECOVERY', '1') != '0'
+
+# Fallback sprite sizes for types generate_world_builder_assets.py doesn't declare
+CATEGORY_SIZES = {
+    'terrain': (32, 32),
+    'trees': (48, 48),
+    'rocks': (32, 24),
+    'buildings': (64, 48),
+    'shops': (80, 64),
+    'utilities': (32, 32),
+    'decorations': (32, 32),
+    'special': (32, 32),
+}
+
+_declared_sizes = None
+
+
+def declared_sizes() -> Dict[str, Tuple[int, int]]:
+    """Sprite sizes from the world builder asset table"""
+    global _declared_sizes
+    if _declared_sizes is None:
+        from generate_world_builder_assets import assets
+        _declared_sizes = {name: tuple(config['size']) for name, config in assets.items()}
+    return _declared_sizes
+
+
+def declared_size(category: str, tile_type: str) -> Tuple[int, int]:
+    """Game size for a world builder tile type"""
+    if category == 'terrain':
+        return CATEGORY_SIZES['terrain']
+    return declared_sizes().get(tile_type, CATEGORY_SIZES.get(category, (32, 32)))
+
+
+def fit_to_canvas(img: "Image.Image", size: Tuple[int, int]) -> "Image.Image":
+    """Scale preserving aspect ratio, anchored bottom-centre on a transparent canvas"""
+    width, height = size
+    scale = min(width / img.width, height / img.height)
+
+    if scale >= 1:
+        # Nearest-neighbour keeps logical pixels hard-edged; whole factors keep them square
+        scale = int(scale) if scale >= 2 else scale
+        resample = Image.Resampling.NEAREST
+    else:
+        # BOX averages each source block, which keeps pixel-art colours flat
+        resample = Image.Resampling.BOX
+
+    scaled = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    resized = img.resize(scaled, resample)
+    if resized.size == size:
+        return resized
+
+    canvas = Image.new('RGBA', size, (0, 0, 0, 0))
+    canvas.paste(resized, ((width - scaled[0]) // 2, height - scaled[1]))
+    return canvas
+
+
+def png_bytes(img: "Image.Image") -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def sprite_source(master: "Image.Image") -> "Image.Image":
+    """The recovered pixel-art grid when there is one, otherwise the master itself"""
+    if not (GRID_RECOVERY and NUMPY_AVAILABLE):
+        return master
+
+    sprite = recover_sprite(np.asarray(master))
+    return master if sprite is None else Image.fromarray(sprite, 'RGBA')
+
+
+def render_derivatives(image_data: bytes, size: Tuple[int, int]) -> Dict[str, bytes]:
+    """Render the served sprite and its mip chain, keyed by name relative to the tile folder"""
+    master = Image.open(io.BytesIO(image_data)).convert('RGBA')
+    outputs = {'sprite': png_bytes(fit_to_canvas(sprite_source(master), size))}
+
+    for mip in MIP_SIZES:
+        scale = mip / max(master.size)
+        mip_size = (max(1, round(master.width * scale)), max(1, round(master.height * scale)))
+        outputs[f'mip{mip}'] = png_bytes(master.resize(mip_size, Image.Resampling.BOX))
+
+    return outputs
+
+
+def variant_outputs(tile_dir: Path, image_number: int, derivatives: Dict[str, bytes]) -> List[Tuple[Path, bytes]]:
+    """Map rendered derivatives to their paths in the served tree"""
+    outputs = []
+    for name, data in derivatives.items():
+        if name == 'sprite':
+            outputs.append((tile_dir / f"{image_number}.png", data))
+        else:
+            outputs.append((tile_dir / 'mips' / f"{image_number}_{name[3:]}.png", data))
+    return outputs
+
+
+def process_variant(image_data: bytes, tile_dir: Path, image_number: int,
+                    base_path: Path = WORLD_BUILDER_PATH,
+                    masters_path: Path = MASTERS_PATH) -> List[Tuple[Path, bytes]]:
+    """Archive-master plus derivative files for one generated variant"""
+    relative = tile_dir.relative_to(base_path)
+    outputs = [(masters_path / relative / f"{image_number}.png", image_data)]
+
+    if PIL_AVAILABLE:
+        size = declared_size(relative.parts[0], relative.parts[-1])
+        outputs.extend(variant_outputs(tile_dir, image_number, render_derivatives(image_data, size)))
+    else:
+        outputs.append((tile_dir / f"{image_number}.png", image_data))
+
+    return outputs
+
+
+def write_outputs(outputs: List[Tuple[Path, bytes]]):
+    """Atomically write (path, bytes) pairs, creating folders as needed, and drop WebP siblings they outdate"""
+    for path, data in outputs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, data)
+
+    drop_stale_webp(client_keys(path for path, _ in outputs))
+
+
+def backfill(base_path: Path = WORLD_BUILDER_PATH, masters_path: Path = MASTERS_PATH,
+             dry_run: bool = False, force: bool = False) -> Dict[str, int]:
+    """Convert every full-resolution N.png in the tree, archiving the original as the master"""
+    stats = {'converted': 0, 'skipped': 0, 'bytes_before': 0, 'bytes_after': 0}
+
+    for image_path in sorted(base_path.glob('*/*/*.png')):
+        if not image_path.stem.isdigit():
+            continue
+
+        tile_dir = image_path.parent
+        relative = tile_dir.relative_to(base_path)
+        size = declared_size(relative.parts[0], relative.parts[-1])
+        master_path = masters_path / relative / image_path.name
+
+        with Image.open(image_path) as img:
+            already_derived = img.width <= size[0] and img.height <= size[1]
+
+        if already_derived and not (force and master_path.exists()):
+            stats['skipped'] += 1
+            continue
+
+        source = master_path if already_derived else image_path
+        image_data = source.read_bytes()
+        outputs = process_variant(image_data, tile_dir, int(image_path.stem), base_path, masters_path)
+
+        sprite_bytes = next(len(data) for path, data in outputs if path == image_path)
+        stats['converted'] += 1
+        stats['bytes_before'] += image_path.stat().st_size
+        stats['bytes_after'] += sprite_bytes
+        print(f"{'Would convert' if dry_run else 'Converted'}: {relative / image_path.name} -> "
+              f"{size[0]}x{size[1]} ({image_path.stat().st_size // 1024} KB -> {sprite_bytes // 1024} KB)")
+
+        if not dry_run:
+            write_outputs(outputs)
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Downscale world builder images to their declared sprite sizes")
+    parser.add_argument('--backfill', action='store_true', help="convert existing full-resolution images")
+    parser.add_argument('--dry-run', action='store_true', help="report what would change without writing")
+    parser.add_argument('--force', action='store_true', help="re-render derivatives from archived masters")
+    parser.add_argument('--base-path', default=str(WORLD_BUILDER_PATH))
+    args = parser.parse_args()
+
+    if not PIL_AVAILABLE:
+        print("❌ Pillow is required: pip install pillow")
+        return
+
+    if not args.backfill:
+        parser.print_help()
+        return
+
+    stats = backfill(Path(args.base_path), MASTERS_PATH, args.dry_run, args.force)
+    print(f"\n🎉 Converted {stats['converted']} images, skipped {stats['skipped']}")
+    print(f"📉 Served bytes: {stats['bytes_before'] / 1e6:.1f} MB -> {stats['bytes_after'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
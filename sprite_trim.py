@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Sprite Alpha Trimming
+=====================
+
+Crops building, tree and rock sprites to the bounding box of their visible
+pixels, so the client stops decoding, uploading and blitting fully transparent
+margins.
+
+Placement is unchanged: ``client/assets/trim_manifest.json`` records, for every
+trimmed image (keyed by the path the client loads), the original canvas size,
+the offset of the kept box inside it and the trimmed size. The game's
+ImageManager and the world builder draw trimmed images at that offset, scaled
+exactly as the full canvas would have been, but only while the loaded image
+still has the trimmed size: a regenerated asset is drawn as a full canvas.
+
+Trimming is repeatable: the manifest remembers the hash of each trimmed file
+and of its decoded pixels, so a trimmed image trims to itself (even after a
+lossless re-encode) and a regenerated one is measured afresh.
+
+Usage:
+    python sprite_trim.py                 # default sprite folders
+    python sprite_trim.py --dry-run       # report savings only
+    python sprite_trim.py client/assets/resources --alpha-threshold 8
+"""
+
+import argparse
+import hashlib
+import io
+import json
+from collections import defaultdict
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from asset_store import AssetStore
+from format_manifest import CLIENT_ROOT, client_key, drop_stale_webp, file_digest
+from image_cache import write_atomic
+
+MANIFEST_PATH = CLIENT_ROOT / "assets" / "trim_manifest.json"
+
+DEFAULT_SOURCES = [
+    'client/assets/buildings',
+    'client/assets/resources',
+    'client/assets/world_builder',
+]
+
+BATCH_SIZE = 16
+
+# Never trimmed: terrain must stay full tiles, mips mirror the untrimmed master,
+# animation strips and variant atlases must keep their cell grid, and the town
+# building sheets their packed rects
+EXCLUDE_PATTERNS = ('*/world_builder/terrain/*', '*/mips/*', '*_anim.png', '*_variants.png', '*/buildings/town/*')
+
+
+def alpha_bboxes(alphas: np.ndarray, threshold: int = 0) -> np.ndarray:
+    """(left, top, right, bottom) of pixels with alpha > threshold, for a stack of N x H x W alphas"""
+    visible = alphas > threshold
+    rows = visible.any(axis=2)
+    cols = visible.any(axis=1)
+
+    height, width = alphas.shape[1:]
+    top = rows.argmax(axis=1)
+    bottom = height - rows[:, ::-1].argmax(axis=1)
+    left = cols.argmax(axis=1)
+    right = width - cols[:, ::-1].argmax(axis=1)
+
+    boxes = np.stack([left, top, right, bottom], axis=1)
+    # Fully transparent images keep a single pixel so they stay valid PNGs
+    empty = ~rows.any(axis=1)
+    boxes[empty] = (0, 0, 1, 1)
+    return boxes
+
+
+def pixel_digest(rgba: np.ndarray) -> str:
+    """Hash of decoded RGBA pixels, the same however the file is encoded"""
+    digest = hashlib.sha256(np.asarray(rgba.shape, np.uint32).tobytes())
+    digest.update(np.ascontiguousarray(rgba).tobytes())
+    return digest.hexdigest()
+
+
+def collect_sprites(sources: List[str]) -> List[Path]:
+    files = []
+    for source in map(Path, sources):
+        files.extend([source] if source.is_file() else source.rglob('*.png'))
+    return sorted(path for path in set(files)
+                  if not any(fnmatch(path.as_posix(), pattern) for pattern in EXCLUDE_PATTERNS))
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> Dict[str, Dict]:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def trim_sprites(sources: List[str], alpha_threshold: int = 0, dry_run: bool = False,
+                 manifest_path: Path = MANIFEST_PATH, store: Optional[AssetStore] = None) -> Dict[str, int]:
+    """Trim every sprite under the sources, update the manifest and return savings"""
+    manifest = load_manifest(manifest_path)
+    stats = {'images': 0, 'trimmed': 0, 'file_bytes_before': 0, 'file_bytes_after': 0,
+             'pixels_before': 0, 'pixels_after': 0}
+    written = []
+
+    def trim_batch(batch: List[Tuple[Path, bytes, np.ndarray]]):
+        boxes = alpha_bboxes(np.stack([rgba[..., 3] for _, _, rgba in batch]), alpha_threshold)
+        for (path, data, rgba), box in zip(batch, boxes.tolist()):
+            trim_one(path, data, rgba, box)
+
+    def trim_one(path: Path, data: bytes, rgba: np.ndarray, box: List[int]):
+        left, top, right, bottom = box
+        key = client_key(path)
+        height, width = rgba.shape[:2]
+        previous = manifest.get(key)
+
+        # Our own earlier output, even re-encoded since, keeps its original canvas and accumulates the offset
+        if previous and (previous.get('sha256') == file_digest(data)
+                         or previous.get('pixels') == pixel_digest(rgba)):
+            canvas = previous['canvas']
+            base_x, base_y = previous['offset']
+        else:
+            canvas = [width, height]
+            base_x, base_y = 0, 0
+
+        stats['images'] += 1
+        stats['pixels_before'] += canvas[0] * canvas[1]
+        stats['pixels_after'] += (right - left) * (bottom - top)
+        stats['file_bytes_before'] += len(data)
+
+        entry = {'canvas': canvas, 'offset': [base_x + left, base_y + top], 'size': [right - left, bottom - top]}
+        if (left, top, right, bottom) == (0, 0, width, height):
+            stats['file_bytes_after'] += len(data)
+            if canvas != [width, height]:
+                manifest[key] = dict(entry, sha256=file_digest(data), pixels=pixel_digest(rgba))
+            else:
+                # Regenerated without margins: a stale entry would misplace it
+                manifest.pop(key, None)
+            return
+
+        kept = np.ascontiguousarray(rgba[top:bottom, left:right])
+        buffer = io.BytesIO()
+        Image.fromarray(kept, 'RGBA').save(buffer, 'PNG')
+        trimmed = buffer.getvalue()
+        stats['trimmed'] += 1
+        stats['file_bytes_after'] += len(trimmed)
+        manifest[key] = dict(entry, sha256=file_digest(trimmed), pixels=pixel_digest(kept))
+        print(f"{'Would trim' if dry_run else 'Trimmed'}: {key} {width}x{height} -> "
+              f"{right - left}x{bottom - top} at ({base_x + left}, {base_y + top})")
+
+        if not dry_run:
+            parent = store.ingest(path) if store else None
+            write_atomic(path, trimmed)
+            written.append(key)
+            if store:
+                store.record(path, f"trim:{alpha_threshold}", parent=parent)
+
+    # Same-sized images are measured together in one vectorized pass, a batch at a time
+    pending: Dict[Tuple[int, int], List] = defaultdict(list)
+    for path in collect_sprites(sources):
+        try:
+            data = path.read_bytes()
+            with Image.open(io.BytesIO(data)) as img:
+                rgba = np.asarray(img.convert('RGBA'))
+        except (OSError, ValueError):
+            print(f"❌ Unreadable image: {path}")
+            continue
+
+        batch = pending[rgba.shape[:2]]
+        batch.append((path, data, rgba))
+        if len(batch) == BATCH_SIZE:
+            trim_batch(batch)
+            batch.clear()
+
+    for batch in pending.values():
+        if batch:
+            trim_batch(batch)
+
+    if not dry_run:
+        write_atomic(manifest_path, json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+        if store:
+            store.save()
+        drop_stale_webp(written)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trim transparent margins from sprites")
+    parser.add_argument('sources', nargs='*', default=DEFAULT_SOURCES)
+    parser.add_argument('--alpha-threshold', type=int, default=0,
+                        help="alpha at or below this counts as transparent (default 0)")
+    parser.add_argument('--dry-run', action='store_true', help="report savings without writing")
+    parser.add_argument('--no-store', action='store_true', help="don't snapshot originals into the asset store")
+    args = parser.parse_args()
+
+    store = None if args.no_store or args.dry_run else AssetStore()
+    stats = trim_sprites(args.sources, args.alpha_threshold, args.dry_run, store=store)
+
+    saved_pixels = stats['pixels_before'] - stats['pixels_after']
+    print(f"\n🎉 Trimmed {stats['trimmed']}/{stats['images']} sprites")
+    print(f"📉 Texture memory: {stats['pixels_before'] * 4 / 1e6:.1f} MB -> {stats['pixels_after'] * 4 / 1e6:.1f} MB "
+          f"({saved_pixels * 4 / 1e6:.1f} MB of RGBA saved)")
+    print(f"📉 Blit pixels per full draw of every sprite: {stats['pixels_before']:,} -> {stats['pixels_after']:,}")
+    print(f"📉 Files: {stats['file_bytes_before'] / 1e6:.1f} MB -> {stats['file_bytes_after'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test snapshotting, reverting and garbage-collecting the asset store
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+from asset_store import AssetStore, file_hash
+from image_cache import write_atomic
+
+
+def in_folder(test):
+    """Run a test with the working directory inside a fresh folder, as refs are relative paths"""
+    def run():
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as folder:
+            os.chdir(folder)
+            try:
+                test()
+            finally:
+                os.chdir(cwd)
+    run.__name__ = test.__name__
+    return run
+
+
+def served(name, data):
+    path = Path('client/assets') / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+@in_folder
+def test_revert_restores_the_original():
+    store = AssetStore('.asset_store', mode='copy')
+    path = served('tree.png', b'original')
+    original = store.ingest(path)
+
+    write_atomic(path, b'trimmed')
+    trimmed = store.record(path, 'trim')
+    assert store.refs['client/assets/tree.png']['current'] == trimmed != original
+
+    assert store.revert(path)
+    assert path.read_bytes() == b'original'
+    assert not store.revert('client/assets/unknown.png')
+
+    # A change made behind the store's back is undone too
+    path.chmod(0o644)
+    path.write_bytes(b'edited by hand')
+    store.revert(path)
+    assert path.read_bytes() == b'original'
+
+
+@in_folder
+def test_hardlinks_share_one_object():
+    store = AssetStore('.asset_store', mode='hardlink')
+    first = served('a.png', b'placeholder')
+    second = served('b.png', b'placeholder')
+    store.ingest(first)
+    store.ingest(second)
+
+    assert first.stat().st_ino == second.stat().st_ino
+    assert first.stat().st_nlink == 3
+    assert store.stats()['objects'] == 1
+
+    # Writers replace the link rather than editing the shared object
+    write_atomic(first, b'keyed')
+    store.record(first, 'key')
+    assert second.read_bytes() == b'placeholder'
+    assert file_hash(store.find_object(file_hash(second))) == file_hash(second)
+
+
+@in_folder
+def test_known_derivatives_are_reused():
+    store = AssetStore('.asset_store', mode='copy')
+    path = served('rock.png', b'raw')
+    parent = store.ingest(path)
+    assert store.apply_derived(path, parent, 'trim') is None
+
+    write_atomic(path, b'raw trimmed')
+    trimmed = store.record(path, 'trim')
+    store.revert(path)
+
+    assert store.apply_derived(path, parent, 'trim') == trimmed
+    assert path.read_bytes() == b'raw trimmed'
+
+
+@in_folder
+def test_gc_keeps_history_unless_asked():
+    store = AssetStore('.asset_store', mode='copy')
+    path = served('house.png', b'v1')
+    store.ingest(path)
+    for version in (b'v2', b'v3'):
+        write_atomic(path, version)
+        store.record(path, 'edit')
+
+    assert store.gc() == 0
+    assert store.stats()['objects'] == 3
+
+    # Dropping history keeps the original and what is being served
+    assert store.gc(keep_history=False) == len(b'v2')
+    assert store.stats()['objects'] == 2
+    store.revert(path)
+    assert path.read_bytes() == b'v1'
+
+    # Refs survive a reload
+    store.save()
+    assert AssetStore('.asset_store').refs == store.refs
+
+
+if __name__ == "__main__":
+    test_revert_restores_the_original()
+    test_hardlinks_share_one_object()
+    test_known_derivatives_are_reused()
+    test_gc_keeps_history_unless_asked()
+    print("SUCCESS: asset store tests passed")
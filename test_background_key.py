@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test border flood-fill background removal
+"""
+
+import numpy as np
+
+from background_key import border_mask, remove_background
+
+WHITE = (255, 255, 255, 255)
+WALL = (120, 80, 60, 255)
+
+
+def building():
+    """White background, a walled building with a white window inside and a spiral-shaped courtyard"""
+    rgba = np.zeros((40, 40, 4), dtype=np.uint8)
+    rgba[:] = WHITE
+    rgba[5:35, 5:35] = WALL
+    rgba[10:16, 10:16] = WHITE                      # enclosed window
+    rgba[20:30, 20:35] = WHITE                      # courtyard open to the right edge...
+    rgba[22:28, 20:32] = WALL
+    rgba[24:26, 22:32] = WHITE                      # ...winding back in
+    return rgba
+
+
+def test_flood_keeps_enclosed_whites():
+    keyed = remove_background(building(), mode='flood')
+    alpha = keyed[..., 3]
+
+    assert alpha[0, 0] == 0 and alpha[39, 20] == 0, "border background should be cleared"
+    assert (alpha[10:16, 10:16] == 255).all(), "enclosed window should survive"
+    assert (alpha[5:10, 5:35] == 255).all(), "wall should be untouched"
+    assert alpha[20, 34] == 0 and alpha[25, 25] == 0, "courtyard reached through its opening should be cleared"
+
+
+def test_key_mode_clears_every_white():
+    keyed = remove_background(building(), mode='key')
+    assert (keyed[10:16, 10:16, 3] == 0).all()
+    assert (keyed[5:10, 5:35, 3] == 255).all()
+
+
+def test_unknown_mode_is_rejected():
+    try:
+        remove_background(building(), mode='global')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("remove_background() accepted an unknown mode")
+
+
+def test_keying_is_idempotent():
+    once = remove_background(building(), mode='flood')
+    assert np.array_equal(remove_background(once, mode='flood'), once)
+
+
+def test_border_mask_follows_turns():
+    candidate = np.zeros((7, 7), dtype=bool)
+    candidate[0, 1] = candidate[1, 1:6] = candidate[1:6, 5] = candidate[5, 2:6] = True
+    candidate[3, 3] = True                          # isolated
+    reached = border_mask(candidate)
+    assert reached[5, 2] and not reached[3, 3]
+
+
+if __name__ == "__main__":
+    test_flood_keeps_enclosed_whites()
+    test_key_mode_clears_every_white()
+    test_unknown_mode_is_rejected()
+    test_keying_is_idempotent()
+    test_border_mask_follows_turns()
+    print("SUCCESS: background key tests passed")
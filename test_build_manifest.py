@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test incremental builds with the build manifest
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+from asset_registry import AssetJob, build
+from build_manifest import BuildManifest
+
+
+def draw_square(size, color):
+    return Image.new('RGBA', (size, size), color)
+
+
+def copy_prompt(source):
+    return Path(source).read_text(encoding='utf-8').upper()
+
+
+def jobs_in(folder, color=(200, 40, 40, 255)):
+    prompt = os.path.join(folder, 'prompt.txt')
+    return [
+        AssetJob(os.path.join(folder, 'square.png'), draw_square, (16, color)),
+        AssetJob(os.path.join(folder, 'prompt_upper.txt'), copy_prompt, (prompt,), inputs=(prompt,)),
+    ]
+
+
+def rebuild(folder, jobs, **options):
+    """Build with a freshly loaded manifest, as a new build_assets.py run would"""
+    return build(jobs, manifest=BuildManifest(Path(folder) / 'manifest.json'), **options)
+
+
+def test_second_build_is_a_no_op():
+    with tempfile.TemporaryDirectory() as folder:
+        Path(folder, 'prompt.txt').write_text('oak tree', encoding='utf-8')
+        jobs = jobs_in(folder)
+
+        results, kept, fresh = rebuild(folder, jobs)
+        assert [result['reasons'] for result in results] == [["output missing"]] * 2
+        assert all(result['changed'] for result in results)
+        mtimes = [Path(job.output).stat().st_mtime_ns for job in jobs]
+
+        results, kept, fresh = rebuild(folder, jobs)
+        assert results == [] and kept == [] and fresh == jobs
+        assert [Path(job.output).stat().st_mtime_ns for job in jobs] == mtimes
+
+
+def test_only_stale_jobs_run():
+    with tempfile.TemporaryDirectory() as folder:
+        Path(folder, 'prompt.txt').write_text('oak tree', encoding='utf-8')
+        rebuild(folder, jobs_in(folder))
+
+        results, _, fresh = rebuild(folder, jobs_in(folder, color=(40, 200, 40, 255)))
+        assert [result['reasons'] for result in results] == [["parameters changed"]]
+        assert len(fresh) == 1
+
+        Path(folder, 'prompt.txt').write_text('willow tree', encoding='utf-8')
+        results, _, _ = rebuild(folder, jobs_in(folder, color=(40, 200, 40, 255)))
+        assert results[0]['reasons'] == [f"input {os.path.join(folder, 'prompt.txt')} changed"]
+        assert Path(folder, 'prompt_upper.txt').read_text(encoding='utf-8') == 'WILLOW TREE'
+
+        os.remove(os.path.join(folder, 'square.png'))
+        results, _, _ = rebuild(folder, jobs_in(folder, color=(40, 200, 40, 255)))
+        assert [result['reasons'] for result in results] == [["output missing"]]
+
+
+def test_identical_bytes_leave_the_file_alone():
+    with tempfile.TemporaryDirectory() as folder:
+        Path(folder, 'prompt.txt').write_text('oak tree', encoding='utf-8')
+        jobs = jobs_in(folder)
+        rebuild(folder, jobs)
+        mtime = Path(jobs[0].output).stat().st_mtime_ns
+
+        results, _, _ = rebuild(folder, jobs, force=True)
+        assert all(result['reasons'] == ["forced"] and not result['changed'] for result in results)
+        assert Path(jobs[0].output).stat().st_mtime_ns == mtime
+
+
+def test_fallbacks_never_replace_real_art():
+    with tempfile.TemporaryDirectory() as folder:
+        output = os.path.join(folder, 'house.png')
+        placeholder = AssetJob(output, draw_square, (16, (90, 90, 90, 255)), fallback=True)
+        rebuild(folder, [placeholder])
+
+        # Still our placeholder: a changed fallback may update it
+        results, _, _ = rebuild(folder, [placeholder._replace(args=(16, (120, 120, 120, 255)))])
+        assert len(results) == 1
+
+        draw_square(32, (10, 20, 30, 255)).save(output)
+        results, kept, _ = rebuild(folder, [placeholder._replace(args=(16, (1, 1, 1, 255)))])
+        assert results == [] and len(kept) == 1
+        with Image.open(output) as img:
+            assert img.size == (32, 32)
+
+
+if __name__ == "__main__":
+    test_second_build_is_a_no_op()
+    test_only_stale_jobs_run()
+    test_identical_bytes_leave_the_file_alone()
+    test_fallbacks_never_replace_real_art()
+    print("SUCCESS: build manifest tests passed")
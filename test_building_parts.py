@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test composing town buildings from the parts atlas
+"""
+
+import json
+
+import numpy as np
+
+from building_parts import (BuildingLayout, DOOR_STEP, ROOF_STEP, TONES, PartsAtlas, colorize, compose, palette,
+                            snap)
+from generate_town_buildings import create_town_manifest, create_town_sheet, town_layouts, town_rects
+
+LAYOUT = BuildingLayout(64, 48, wall='brick', wall_color=(160, 140, 100), roof='gable',
+                        roof_color=(120, 80, 60), windows=2, sign=(255, 215, 0), chimney=(140, 70, 50))
+
+
+def test_compose_at_every_scale():
+    sprites = {scale: compose(LAYOUT, PartsAtlas(scale)) for scale in (1, 2, 3)}
+    for scale, sprite in sprites.items():
+        assert sprite.shape == (48 * scale, 64 * scale, 4)
+        # The wall fills the bottom row edge to edge
+        assert (sprite[-1, :, 3] == 255).all()
+
+    # Parts are drawn per scale, not upscaled, but keep the same silhouette
+    for scale in (2, 3):
+        coarse = sprites[scale][::scale, ::scale, 3] > 0
+        assert (coarse != (sprites[1][..., 3] > 0)).mean() < 0.03
+
+
+def test_roofs_and_doors_share_slots_across_colours():
+    assert snap((61, 17), ROOF_STEP) == (56, 16)
+    assert snap((3, 2), ROOF_STEP) == (8, 4)
+    assert snap((13, 22), DOOR_STEP) == (12, 20)
+
+    atlas = PartsAtlas(2)
+    red = atlas.roof('gable', (140, 50, 40), 62, 17)
+    slate = atlas.roof('gable', (70, 70, 80), 57, 16)
+    assert red.shape == slate.shape == (32, 112, 4)
+    atlas.door('arched', (80, 50, 30), (139, 69, 19), 12, 20)
+    atlas.door('arched', (60, 70, 90), (200, 200, 200), 13, 21)
+    assert sorted(key[0] for key in atlas.slots) == ['door', 'roof']
+
+    # Same shape, each in its own colours
+    assert np.array_equal(red[..., 3], slate[..., 3])
+    assert not np.array_equal(red[..., :3], slate[..., :3])
+
+
+def test_tone_maps_colour_exactly():
+    part = np.zeros((1, len(TONES), 4), np.uint8)
+    part[0, :, 0] = np.arange(len(TONES))
+    part[0, :, 3] = 255
+    sprite = colorize(part, (100, 100, 100), accent=(1, 2, 3))
+    assert np.array_equal(sprite[0, :, :3], palette((100, 100, 100), (1, 2, 3)))
+    assert sprite[0, 0, :3].tolist() == [100, 100, 100] and sprite[0, -1, :3].tolist() == [1, 2, 3]
+
+
+def test_town_sheet_matches_its_manifest():
+    count = 12
+    rects, height = town_rects(count)
+    manifest = json.loads(create_town_manifest(count, (1, 2)))
+    assert [building['rect'] for building in manifest['buildings']] == rects
+    assert set(manifest['sheets']) == {'1', '2'}
+
+    # Packed without overlaps, inside the sheet
+    covered = np.zeros((height, 1024), int)
+    for x, y, w, h in rects:
+        covered[y:y + h, x:x + w] += 1
+    assert covered.max() == 1
+
+    sheet = np.asarray(create_town_sheet(count, 2))
+    assert sheet.shape == (height * 2, 2048, 4)
+    atlas = PartsAtlas(2)
+    for (x, y, w, h), layout in list(zip(rects, town_layouts(count)))[:3]:
+        assert np.array_equal(sheet[y * 2:(y + h) * 2, x * 2:(x + w) * 2], compose(layout, atlas))
+
+
+if __name__ == "__main__":
+    test_compose_at_every_scale()
+    test_roofs_and_doors_share_slots_across_colours()
+    test_tone_maps_colour_exactly()
+    test_town_sheet_matches_its_manifest()
+    print("SUCCESS: building parts tests passed")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test pattern-cached floors and furniture stamps
+"""
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from floor_tiling import cached_stamp, checker, flagstone, planks, solid, stamp, stamp_all, tile_floor
+
+LIGHT, DARK, GROUT = (160, 160, 160), (120, 120, 120), (80, 80, 80)
+
+
+def test_tile_floor_repeats_from_offset():
+    pattern = np.arange(6 * 4 * 4, dtype=np.uint8).reshape(6, 4, 4)
+    floor = tile_floor(pattern, 10, 13, offset=(3, 5))
+    assert floor.shape == (13, 10, 4) and floor.flags.writeable
+
+    for y, x in ((0, 0), (7, 9), (12, 4)):
+        assert np.array_equal(floor[y, x], pattern[(y + 5) % 6, (x + 3) % 4])
+
+    # Neighbouring rooms offset by their position line up with one big floor
+    whole = tile_floor(pattern, 20, 13)
+    assert np.array_equal(np.hstack([tile_floor(pattern, 7, 13), tile_floor(pattern, 13, 13, offset=(7, 0))]), whole)
+
+
+def test_patterns_are_cached_and_read_only():
+    tile = checker(8, LIGHT, DARK, GROUT)
+    assert tile is checker(8, LIGHT, DARK, GROUT)
+    assert not tile.flags.writeable
+    assert tile.shape == (16, 16, 4)
+    assert tile[0, 5, :3].tolist() == list(GROUT) and tile[3, 12, :3].tolist() == list(DARK)
+
+    boards = planks(6, (LIGHT, DARK), GROUT, length=24)
+    assert boards.shape == (12, 24, 4)
+    # Staggered joints: each row of boards ends in a different column
+    assert boards[3, 0, :3].tolist() == list(GROUT) and boards[9, 12, :3].tolist() == list(GROUT)
+    assert boards[9, 0, :3].tolist() == list(DARK)
+
+    stones = flagstone(8, (LIGHT, DARK), GROUT, 'test_floor')
+    assert np.array_equal(stones, flagstone(8, (LIGHT, DARK), GROUT, 'test_floor'))
+    assert stones.shape == (32, 32, 4)
+
+
+def test_stamp_blends_and_clips():
+    canvas = solid(8, 8, (0, 0, 200))
+    sprite = np.zeros((4, 4, 4), np.uint8)
+    sprite[..., 0] = 255
+    sprite[:, :2, 3] = 255
+    sprite[:, 2:, 3] = 128
+
+    stamp(canvas, sprite, -1, 6)
+    assert canvas[6, 0].tolist() == [255, 0, 0, 255]
+    assert canvas[6, 1].tolist() == [128, 0, 100, 255]
+    assert canvas[5, 0].tolist() == [0, 0, 200, 255]
+    assert (canvas[:, 3:, 0] == 0).all()
+
+    # Fully outside is a no-op
+    before = canvas.copy()
+    stamp_all(canvas, sprite, [(8, 0), (0, -4), (-10, -10)])
+    assert np.array_equal(canvas, before)
+
+
+def test_cached_stamp_draws_each_size_once():
+    calls = []
+
+    @cached_stamp
+    def counter(width, height):
+        calls.append((width, height))
+        img = Image.new('RGBA', (width, height))
+        ImageDraw.Draw(img).rectangle([0, 0, width - 1, height - 1], fill=(139, 69, 19))
+        return img
+
+    first = counter(12, 4)
+    assert counter(12, 4) is first and calls == [(12, 4)]
+    assert first.shape == (4, 12, 4) and not first.flags.writeable
+    counter(6, 4)
+    assert calls == [(12, 4), (6, 4)]
+
+    floor = tile_floor(checker(8, LIGHT, DARK, GROUT), 32, 16)
+    stamp(floor, first, 2, 2)
+    assert floor[3, 5, :3].tolist() == [139, 69, 19]
+
+
+if __name__ == "__main__":
+    test_tile_floor_repeats_from_offset()
+    test_patterns_are_cached_and_read_only()
+    test_stamp_blends_and_clips()
+    test_cached_stamp_draws_each_size_once()
+    print("SUCCESS: floor tiling tests passed")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test the token bucket that paces batch generation
+"""
+
+import asyncio
+import time
+
+from generation_engine import TokenBucket, parse_reset_duration
+
+
+async def acquire_times(bucket, count):
+    start = time.monotonic()
+    times = []
+    for _ in range(count):
+        await bucket.acquire()
+        times.append(time.monotonic() - start)
+    return times
+
+
+def test_burst_then_refill_rate():
+    # 600 requests per minute = 10 tokens per second, with a burst of 2
+    bucket = TokenBucket(600, capacity=2)
+    times = asyncio.run(acquire_times(bucket, 4))
+
+    assert times[1] < 0.05, "the burst should not wait"
+    assert 0.08 <= times[2] < 0.2, times
+    assert 0.18 <= times[3] < 0.3, times
+
+
+def test_rate_limit_headers_pause_the_bucket():
+    bucket = TokenBucket(600, capacity=5)
+    bucket.update_from_headers({'x-ratelimit-remaining-requests': '0', 'x-ratelimit-reset-requests': '200ms'})
+    assert bucket.tokens == 0
+
+    times = asyncio.run(acquire_times(bucket, 1))
+    assert 0.18 <= times[0] < 0.35, times
+
+
+def test_reset_durations():
+    assert parse_reset_duration('1m30s') == 90
+    assert parse_reset_duration('250ms') == 0.25
+    assert parse_reset_duration('2') == 2
+    assert parse_reset_duration(None) is None
+
+
+if __name__ == "__main__":
+    test_burst_then_refill_rate()
+    test_rate_limit_headers_pause_the_bucket()
+    test_reset_durations()
+    print("SUCCESS: token bucket tests passed")
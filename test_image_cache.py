@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed generation cache
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from image_cache import ImageCache
+
+
+def test_hit_miss_and_corruption():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ImageCache(folder, max_bytes=10_000, max_age_days=0)
+        payload = {'prompt': 'oak tree', 'size': '1024x1024'}
+
+        assert cache.get(payload) is None
+        cache.put(payload, b'png bytes')
+        assert cache.get(payload) == b'png bytes'
+        assert cache.get(dict(payload, size='512x512')) is None
+
+        # A truncated entry is dropped instead of returned
+        data_path, _ = cache._paths(cache.put(payload, b'png bytes'))
+        data_path.write_bytes(b'png')
+        assert cache.get(payload) is None
+        assert not data_path.exists()
+
+
+def test_least_recently_used_is_evicted():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ImageCache(folder, max_bytes=250, max_age_days=0)
+        first, second, third = ({'prompt': name} for name in ('first', 'second', 'third'))
+
+        # second was used longer ago than first
+        for payload, age in ((first, 20), (second, 60)):
+            stamp = time.time() - age
+            os.utime(cache._paths(cache.put(payload, b'x' * 100))[1], (stamp, stamp))
+
+        cache.put(third, b'c' * 100)
+        assert cache.get(second) is None
+        assert cache.get(first) is not None
+        assert cache.get(third) is not None
+        assert cache.stats()['bytes'] <= 250
+
+
+def test_expired_entries_are_misses():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ImageCache(folder, max_bytes=10_000, max_age_days=1)
+        payload = {'prompt': 'old'}
+        key = cache.put(payload, b'old bytes')
+
+        _, meta_path = cache._paths(key)
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        meta['created'] -= 2 * 86400
+        meta_path.write_text(json.dumps(meta), encoding='utf-8')
+        assert cache.get(payload) is None
+        assert cache.stats()['entries'] == 0
+
+
+if __name__ == "__main__":
+    test_hit_miss_and_corruption()
+    test_least_recently_used_is_evicted()
+    test_expired_entries_are_misses()
+    print("SUCCESS: image cache tests passed")
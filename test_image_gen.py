@@ -1,14 +1,25 @@
 #!/usr/bin/env python3
 """
 Test a single image generation to make sure it works
+
+Pass --mock to run against a local mock_image_server.py instead of the real API.
 """
 
+import os
+import sys
+
 from tile_image_generator_simple import TileImageGenerator
 
 def test_single_generation():
     print("Testing Single Image Generation...")
     print("=" * 40)
     
+    if '--mock' in sys.argv:
+        from mock_image_server import start_mock_server
+        server = start_mock_server()
+        os.environ['OPENAI_BASE_URL'] = server.base_url
+        print(f"Using mock server at {server.base_url}")
+    
     generator = TileImageGenerator()
     
     # Test with a simple prompt
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test resuming a batch from the job journal
+"""
+
+import os
+import tempfile
+
+from job_journal import JobJournal
+
+JOBS = [
+    ('trees/tree_oak/prompts.txt', {'number': n, 'style': 'pixel', 'prompt': f"oak tree {n}"})
+    for n in (1, 2, 3)
+]
+
+
+def test_resume_after_restart():
+    with tempfile.TemporaryDirectory() as folder:
+        db_path = os.path.join(folder, 'journal.sqlite')
+        journal = JobJournal(db_path)
+        journal.enqueue(JOBS)
+        journal.mark(JOBS[0][0], 1, 'requested')
+        journal.mark(JOBS[0][0], 1, 'saved')
+        journal.mark(JOBS[0][0], 2, 'requested')
+        journal.mark(JOBS[0][0], 2, 'downloaded', cache_key='abc123')
+        journal.close()
+
+        # A new process only sees the unfinished jobs, with what it needs to finish them
+        resumed = JobJournal(db_path)
+        pending = {data['number']: data for _, data in resumed.pending()}
+        assert sorted(pending) == [2, 3]
+        assert pending[2]['state'] == 'downloaded' and pending[2]['cache_key'] == 'abc123'
+        assert pending[3]['state'] == 'queued' and pending[3]['prompt'] == 'oak tree 3'
+        assert resumed.counts() == {'saved': 1, 'downloaded': 1, 'queued': 1}
+        resumed.close()
+
+
+def test_requeue_keeps_progress():
+    with tempfile.TemporaryDirectory() as folder:
+        journal = JobJournal(os.path.join(folder, 'journal.sqlite'))
+        journal.enqueue(JOBS)
+        journal.mark(JOBS[0][0], 1, 'saved')
+        journal.mark(JOBS[0][0], 2, 'downloaded', cache_key='abc123')
+
+        # Enqueueing again (e.g. regenerating the same prompts) redoes saved jobs but keeps partial ones
+        journal.enqueue(JOBS)
+        states = {data['number']: data['state'] for _, data in journal.pending()}
+        assert states == {1: 'queued', 2: 'downloaded', 3: 'queued'}
+
+        journal.mark(JOBS[0][0], 3, 'saved')
+        journal.clear_saved()
+        assert journal.counts() == {'queued': 1, 'downloaded': 1}
+        journal.close()
+
+
+def test_unknown_state_is_rejected():
+    with tempfile.TemporaryDirectory() as folder:
+        journal = JobJournal(os.path.join(folder, 'journal.sqlite'))
+        try:
+            journal.mark(JOBS[0][0], 1, 'done')
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("mark() accepted an unknown state")
+        finally:
+            journal.close()
+
+
+if __name__ == "__main__":
+    test_resume_after_restart()
+    test_requeue_keeps_progress()
+    test_unknown_state_is_rejected()
+    print("SUCCESS: job journal tests passed")
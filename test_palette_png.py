@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test indexed palette PNG conversion round trips
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from palette_png import convert_tree, decode_rgba, encode, exact_indexed, indexed_png, map_to_palette
+from sprite_trim import trim_sprites
+
+
+def pixel_art(rng, colors=12):
+    """Few-colour sprite with transparent, semi-transparent and opaque pixels"""
+    palette = rng.integers(0, 256, (colors, 4), dtype=np.uint8)
+    palette[0] = 0
+    palette[1:, 3] = 255
+    palette[1, 3] = 96
+    return palette[rng.integers(0, colors, (24, 32))]
+
+
+def test_exact_round_trip():
+    rgba = pixel_art(np.random.default_rng(1))
+    indices, palette = exact_indexed(rgba)
+    assert len(palette) <= 12
+    assert np.array_equal(decode_rgba(indexed_png(indices, palette)), rgba)
+
+    data, mode, lossless = encode(rgba)
+    assert mode == 'exact' and lossless
+
+
+def test_too_many_colours_need_lossy():
+    rng = np.random.default_rng(2)
+    rgba = rng.integers(0, 256, (32, 32, 4), dtype=np.uint8)
+    rgba[..., 3] = 255
+    assert exact_indexed(rgba) is None
+    assert encode(rgba) is None
+
+    data, mode, lossless = encode(rgba, lossy=True)
+    assert mode == 'adaptive' and not lossless
+    assert decode_rgba(data).shape == rgba.shape
+
+
+def test_locked_palette_maps_to_nearest():
+    palette_rgb = np.array([[0, 0, 0], [250, 0, 0], [0, 0, 250]], dtype=np.uint8)
+    rgba = np.array([[[240, 10, 5, 255], [5, 5, 230, 128], [9, 9, 9, 0]]], dtype=np.uint8)
+    indices, palette = map_to_palette(rgba, palette_rgb)
+
+    decoded = decode_rgba(indexed_png(indices, palette))
+    assert decoded[0, 0].tolist() == [250, 0, 0, 255]
+    assert decoded[0, 1].tolist() == [0, 0, 250, 128]
+    assert decoded[0, 2, 3] == 0
+
+
+def test_convert_tree_keeps_trimmed_sprites_recognised():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            path = Path('client/assets/resources/bush.png')
+            path.parent.mkdir(parents=True)
+            rgba = np.zeros((20, 20, 4), np.uint8)
+            rgba[4:16, 2:18] = pixel_art(np.random.default_rng(3))[:12, :16]
+            Image.fromarray(rgba, 'RGBA').save(path, 'PNG')
+            trim_sprites(['client/assets/resources'])
+            trimmed = decode_rgba(path.read_bytes())
+
+            report = convert_tree(['client/assets'])
+            assert report['client/assets/resources']['converted'] == 1
+            assert np.array_equal(decode_rgba(path.read_bytes()), trimmed)
+            entry = json.loads(Path('client/assets/trim_manifest.json').read_text())['assets/resources/bush.png']
+            assert entry['canvas'] == [20, 20]
+
+            # The indexed file is still the trimmed sprite, so re-trimming leaves it alone
+            data = path.read_bytes()
+            assert trim_sprites(['client/assets/resources'])['trimmed'] == 0
+            assert path.read_bytes() == data
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_exact_round_trip()
+    test_too_many_colours_need_lossy()
+    test_locked_palette_maps_to_nearest()
+    test_convert_tree_keeps_trimmed_sprites_recognised()
+    print("SUCCESS: palette PNG tests passed")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test pixel-art grid recovery from upscaled, noisy sprites
+"""
+
+import numpy as np
+
+from pixel_grid import detect_grid, recover_sprite
+
+
+def upscale(sprite, pitch, offset, noise, rng):
+    """Blow a sprite up by a fractional pitch, shifted by offset, with per-pixel noise like a generated image"""
+    cells = sprite.shape[0]
+    size = int(cells * pitch) + 2 * offset
+    index = ((np.arange(size) - offset) / pitch).astype(int).clip(0, cells - 1)
+    image = sprite[index[:, None], index[None, :]].astype(int)
+    image[..., :3] += rng.integers(-noise, noise + 1, image[..., :3].shape)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def test_recovers_fractional_pitch():
+    rng = np.random.default_rng(3)
+    sprite = rng.integers(0, 256, (16, 16, 4), dtype=np.uint8)
+    sprite[..., 3] = 255
+
+    image = upscale(sprite, pitch=37.3, offset=5, noise=6, rng=rng)
+    grid = detect_grid(image)
+    assert abs(grid['pitch_x'] - 37.3) < 0.1 and abs(grid['pitch_y'] - 37.3) < 0.1, grid
+
+    recovered = recover_sprite(image, grid=grid)
+    assert recovered.shape == sprite.shape
+    # The median of each block's middle removes the noise
+    assert np.abs(recovered.astype(int) - sprite).max() <= 6
+
+
+def test_noise_has_no_grid():
+    rng = np.random.default_rng(4)
+    assert recover_sprite(rng.integers(0, 256, (256, 256, 4), dtype=np.uint8)) is None
+
+
+if __name__ == "__main__":
+    test_recovers_fractional_pitch()
+    test_noise_has_no_grid()
+    print("SUCCESS: pixel grid tests passed")
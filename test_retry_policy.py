@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test retry decisions and circuit breaker state transitions
+"""
+
+import time
+
+from image_transport import TransportResult
+from retry_policy import CircuitBreaker, RetryPolicy, is_retryable, retry_after_seconds
+
+
+def ok():
+    return TransportResult(image_data=b'png', status_code=200)
+
+
+def failed(status, error=None):
+    return TransportResult(status_code=status, error=error or f"HTTP {status}")
+
+
+def test_retryable_errors():
+    assert is_retryable(failed(0, 'timeout'))
+    assert is_retryable(failed(503))
+    assert is_retryable(failed(429))
+    assert not is_retryable(failed(400))
+    assert not is_retryable(failed(429, 'insufficient_quota'))
+    assert not is_retryable(ok())
+
+    assert retry_after_seconds({'Retry-After': '3'}) == 3
+    assert retry_after_seconds({'retry-after-ms': '250'}) == 0.25
+    assert retry_after_seconds({}) is None
+
+
+def test_breaker_trips_probes_and_closes():
+    breaker = CircuitBreaker(window=10, failure_ratio=0.5, min_requests=4, cooldown=0.05)
+    for success in (True, False, False):
+        breaker.record(success)
+    assert breaker.state == 'closed', "too few requests to judge yet"
+    breaker.record(False)
+    assert breaker.state == 'open'
+
+    # Held back for the cooldown, then a single probe goes through
+    start = time.monotonic()
+    breaker.before_request()
+    assert time.monotonic() - start >= 0.04
+    assert breaker.state == 'half_open'
+
+    # A failed probe opens it again, a successful one closes it
+    breaker.record(False)
+    assert breaker.state == 'open'
+    breaker.before_request()
+    breaker.record(True)
+    assert breaker.state == 'closed'
+    assert len(breaker.window) == 0
+
+
+def test_neutral_outcomes_only_free_the_probe():
+    breaker = CircuitBreaker(window=10, failure_ratio=0.5, min_requests=4, cooldown=0.01)
+    for _ in range(10):
+        breaker.record(None)
+    assert breaker.state == 'closed' and len(breaker.window) == 0
+
+    for _ in range(4):
+        breaker.record(False)
+    breaker.before_request()
+    breaker.record(None)
+    assert breaker.state == 'half_open' and not breaker._probe_in_flight
+
+
+def test_policy_retries_then_succeeds():
+    responses = iter([failed(503), failed(429), ok()])
+    breaker = CircuitBreaker(min_requests=100)
+    result = RetryPolicy(max_attempts=5, base_delay=0.001, breaker=breaker).call(lambda: next(responses))
+
+    assert result.ok and result.attempts == 3
+    # The 429 is left to the rate limiter, only the 503 counts against the endpoint
+    assert list(breaker.window) == [False, True]
+
+
+def test_policy_fails_fast_on_client_errors():
+    calls = []
+    breaker = CircuitBreaker(min_requests=100)
+
+    def send():
+        calls.append(1)
+        return failed(400, 'content_policy_violation')
+
+    result = RetryPolicy(max_attempts=5, base_delay=0.001, breaker=breaker).call(send)
+    assert not result.ok and len(calls) == 1
+    assert len(breaker.window) == 0
+
+
+def test_exception_frees_the_probe():
+    breaker = CircuitBreaker(window=4, min_requests=1, cooldown=0.01)
+    breaker.record(False)
+    policy = RetryPolicy(max_attempts=1, breaker=breaker)
+
+    def send():
+        raise ConnectionError("reset")
+
+    try:
+        policy.call(send)
+    except ConnectionError:
+        pass
+    assert breaker.state == 'open' and not breaker._probe_in_flight
+
+
+if __name__ == "__main__":
+    test_retryable_errors()
+    test_breaker_trips_probes_and_closes()
+    test_neutral_outcomes_only_free_the_probe()
+    test_policy_retries_then_succeeds()
+    test_policy_fails_fast_on_client_errors()
+    test_exception_frees_the_probe()
+    print("SUCCESS: retry policy tests passed")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test trimming transparent margins and the trim manifest
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from sprite_trim import alpha_bboxes, trim_sprites
+
+MANIFEST = Path('client/assets/trim_manifest.json')
+
+
+def in_client_folder(test):
+    """Run a test with the working directory inside a fresh folder holding a client/ tree"""
+    def run():
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as folder:
+            os.chdir(folder)
+            try:
+                Path('client/assets/resources').mkdir(parents=True)
+                test()
+            finally:
+                os.chdir(cwd)
+    run.__name__ = test.__name__
+    return run
+
+
+def sprite(width, height, box):
+    left, top, right, bottom = box
+    rgba = np.zeros((height, width, 4), dtype=np.uint8)
+    rgba[top:bottom, left:right] = (40, 120, 30, 255)
+    return rgba
+
+
+def save(path, rgba, **options):
+    Image.fromarray(rgba, 'RGBA').save(path, 'PNG', **options)
+
+
+def load(path):
+    with Image.open(path) as img:
+        return np.asarray(img.convert('RGBA'))
+
+
+def test_alpha_bboxes():
+    alphas = np.stack([sprite(20, 16, box)[..., 3] for box in ((3, 4, 10, 9), (0, 0, 20, 16), (0, 0, 0, 0))])
+    alphas[0, 2, 1] = 5
+    assert alpha_bboxes(alphas).tolist() == [[1, 2, 10, 9], [0, 0, 20, 16], [0, 0, 1, 1]]
+    assert alpha_bboxes(alphas, threshold=8)[0].tolist() == [3, 4, 10, 9]
+
+
+@in_client_folder
+def test_trim_and_retrim():
+    path = Path('client/assets/resources/rock.png')
+    save(path, sprite(20, 16, (3, 4, 10, 9)))
+
+    stats = trim_sprites(['client/assets/resources'])
+    assert stats['trimmed'] == 1 and stats['pixels_after'] == 35
+    assert load(path).shape == (5, 7, 4)
+    entry = json.loads(MANIFEST.read_text())['assets/resources/rock.png']
+    assert (entry['canvas'], entry['offset'], entry['size']) == ([20, 16], [3, 4], [7, 5])
+
+    # A trimmed image trims to itself, even after a lossless re-encode
+    save(path, load(path), compress_level=1)
+    data = path.read_bytes()
+    assert trim_sprites(['client/assets/resources'])['trimmed'] == 0
+    assert path.read_bytes() == data
+    assert json.loads(MANIFEST.read_text())['assets/resources/rock.png']['canvas'] == [20, 16]
+
+    # A regenerated image without margins loses its entry
+    save(path, sprite(8, 8, (0, 0, 8, 8)))
+    trim_sprites(['client/assets/resources'])
+    assert 'assets/resources/rock.png' not in json.loads(MANIFEST.read_text())
+
+
+@in_client_folder
+def test_dry_run_and_excluded_files_are_untouched():
+    strip = Path('client/assets/resources/tree_oak_variants.png')
+    rock = Path('client/assets/resources/rock.png')
+    save(strip, sprite(32, 16, (2, 2, 12, 12)))
+    save(rock, sprite(20, 16, (3, 4, 10, 9)))
+    before = strip.read_bytes(), rock.read_bytes()
+
+    stats = trim_sprites(['client/assets/resources'], dry_run=True)
+    assert stats['images'] == 1 and stats['trimmed'] == 1
+    assert (strip.read_bytes(), rock.read_bytes()) == before
+    assert not MANIFEST.exists()
+
+
+if __name__ == "__main__":
+    test_alpha_bboxes()
+    test_trim_and_retrim()
+    test_dry_run_and_excluded_files_are_untouched()
+    print("SUCCESS: sprite trim tests passed")
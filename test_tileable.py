@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test seamless tiling of noise, details and terrain tiles
+"""
+
+import numpy as np
+
+import generate_terrain
+from tileable import (colorize, fractal_noise, loop_noise, scroll, seam_error, value_noise, wrap_put,
+                      wrap_stamps)
+
+# seam_error is about 1 when a repeat shows no seam
+SEAMLESS = 1.3
+
+
+def test_seam_error_tells_tiles_apart():
+    ramp = np.linspace(0, 1, 32)
+    gradient = colorize(np.broadcast_to(ramp, (32, 32)), [(0, 0, 0), (255, 255, 255)])
+    assert seam_error(gradient) > 10
+
+    rng = np.random.default_rng(5)
+    for kind in ('value', 'perlin'):
+        tiles = colorize(fractal_noise(rng, 8, 32, period=4, octaves=3, kind=kind), [(30, 90, 20), (120, 200, 60)])
+        errors = seam_error(tiles)
+        # Single edges vary like any row of the tile; on average they look like the inside
+        assert errors.shape == (8,) and errors.mean() < SEAMLESS and errors.max() < 2, (kind, errors)
+
+    # The same noise cropped off the lattice no longer wraps
+    cropped = colorize(value_noise(rng, 8, 48, period=4)[:, :32, :32], [(0, 0, 0), (255, 255, 255)])
+    assert seam_error(cropped).mean() > 2
+
+
+def test_details_wrap_across_edges():
+    tiles = np.zeros((2, 8, 8, 4), np.uint8)
+    tiles[..., 3] = 255
+    wrap_put(tiles, np.array([1, 1]), np.array([-1, 8]), np.array([3, -2]),
+             np.array([[255, 0, 0, 255], [0, 0, 255, 255]], np.uint8))
+    assert tiles[1, 3, 7].tolist() == [255, 0, 0, 255]
+    assert tiles[1, 6, 0].tolist() == [0, 0, 255, 255]
+    assert (tiles[0, ..., :3] == 0).all()
+
+    # Stamps crossing an edge keep the repeat seamless, and tiles stay opaque
+    rng = np.random.default_rng(6)
+    tiles = colorize(fractal_noise(rng, 4, 16, period=2, octaves=2), [(90, 60, 30), (130, 90, 45)])
+    wrap_stamps(tiles, 40, [(60, 55, 35, 150)], width=(3, 6), rng=rng)
+    assert seam_error(tiles).mean() < SEAMLESS
+    assert (tiles[..., 3] == 255).all()
+
+
+def test_loops_close():
+    rng = np.random.default_rng(7)
+    frames = loop_noise(rng, 12, 16, period=4, time_period=3)
+    steps = np.abs(np.diff(frames, axis=0)).mean(axis=(1, 2))
+    wrap = np.abs(frames[0] - frames[-1]).mean()
+    assert wrap < steps.max() * 1.5
+
+    moved = scroll(frames, cycles_x=1)
+    assert np.array_equal(moved[0], frames[0])
+    assert np.array_equal(moved[3], np.roll(frames[3], 4, axis=1))
+
+
+def test_terrain_tiles_are_seamless():
+    for job in generate_terrain.asset_jobs():
+        if job.build is generate_terrain.create_grass_atlas:
+            continue
+        assert seam_error(job.build(*job.args)) < SEAMLESS, job.output
+
+
+if __name__ == "__main__":
+    test_seam_error_tells_tiles_apart()
+    test_details_wrap_across_edges()
+    test_loops_close()
+    test_terrain_tiles_are_seamless()
+    print("SUCCESS: tileable texture tests passed")
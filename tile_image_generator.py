@@ -21,11 +21,17 @@ import os
 import sys
 import time
 import json
-import requests
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
+from generation_engine import GenerationEngine
+from image_cache import ImageCache
+from image_transport import DEFAULT_BASE_URL, ImageTransport
+from job_journal import JobJournal
+from retry_policy import CircuitBreaker, RetryPolicy
+from sprite_postprocess import MASTERS_PATH, process_variant, write_outputs
+
 # Try to import tkinter for GUI
 try:
     import tkinter as tk
@@ -39,6 +45,7 @@ class TileImageGenerator:
     def __init__(self):
         self.api_key = None
         self.base_path = Path("client/assets/world_builder")
+        self.masters_path = MASTERS_PATH
         self.current_prompts = []
         self.current_tile_path = None
         self.generated_count = 0
@@ -47,6 +54,11 @@ class TileImageGenerator:
         # Load environment variables
         load_dotenv()
         self.api_key = os.getenv('OPENAI_API_KEY')
+        self.base_url = os.getenv('OPENAI_BASE_URL', DEFAULT_BASE_URL)
+        
+        # Local stand-ins such as mock_image_server.py don't check the key
+        if not self.api_key and self.base_url != DEFAULT_BASE_URL:
+            self.api_key = 'sk-local-mock-no-key-needed'
         
         if not self.api_key:
             print("[ERROR] No OpenAI API key found in .env file!")
@@ -54,6 +66,24 @@ class TileImageGenerator:
             sys.exit(1)
         
         print(f"[OK] Loaded API key: {self.api_key[:10]}...")
+        if self.base_url != DEFAULT_BASE_URL:
+            print(f"[OK] Using API base URL: {self.base_url}")
+        
+        # Batch generation quota (see generation_engine.py)
+        self.requests_per_minute = float(os.getenv('IMAGE_REQUESTS_PER_MINUTE', '5'))
+        self.max_concurrency = int(os.getenv('IMAGE_MAX_CONCURRENCY', '3'))
+        
+        # Pooled keep-alive sessions, one per worker thread (see image_transport.py)
+        self.transport = ImageTransport(self.api_key, pool_size=self.max_concurrency, base_url=self.base_url)
+        
+        # Transient API failures are retried; a shared breaker pauses all requests (see retry_policy.py)
+        self.retry = RetryPolicy(breaker=CircuitBreaker())
+        
+        # Identical requests are served from the local cache (see image_cache.py)
+        self.cache = ImageCache()
+        
+        # Batch progress survives crashes (see job_journal.py)
+        self.journal = JobJournal()
         
     def scan_prompt_files(self) -> Dict[str, List[str]]:
         """Scan for all prompts.txt files in the tile structure"""
@@ -131,75 +161,86 @@ class TileImageGenerator:
         print(f"📚 Loaded {len(prompts)} prompts from {prompt_file_path}")
         return prompts
     
-    def generate_image(self, prompt: str, style: str) -> Optional[bytes]:
+    def build_payload(self, prompt: str) -> Dict:
+        """Build the DALL-E request body for a prompt"""
+        # Enhance prompt for better results
+        enhanced_prompt = f"{prompt}, transparent background, 16x16 pixel art, top-down view, video game tile, high quality"
+        
+        return {
+            'model': 'dall-e-3',
+            'prompt': enhanced_prompt,
+            'size': '1024x1024',
+            'quality': 'standard',
+            'n': 1
+        }
+    
+    def cached_image(self, prompt: str) -> Optional[bytes]:
+        """Return a previous generation for an identical request, if cached"""
+        return self.cache.get(self.build_payload(prompt))
+    
+    def generate_image(self, prompt: str, style: str, bypass_cache: bool = False) -> Optional[bytes]:
         """Generate a single image using OpenAI DALL-E"""
+        image_data, _ = self.request_image(prompt, style, bypass_cache)
+        return image_data
+    
+    def request_image(self, prompt: str, style: str,
+                      bypass_cache: bool = False) -> Tuple[Optional[bytes], Dict[str, str]]:
+        """Generate a single image, also returning the API response headers for rate limiting"""
+        headers_received = {}
         try:
-            # Enhance prompt for better results
-            enhanced_prompt = f"{prompt}, transparent background, 16x16 pixel art, top-down view, video game tile, high quality"
+            data = self.build_payload(prompt)
             
-            print(f"🎨 Generating: {style}")
-            print(f"📝 Prompt: {enhanced_prompt[:100]}...")
-            
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
+            if not bypass_cache:
+                cached = self.cache.get(data)
+                if cached:
+                    print(f"♻️ Cache hit: {style}")
+                    return cached, headers_received
             
-            data = {
-                'model': 'dall-e-3',
-                'prompt': enhanced_prompt,
-                'size': '1024x1024',
-                'quality': 'standard',
-                'n': 1
-            }
+            print(f"🎨 Generating: {style}")
+            print(f"📝 Prompt: {data['prompt'][:100]}...")
             
-            response = requests.post(
-                'https://api.openai.com/v1/images/generations',
-                headers=headers,
-                json=data,
-                timeout=60
-            )
+            result = self.retry.call(lambda: self.transport.generate(data))
+            headers_received = result.headers
             
-            if response.status_code == 200:
-                result = response.json()
-                image_url = result['data'][0]['url']
-                
-                # Download the image
-                img_response = requests.get(image_url, timeout=30)
-                if img_response.status_code == 200:
-                    print("✅ Image generated successfully!")
-                    return img_response.content
-                else:
-                    print(f"❌ Failed to download image: {img_response.status_code}")
-                    
+            if result.ok:
+                print(f"✅ Image generated successfully! ({result.latency:.1f}s, {result.response_format})")
+                self.cache.put(data, result.image_data, style=style)
+                return result.image_data, headers_received
+            elif result.status_code not in (0, 200):
+                print(f"❌ DALL-E API error: {result.status_code}")
+                print(f"Response: {result.error}")
             else:
-                print(f"❌ DALL-E API error: {response.status_code}")
-                print(f"Response: {response.text}")
+                print(f"❌ Error generating image: {result.error}")
                 
         except Exception as e:
             print(f"❌ Error generating image: {e}")
             
-        return None
+        return None, headers_received
     
-    def save_image(self, image_data: bytes, tile_path: str, image_number: int) -> bool:
+    def post_process(self, image_data: bytes, tile_path: str,
+                     image_number: int) -> Optional[List[Tuple[Path, bytes]]]:
+        """Render the archived master plus game-size derivatives (see sprite_postprocess.py)"""
+        try:
+            tile_dir = (self.base_path / tile_path).parent
+            return process_variant(image_data, tile_dir, image_number, self.base_path, self.masters_path)
+        except Exception as e:
+            print(f"❌ Error post-processing image: {e}")
+            return None
+    
+    def save_image(self, image_data: bytes, tile_path: str, image_number: int,
+                   outputs: Optional[List[Tuple[Path, bytes]]] = None) -> bool:
         """Save image to the correct location with proper naming"""
         try:
-            # Get the directory containing the prompts.txt file
-            prompt_file_path = self.base_path / tile_path
-            tile_dir = prompt_file_path.parent
-            
-            # Create the filename (1.png, 2.png, etc.)
-            filename = f"{image_number}.png"
-            full_path = tile_dir / filename
+            if outputs is None:
+                outputs = self.post_process(image_data, tile_path, image_number)
+                if outputs is None:
+                    return False
             
-            # Ensure directory exists
-            tile_dir.mkdir(parents=True, exist_ok=True)
+            # Temp file + rename for every output, so a killed process never leaves a partial PNG
+            write_outputs(outputs)
             
-            # Save the image
-            with open(full_path, 'wb') as f:
-                f.write(image_data)
-            
-            print(f"💾 Saved: {full_path}")
+            full_path = (self.base_path / tile_path).parent / f"{image_number}.png"
+            print(f"💾 Saved: {full_path} (+{len(outputs) - 1} derivatives)")
             return True
             
         except Exception as e:
@@ -355,12 +396,18 @@ class ConsoleInterface:
             print("❌ Cancelled")
             return
         
+        # Regenerating usually means a fresh sample is wanted, not the cached one
+        bypass_cache = False
+        if option == '3':
+            bypass_cache = input("Bypass cache for fresh samples? (y/N): ").strip().lower() == 'y'
+        
         # Generate images
         success_count = 0
         for i, prompt_data in enumerate(to_generate, 1):
             print(f"\n[{i}/{len(to_generate)}] Generating {prompt_data['style']}...")
             
-            image_data = self.generator.generate_image(prompt_data['prompt'], prompt_data['style'])
+            cache_hits = self.generator.cache.hits
+            image_data = self.generator.generate_image(prompt_data['prompt'], prompt_data['style'], bypass_cache)
             
             if image_data:
                 if self.generator.save_image(image_data, file_path, prompt_data['number']):
@@ -371,8 +418,8 @@ class ConsoleInterface:
             else:
                 print(f"❌ Failed to generate image")
             
-            # Rate limiting delay
-            if i < len(to_generate):
+            # Rate limiting delay (not needed when the image came from the cache)
+            if i < len(to_generate) and self.generator.cache.hits == cache_hits:
                 print("⏱️ Waiting 5 seconds...")
                 time.sleep(5)
         
@@ -380,6 +427,14 @@ class ConsoleInterface:
     
     def batch_generate(self):
         """Generate all missing images across all files"""
+        # Resume straight from the journal when a previous batch was interrupted
+        pending = self.generator.journal.pending()
+        if pending:
+            print(f"\n📒 Journal has {len(pending)} unfinished jobs from a previous batch")
+            if input("Resume them? (Y/n): ").strip().lower() != 'n':
+                self.run_batch(pending)
+                return
+        
         prompt_files = self.generator.scan_prompt_files()
         
         if not prompt_files:
@@ -405,34 +460,47 @@ class ConsoleInterface:
         print(f"\n📊 Batch Generation Summary:")
         print(f"📁 Files with missing images: {len(file_status)}")
         print(f"🎨 Total images to generate: {total_missing}")
-        print(f"⏱️ Estimated time: {total_missing * 6} seconds")
         
-        confirm = input(f"\nGenerate {total_missing} images? (y/N): ").strip().lower()
+        # Queue every missing variant across all files
+        jobs = []
+        for file_path, missing_count in file_status:
+            prompts = self.generator.load_prompts(file_path)
+            existing = self.generator.check_existing_images(file_path)
+            jobs.extend((file_path, p) for p in prompts if p['number'] not in existing)
+        
+        self.run_batch(jobs)
+    
+    def run_batch(self, jobs: List[Tuple[str, Dict]]):
+        """Run (prompt file, prompt data) jobs through the concurrent engine"""
+        engine = GenerationEngine(self.generator, journal=self.generator.journal)
+        print(f"⚡ Concurrency: {engine.concurrency} requests in flight, {engine.requests_per_minute:g} requests/minute")
+        print(f"⏱️ Estimated time: {engine.estimate_seconds(len(jobs)):.0f} seconds")
+        
+        confirm = input(f"\nGenerate {len(jobs)} images? (y/N): ").strip().lower()
         if confirm != 'y':
             print("❌ Cancelled")
             return
         
-        # Start batch generation
-        total_success = 0
-        for file_idx, (file_path, missing_count) in enumerate(file_status, 1):
+        completed = []
+        
+        def report(file_path, prompt_data, success):
+            completed.append(success)
             tile_name = Path(file_path).parent.name
-            print(f"\n[{file_idx}/{len(file_status)}] Processing {tile_name}...")
-            
-            prompts = self.generator.load_prompts(file_path)
-            existing = self.generator.check_existing_images(file_path)
-            to_generate = [p for p in prompts if p['number'] not in existing]
-            
-            for prompt_data in to_generate:
-                print(f"  🎨 {prompt_data['style']}...")
-                
-                image_data = self.generator.generate_image(prompt_data['prompt'], prompt_data['style'])
-                if image_data and self.generator.save_image(image_data, file_path, prompt_data['number']):
-                    total_success += 1
-                    print(f"  ✅ Success! ({total_success}/{total_missing})")
-                
-                time.sleep(5)  # Rate limiting
+            status = "✅" if success else "❌"
+            print(f"  {status} [{len(completed)}/{len(jobs)}] {tile_name} #{prompt_data['number']} {prompt_data['style']}")
+        
+        start_time = time.time()
+        total_success = engine.run(jobs, on_result=report)
+        
+        if total_success == len(jobs):
+            self.generator.journal.clear_saved()
+        
+        print(f"\n🎉 Batch complete! Generated {total_success}/{len(jobs)} images in {time.time() - start_time:.0f} seconds")
         
-        print(f"\n🎉 Batch complete! Generated {total_success}/{total_missing} images")
+        latency = self.generator.transport.latency_summary()
+        if latency['requests']:
+            print(f"📡 API latency over {latency['requests']} requests: "
+                  f"mean {latency['mean']:.1f}s, p50 {latency['p50']:.1f}s, p95 {latency['p95']:.1f}s")
     
     def show_statistics(self):
         """Show generation statistics"""
@@ -20,15 +20,20 @@ import os
 import sys
 import time
 import json
-import requests
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
+from image_cache import ImageCache
+from image_transport import DEFAULT_BASE_URL, ImageTransport
+from retry_policy import CircuitBreaker, RetryPolicy
+from sprite_postprocess import MASTERS_PATH, process_variant, write_outputs
+
 class TileImageGenerator:
     def __init__(self):
         self.api_key = None
         self.base_path = Path("client/assets/world_builder")
+        self.masters_path = MASTERS_PATH
         
         # Load environment variables - prioritize .env file over system environment
         env_path = Path('.env')
@@ -42,6 +47,11 @@ class TileImageGenerator:
             load_dotenv()
         
         self.api_key = os.getenv('OPENAI_API_KEY')
+        self.base_url = os.getenv('OPENAI_BASE_URL', DEFAULT_BASE_URL)
+        
+        # Local stand-ins such as mock_image_server.py don't check the key
+        if not self.api_key and self.base_url != DEFAULT_BASE_URL:
+            self.api_key = 'sk-local-mock-no-key-needed'
         
         if not self.api_key:
             print("ERROR: No OpenAI API key found in .env file!")
@@ -50,6 +60,8 @@ class TileImageGenerator:
             sys.exit(1)
         
         print(f"OK: Loaded API key: {self.api_key[:10]}...")
+        if self.base_url != DEFAULT_BASE_URL:
+            print(f"OK: Using API base URL: {self.base_url}")
         
         # Verify the key format
         if not self.api_key.startswith('sk-'):
@@ -58,6 +70,15 @@ class TileImageGenerator:
         if len(self.api_key) < 20:
             print("WARNING: API key seems too short, this might be incorrect")
         
+        # Pooled keep-alive session with single-roundtrip b64_json responses (see image_transport.py)
+        self.transport = ImageTransport(self.api_key, pool_size=1, base_url=self.base_url)
+        
+        # Transient API failures are retried; a shared breaker pauses all requests (see retry_policy.py)
+        self.retry = RetryPolicy(breaker=CircuitBreaker())
+        
+        # Identical requests are served from the local cache (see image_cache.py)
+        self.cache = ImageCache()
+        
     def scan_prompt_files(self) -> Dict[str, List[str]]:
         """Scan for all prompts.txt files in the tile structure"""
         prompt_files = {}
@@ -153,50 +174,44 @@ class TileImageGenerator:
         print(f"INFO: Loaded {len(prompts)} prompts from {prompt_file_path}")
         return prompts
     
-    def generate_image(self, prompt: str, style: str) -> Optional[bytes]:
+    def build_payload(self, prompt: str) -> Dict:
+        """Build the DALL-E request body for a prompt"""
+        # Enhance prompt for better results
+        enhanced_prompt = f"{prompt}, transparent background, 16x16 pixel art, top-down view, video game tile, high quality"
+        
+        return {
+            'model': 'dall-e-3',
+            'prompt': enhanced_prompt,
+            'size': '1024x1024',
+            'quality': 'standard',
+            'n': 1
+        }
+    
+    def generate_image(self, prompt: str, style: str, bypass_cache: bool = False) -> Optional[bytes]:
         """Generate a single image using OpenAI DALL-E"""
         try:
-            # Enhance prompt for better results
-            enhanced_prompt = f"{prompt}, transparent background, 16x16 pixel art, top-down view, video game tile, high quality"
+            data = self.build_payload(prompt)
             
-            print(f"GENERATING: {style}")
-            print(f"PROMPT: {enhanced_prompt[:100]}...")
-            
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
+            if not bypass_cache:
+                cached = self.cache.get(data)
+                if cached:
+                    print(f"CACHED: {style}")
+                    return cached
             
-            data = {
-                'model': 'dall-e-3',
-                'prompt': enhanced_prompt,
-                'size': '1024x1024',
-                'quality': 'standard',
-                'n': 1
-            }
+            print(f"GENERATING: {style}")
+            print(f"PROMPT: {data['prompt'][:100]}...")
             
-            response = requests.post(
-                'https://api.openai.com/v1/images/generations',
-                headers=headers,
-                json=data,
-                timeout=60
-            )
+            result = self.retry.call(lambda: self.transport.generate(data))
             
-            if response.status_code == 200:
-                result = response.json()
-                image_url = result['data'][0]['url']
-                
-                # Download the image
-                img_response = requests.get(image_url, timeout=30)
-                if img_response.status_code == 200:
-                    print("SUCCESS: Image generated successfully!")
-                    return img_response.content
-                else:
-                    print(f"ERROR: Failed to download image: {img_response.status_code}")
-                    
+            if result.ok:
+                print(f"SUCCESS: Image generated successfully! ({result.latency:.1f}s, {result.response_format})")
+                self.cache.put(data, result.image_data, style=style)
+                return result.image_data
+            elif result.status_code not in (0, 200):
+                print(f"ERROR: DALL-E API error: {result.status_code}")
+                print(f"Response: {result.error}")
             else:
-                print(f"ERROR: DALL-E API error: {response.status_code}")
-                print(f"Response: {response.text}")
+                print(f"ERROR: Error generating image: {result.error}")
                 
         except Exception as e:
             print(f"ERROR: Error generating image: {e}")
@@ -210,18 +225,13 @@ class TileImageGenerator:
             prompt_file_path = self.base_path / tile_path
             tile_dir = prompt_file_path.parent
             
-            # Create the filename (1.png, 2.png, etc.)
-            filename = f"{image_number}.png"
-            full_path = tile_dir / filename
-            
-            # Ensure directory exists
-            tile_dir.mkdir(parents=True, exist_ok=True)
+            # Archive the full-size master and write the game-size sprite (see sprite_postprocess.py)
+            outputs = process_variant(image_data, tile_dir, image_number, self.base_path, self.masters_path)
             
-            # Save the image
-            with open(full_path, 'wb') as f:
-                f.write(image_data)
+            # Temp file + rename for every output, so a killed process never leaves a partial PNG
+            write_outputs(outputs)
             
-            print(f"SAVED: {full_path}")
+            print(f"SAVED: {tile_dir / f'{image_number}.png'}")
             return True
             
         except Exception as e:
@@ -359,6 +369,7 @@ def main():
         for i, prompt_data in enumerate(to_generate, 1):
             print(f"\n[{i}/{len(to_generate)}] Generating {prompt_data['style']}...")
             
+            cache_hits = generator.cache.hits
             image_data = generator.generate_image(prompt_data['prompt'], prompt_data['style'])
             
             if image_data:
@@ -370,8 +381,8 @@ def main():
             else:
                 print("ERROR: Failed to generate image")
             
-            # Rate limiting delay
-            if i < len(to_generate):
+            # Rate limiting delay (not needed when the image came from the cache)
+            if i < len(to_generate) and generator.cache.hits == cache_hits:
                 print("Waiting 5 seconds...")
                 time.sleep(5)
         
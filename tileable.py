@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Tileable Textures
+=================
+
+Seamless texture primitives for terrain tiles. world.js repeats every tile
+across the map, so the left column of a tile is drawn next to its own right
+column; noise that doesn't wrap and details clipped at the border show up as
+a grid over the whole world.
+
+Everything here lives on a torus:
+
+- value_noise, perlin_noise   lattice noise whose lattice wraps at the tile edge
+                              (a whole number of cells per tile)
+- fractal_noise               octaves of either, each period double the last,
+                              so the sum still wraps
+- loop_noise, loop_fractal_noise, scroll
+                              the same noise with a wrapping time axis, for
+                              animation frames that loop seamlessly
+- colorize                    noise field -> colours through a ramp
+- wrap_speckle, wrap_strokes, wrap_stamps
+                              pixel_effects details, except that pixels past
+                              one edge continue at the opposite edge
+- grain                       per-pixel jitter
+- seam_error                  how visible the seams are when a tile repeats
+- atlas                       a whole variant set (or animation strip) as one
+                              grid image
+
+Textures are stacks: an N x H x W noise field or an N x H x W x 4 RGBA array
+holds a whole variant set, and every function works on all variants in one
+pass. Details are blended over the texture by their alpha, so tiles stay
+opaque. Randomness comes from the ``rng`` argument, as in pixel_effects.
+
+Usage:
+    rng = asset_rng('tiles/dirt')
+    field = fractal_noise(rng, 4, 32, period=4, octaves=3)
+    tiles = colorize(field, [(120, 75, 35), (145, 85, 40), (165, 100, 50)])
+    wrap_stamps(tiles, 15, [(100, 90, 80)], width=(1, 2), rng=rng)
+    images = to_images(tiles)
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from pixel_effects import Range, default_rng, draw_range, ellipse_cells, pick_colors, stroke_cells
+
+Size = Union[int, Tuple[int, int]]
+
+
+def dimensions(size: Size) -> Tuple[int, int]:
+    """(width, height) from a square size or a (width, height) pair"""
+    return (size, size) if isinstance(size, int) else size
+
+
+def lattice(length: int, period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per pixel along one axis: lattice cell, next cell (wrapped) and position inside the cell"""
+    position = (np.arange(length) + 0.5) * period / length
+    cell = np.floor(position).astype(int)
+    return cell % period, (cell + 1) % period, position - cell
+
+
+def smoothstep(t: np.ndarray) -> np.ndarray:
+    return t * t * (3 - 2 * t)
+
+
+def quintic(t: np.ndarray) -> np.ndarray:
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def interpolate(values: np.ndarray, size: Size) -> np.ndarray:
+    """Smoothly interpolate N x period x period lattice values over N x H x W pixels, wrapping"""
+    width, height = dimensions(size)
+    y0, y1, fy = lattice(height, values.shape[1])
+    x0, x1, fx = lattice(width, values.shape[2])
+    u, v = smoothstep(fx)[None, :], smoothstep(fy)[:, None]
+
+    top = values[:, y0[:, None], x0] * (1 - u) + values[:, y0[:, None], x1] * u
+    bottom = values[:, y1[:, None], x0] * (1 - u) + values[:, y1[:, None], x1] * u
+    return top * (1 - v) + bottom * v
+
+
+def value_noise(rng: np.random.Generator, count: int, size: Size, period: int) -> np.ndarray:
+    """count x H x W smoothly interpolated random lattice values in [0, 1], wrapping every tile"""
+    return interpolate(rng.random((count, period, period)), size)
+
+
+def loop_noise(rng: np.random.Generator, frames: int, size: Size, period: int, time_period: int = 3) -> np.ndarray:
+    """frames x H x W value noise that wraps in x and y and loops in time.
+
+    The lattice has a third, time axis of ``time_period`` cells that also
+    wraps, so the frame after the last one is the first one again. It needs
+    at least 3 cells: with 2 the loop just runs there and back.
+    """
+    values = rng.random((time_period, period, period))
+    t0, t1, ft = lattice(frames, time_period)
+    # Linear in time: smoothstep would stall the motion at every lattice step
+    w = ft[:, None, None]
+    return interpolate(values[t0] * (1 - w) + values[t1] * w, size)
+
+
+def loop_fractal_noise(rng: np.random.Generator, frames: int, size: Size, period: int = 2,
+                       time_period: int = 3, octaves: int = 3, persistence: float = 0.5) -> np.ndarray:
+    """frames x H x W octaves of loop_noise, stretched to [0, 1] over the loop.
+
+    Every octave steps through the same ``time_period`` cells, so fine detail
+    evolves with the coarse shapes instead of flickering.
+    """
+    total = 0.0
+    amplitude = 1.0
+    for octave in range(octaves):
+        total = total + amplitude * loop_noise(rng, frames, size, period * 2 ** octave, time_period)
+        amplitude *= persistence
+    # One range for the whole loop, so brightness doesn't pump from frame to frame
+    return (total - total.min()) / max(total.max() - total.min(), 1e-9)
+
+
+def scroll(stack: np.ndarray, cycles_x: int = 0, cycles_y: int = 0) -> np.ndarray:
+    """Shift frame k of a loop by k/frames of ``cycles`` tile widths/heights, wrapping.
+
+    Over the whole loop the content travels a whole number of tiles, so the
+    motion is seamless both across the tile edge and from the last frame back
+    to the first. Positive cycles move content right/down.
+    """
+    frames, height, width = stack.shape[:3]
+    step = np.arange(frames)
+    rows = (np.arange(height)[None, :] - np.rint(step * cycles_y * height / frames).astype(int)[:, None]) % height
+    cols = (np.arange(width)[None, :] - np.rint(step * cycles_x * width / frames).astype(int)[:, None]) % width
+    frame = step[:, None, None]
+    return stack[frame, rows[:, :, None], cols[:, None, :]]
+
+
+def perlin_noise(rng: np.random.Generator, count: int, size: Size, period: int) -> np.ndarray:
+    """count x H x W gradient noise in [0, 1] with a wrapping lattice of random unit gradients"""
+    width, height = dimensions(size)
+    angles = (rng.random((count, period, period)) * 2 * np.pi).astype(np.float32)
+    gx, gy = np.cos(angles), np.sin(angles)
+    y0, y1, fy = lattice(height, period)
+    x0, x1, fx = lattice(width, period)
+    fx, fy = fx.astype(np.float32), fy.astype(np.float32)
+
+    def corner(rows: np.ndarray, cols: np.ndarray, oy: int, ox: int) -> np.ndarray:
+        # Dot product of the corner's gradient with the offset from that corner (rows, then columns)
+        return (np.take(np.take(gx, rows, axis=1), cols, axis=2) * (fx - ox)[None, :] +
+                np.take(np.take(gy, rows, axis=1), cols, axis=2) * (fy - oy)[:, None])
+
+    u, v = quintic(fx)[None, :], quintic(fy)[:, None]
+    top = corner(y0, x0, 0, 0) * (1 - u) + corner(y0, x1, 0, 1) * u
+    bottom = corner(y1, x0, 1, 0) * (1 - u) + corner(y1, x1, 1, 1) * u
+    # 2D gradient noise stays within ±sqrt(1/2)
+    return (top * (1 - v) + bottom * v) * np.float32(np.sqrt(0.5)) + np.float32(0.5)
+
+
+NOISE: Dict[str, Callable[..., np.ndarray]] = {
+    'value': value_noise,
+    'perlin': perlin_noise,
+}
+
+
+def normalize(field: np.ndarray) -> np.ndarray:
+    """Stretch every variant of a field to the full [0, 1] range"""
+    low = field.min(axis=(-2, -1), keepdims=True)
+    high = field.max(axis=(-2, -1), keepdims=True)
+    return (field - low) / np.maximum(high - low, 1e-9)
+
+
+def fractal_noise(rng: np.random.Generator, count: int, size: Size, period: int = 4, octaves: int = 3,
+                  persistence: Union[float, Sequence[float]] = 0.5, kind: str = 'perlin') -> np.ndarray:
+    """count x H x W sum of noise octaves (period doubling, amplitude x persistence), stretched to [0, 1].
+
+    ``persistence`` may be one value per variant, so a batch can mix smooth and busy textures.
+    """
+    noise = NOISE[kind]
+    persistence = np.broadcast_to(np.asarray(persistence, dtype=np.float64), (count,))[:, None, None]
+    total = 0.0
+    amplitude = np.ones_like(persistence)
+    for octave in range(octaves):
+        total = total + amplitude * noise(rng, count, size, period * 2 ** octave)
+        amplitude = amplitude * persistence
+    return normalize(total)
+
+
+def colorize(field: np.ndarray, colors: Sequence, levels: int = 256) -> np.ndarray:
+    """Map a [0, 1] field through evenly spaced colour stops to an N x H x W x 4 RGBA stack.
+
+    ``colors`` is one ramp for every variant or one ramp per variant (N x stops x 3/4).
+    The ramps are baked into ``levels``-entry lookup tables, so each pixel is a single row gather.
+    """
+    ramps = np.array([[tuple(color) + (255,) * (4 - len(color)) for color in ramp]
+                      for ramp in (colors if np.ndim(colors[0][0]) else [colors])], dtype=np.float32)
+    position = np.linspace(0, ramps.shape[1] - 1, levels)
+    lower = np.minimum(position.astype(int), ramps.shape[1] - 2)
+    t = (position - lower)[:, None]
+    tables = np.rint(ramps[:, lower] * (1 - t) + ramps[:, lower + 1] * t).astype(np.uint8)
+
+    level = np.rint(np.clip(field, 0, 1) * (levels - 1)).astype(np.intp)
+    if len(tables) > 1:
+        level += (np.arange(len(field)) * levels)[:, None, None]
+    return tables.reshape(-1, 4)[level]
+
+
+def scatter_stack(rng: np.random.Generator, counts, shape: Tuple[int, ...]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(variant, xs, ys) of random points anywhere on the torus; counts per variant or one for all"""
+    counts = np.broadcast_to(np.asarray(counts, dtype=int), (shape[0],))
+    variant = np.repeat(np.arange(shape[0]), counts)
+    return variant, rng.integers(0, shape[2], len(variant)), rng.integers(0, shape[1], len(variant))
+
+
+def wrap_put(stack: np.ndarray, variant: np.ndarray, xs: np.ndarray, ys: np.ndarray, colors: np.ndarray):
+    """Blend colours over a stack by their alpha, wrapping coordinates around the tile edges"""
+    count, height, width = stack.shape[:3]
+    rows = stack.reshape(-1, stack.shape[3])
+    index = (variant * height + ys % height) * width + xs % width
+    if (colors[:, 3] == 255).all():
+        rows[index] = colors
+        return
+    alpha = colors[:, 3:].astype(np.float32) / 255
+    under = rows[index]
+    rgb = colors[:, :3] * alpha + under[:, :3] * (1 - alpha)
+    rows[index, :3] = np.rint(rgb).astype(np.uint8)
+    rows[index, 3] = np.maximum(under[:, 3], colors[:, 3])
+
+
+def wrap_speckle(stack: np.ndarray, counts, colors: Sequence[Sequence[int]], variation: int = 0,
+                 rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Scatter single pixels picked from ``colors`` over every variant"""
+    rng = default_rng(rng)
+    variant, xs, ys = scatter_stack(rng, counts, stack.shape)
+    wrap_put(stack, variant, xs, ys, pick_colors(rng, colors, len(variant), variation))
+    return stack
+
+
+def wrap_strokes(stack: np.ndarray, counts, colors: Sequence[Sequence[int]], dx: Range, dy: Range,
+                 variation: int = 0, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Scatter one-pixel lines from random points to (x + dx, y + dy) over every variant"""
+    rng = default_rng(rng)
+    variant, xs, ys = scatter_stack(rng, counts, stack.shape)
+    dxs, dys = draw_range(rng, dx, len(variant)), draw_range(rng, dy, len(variant))
+    stroke_colors = pick_colors(rng, colors, len(variant), variation)
+    line_x, line_y, owner = stroke_cells(xs, ys, dxs, dys)
+    wrap_put(stack, variant[owner], line_x, line_y, stroke_colors[owner])
+    return stack
+
+
+def wrap_stamps(stack: np.ndarray, counts, colors: Sequence[Sequence[int]], width: Range,
+                height: Optional[Range] = None, variation: int = 0,
+                rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Scatter filled ellipses [x, y, x + width, y + height] over every variant"""
+    rng = default_rng(rng)
+    variant, xs, ys = scatter_stack(rng, counts, stack.shape)
+    widths = draw_range(rng, width, len(variant))
+    heights = widths if height is None else draw_range(rng, height, len(variant))
+    stamp_colors = pick_colors(rng, colors, len(variant), variation)
+    cell_x, cell_y, owner = ellipse_cells(xs, ys, widths, heights)
+    wrap_put(stack, variant[owner], cell_x, cell_y, stamp_colors[owner])
+    return stack
+
+
+def grain(stack: np.ndarray, variation: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Independent ±variation jitter on every colour channel of every variant"""
+    rng = default_rng(rng)
+    noisy = stack[..., :3] + rng.integers(-variation, variation + 1, stack.shape[:-1] + (3,), dtype=np.int16)
+    stack[..., :3] = np.clip(noisy, 0, 255).astype(np.uint8)
+    return stack
+
+
+def seam_error(tiles) -> Union[float, np.ndarray]:
+    """Mean colour step across the wrapped edges over the mean step between neighbouring pixels.
+
+    About 1 when a tile repeats without a visible seam, well above 1 when the
+    grid shows. Takes an Image, an H x W x C array (float) or a stack (array).
+    """
+    array = np.asarray(tiles.convert('RGBA')) if isinstance(tiles, Image.Image) else np.asarray(tiles)
+    single = array.ndim == 3
+    stack = (array[None] if single else array).astype(np.float32)
+
+    inner = (np.abs(np.diff(stack, axis=1)).mean(axis=(1, 2, 3)) +
+             np.abs(np.diff(stack, axis=2)).mean(axis=(1, 2, 3))) / 2
+    edge = (np.abs(stack[:, 0] - stack[:, -1]).mean(axis=(1, 2)) +
+            np.abs(stack[:, :, 0] - stack[:, :, -1]).mean(axis=(1, 2))) / 2
+    score = edge / np.maximum(inner, 1e-9)
+    return float(score[0]) if single else score
+
+
+def atlas(stack: np.ndarray, columns: int) -> Image.Image:
+    """All variants on one image, row by row, ``columns`` tiles wide"""
+    count, height, width = stack.shape[:3]
+    rows = -(-count // columns)
+    grid = np.zeros((rows * columns,) + stack.shape[1:], dtype=stack.dtype)
+    grid[:count] = stack
+    grid = grid.reshape(rows, columns, height, width, -1).transpose(0, 2, 1, 3, 4)
+    return Image.fromarray(np.ascontiguousarray(grid.reshape(rows * height, columns * width, -1)), 'RGBA')
+
+
+def to_images(stack: np.ndarray) -> List[Image.Image]:
+    """One RGBA image per variant"""
+    return [Image.fromarray(np.ascontiguousarray(tile), 'RGBA') for tile in stack]
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Shape-Field Tree Renderer
+=========================
+
+Draws tree sprites from signed-distance fields instead of hand-placed
+ellipses. A tree is a list of parts in unit canvas coordinates (0..1 across,
+0 at the top), so the same tree renders at any sprite size:
+
+- trunk      tapered capsules along a (possibly bowed) centre line
+- branches   forked capsules off the upper trunk (bare trees, and the limbs
+             under a canopy)
+- tiers      stacked cones, widest at the bottom (conifers)
+- canopy     overlapping ellipse blobs inside the crown
+- strands    thin wobbling capsule chains hanging from the crown (willows)
+- fronds     drooping capsule chains fanning out of the crown (palms)
+- fruit      small discs on top (coconuts, magic sparkles)
+
+One TreeSpec describes a species; every style comes from the same
+parameters (a willow is a small crown with strands, a pine is tiers without
+blobs, a dead tree is branches only). tree_parts() lays out one seeded
+variant of a spec; render_trees() rasterizes a whole batch of variants of
+any species at once: each part is a distance field over N x size x size
+pixels, turned into an anti-aliased coverage mask and painted over the parts
+below it, shaded by where the pixel sits inside its part (lit from the upper
+left) with a darker rim, so clumps read as separate.
+
+Usage:
+    spec = TreeSpec(bark=(101, 67, 33), leaves=(46, 125, 50), blobs=8)
+    rngs = [asset_rng('resources/tree_oak', variant) for variant in range(8)]
+    sprites = render_trees([spec] * 8, 48, rngs)     # 8 x 48 x 48 x 4 uint8
+"""
+
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from tileable import value_noise
+
+Color = Tuple[int, int, int]
+
+# Where the trunk meets the ground, in unit canvas coordinates
+BASE_X = 0.5
+BASE_Y = 0.97
+
+# Shape of each part group and whether it takes the bark or the leaf colour, in painting order
+GROUPS = [
+    ('trunk', 'capsule', 'bark'),
+    ('branches', 'capsule', 'bark'),
+    ('tiers', 'cone', 'leaves'),
+    ('canopy', 'ellipse', 'leaves'),
+    ('strands', 'capsule', 'leaves'),
+    ('fronds', 'capsule', 'leaves'),
+    ('fruit', 'ellipse', 'fruit'),
+]
+
+# Parameters per shape: capsule (ax, ay, bx, by, ra, rb), cone (cx, top, bottom, half width),
+# ellipse (cx, cy, rx, ry); every part also carries a colour offset
+SHAPE_PARAMS = {'capsule': 6, 'cone': 4, 'ellipse': 4}
+
+
+class TreeSpec(NamedTuple):
+    """Parametric description of one species; lengths are fractions of the sprite size"""
+    bark: Color
+    leaves: Color
+    trunk_height: float = 0.4           # trunk top above the base
+    trunk_width: float = 0.12           # at the base
+    taper: float = 0.6                  # top width / base width
+    bend: float = 0.0                   # sideways bow of the trunk top
+    crown_y: float = 0.42               # centre of the crown
+    crown_width: float = 0.34           # half-width of the crown
+    crown_height: float = 0.26          # half-height of the crown
+    blobs: int = 0                      # canopy blobs
+    blob_size: Tuple[float, float] = (0.12, 0.2)
+    tiers: int = 0                      # conifer cones
+    strands: int = 0                    # hanging strands
+    strand_length: float = 0.35
+    fronds: int = 0                     # palm fronds
+    frond_length: float = 0.34
+    branches: int = 0                   # limbs off the upper trunk
+    branch_length: float = 0.22
+    fruit: int = 0
+    fruit_color: Color = (120, 80, 40)
+    fruit_size: float = 0.03
+    texture: float = 0.35               # strength of the leaf clump noise
+    tone: int = 8                       # per-part colour jitter
+
+
+def chain(points: Sequence[Tuple[float, float]], start: float, end: float, tone: float) -> List[Tuple]:
+    """Capsules joining consecutive points, the radius going linearly from start to end"""
+    radii = np.linspace(start, end, len(points))
+    return [(ax, ay, bx, by, ra, rb, tone)
+            for (ax, ay), (bx, by), ra, rb in zip(points[:-1], points[1:], radii[:-1], radii[1:])]
+
+
+def tree_parts(spec: TreeSpec, rng: np.random.Generator) -> Dict[str, List[Tuple]]:
+    """One seeded variant of a species as parts per group, in unit canvas coordinates"""
+    parts = {name: [] for name, _, _ in GROUPS}
+    tone = lambda: float(rng.integers(-spec.tone, spec.tone + 1))
+
+    # Trunk: three capsules along a curve leaning by bend plus a little jitter
+    lean = spec.bend + rng.uniform(-0.02, 0.02)
+    height = spec.trunk_height * rng.uniform(0.92, 1.08)
+    trunk = [(BASE_X + lean * t * t, BASE_Y - height * t) for t in np.linspace(0, 1, 4)]
+    parts['trunk'] = chain(trunk, spec.trunk_width / 2, spec.trunk_width * spec.taper / 2, 0)
+    top_x, top_y = trunk[-1]
+
+    crown_x = top_x
+    crown_w = spec.crown_width * rng.uniform(0.9, 1.1)
+    crown_h = spec.crown_height * rng.uniform(0.9, 1.1)
+    crown_y = spec.crown_y + rng.uniform(-0.02, 0.02)
+
+    # Limbs: alternate sides, each bending once more upwards and forking a twig at the elbow
+    for i in range(spec.branches):
+        t = rng.uniform(0.55, 1.0)
+        start = (BASE_X + lean * t * t, BASE_Y - height * t)
+        side = 1 if i % 2 else -1
+        angle = np.radians(rng.uniform(20, 55))
+        length = spec.branch_length * rng.uniform(0.7, 1.1)
+        elbow = (start[0] + side * np.cos(angle) * length * 0.55, start[1] - np.sin(angle) * length * 0.55)
+        angle += np.radians(rng.uniform(10, 30))
+        tip = (elbow[0] + side * np.cos(angle) * length * 0.45, elbow[1] - np.sin(angle) * length * 0.45)
+        twig = (elbow[0] + side * length * 0.35, elbow[1] - length * rng.uniform(0.0, 0.15))
+        radius = spec.trunk_width * spec.taper / 2 * 0.7
+        parts['branches'] += chain([start, elbow, tip], radius, radius * 0.35, tone())
+        parts['branches'] += chain([elbow, twig], radius * 0.5, radius * 0.25, tone())
+
+    # Tiers: top cone first so every lower, wider cone overlaps the base of the one above
+    top = crown_y - crown_h
+    step = 2 * crown_h / max(spec.tiers, 1)
+    for i in range(spec.tiers):
+        width = crown_w * (0.35 + 0.65 * (i + 1) / spec.tiers) * rng.uniform(0.92, 1.08)
+        apex = top + i * step * 0.85
+        parts['tiers'].append((crown_x + rng.uniform(-0.01, 0.01), apex, apex + step * 1.6, width, tone()))
+
+    # Canopy: a core blob filling the crown, then clumps scattered inside it, upper ones painted first
+    if spec.blobs:
+        parts['canopy'].append((crown_x, crown_y, crown_w * 0.75, crown_h * 0.75, tone()))
+        angles = rng.uniform(0, 2 * np.pi, spec.blobs)
+        radii = np.sqrt(rng.uniform(0.2, 1.0, spec.blobs)) * 0.6
+        sizes = rng.uniform(*spec.blob_size, spec.blobs)
+        xs = crown_x + np.cos(angles) * radii * crown_w
+        ys = crown_y + np.sin(angles) * radii * crown_h
+        squash = rng.uniform(0.8, 1.0, spec.blobs)
+        clumps = [(x, y, size, size * s) for x, y, size, s in zip(xs, ys, sizes, squash)]
+        parts['canopy'] += [clump + (tone(),) for clump in sorted(clumps, key=lambda clump: clump[1])]
+
+    # Strands: hanging from the lower half of the crown, wobbling sideways as they fall
+    for x in np.linspace(crown_x - crown_w * 0.85, crown_x + crown_w * 0.85, spec.strands):
+        x += rng.uniform(-0.02, 0.02)
+        edge = np.sqrt(max(1 - ((x - crown_x) / crown_w) ** 2, 0.1))
+        start_y = crown_y + crown_h * edge * 0.5
+        length = spec.strand_length * rng.uniform(0.6, 1.0) * (0.6 + 0.4 * edge)
+        phase = rng.uniform(0, 2 * np.pi)
+        points = [(x + 0.02 * np.sin(phase + t * 4), start_y + length * t) for t in np.linspace(0, 1, 4)]
+        parts['strands'] += chain(points, 0.028, 0.016, tone())
+
+    # Fronds: fanned out of the crown centre, each arcing up and drooping towards its tip
+    for angle in np.linspace(0, np.pi, spec.fronds) + rng.uniform(-0.15, 0.15, spec.fronds):
+        length = spec.frond_length * rng.uniform(0.8, 1.1)
+        dx, dy = np.cos(angle), -np.sin(angle)
+        points = [(crown_x + dx * length * t, crown_y + (dy * t + 1.2 * t * t) * length)
+                  for t in np.linspace(0, 1, 5)]
+        parts['fronds'] += chain(points, 0.05, 0.015, tone())
+
+    # Fruit: near the crown centre, over everything else
+    for _ in range(spec.fruit):
+        angle = rng.uniform(0, 2 * np.pi)
+        radius = np.sqrt(rng.uniform(0, 1)) * 0.8
+        size = spec.fruit_size * rng.uniform(0.8, 1.2)
+        parts['fruit'].append((crown_x + np.cos(angle) * radius * crown_w,
+                               crown_y + np.sin(angle) * radius * crown_h, size, size, tone()))
+
+    return parts
+
+
+def capsule(px: np.ndarray, py: np.ndarray, p: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distance to a segment whose radius tapers from ra to rb, and sideways shade (lit from the left)"""
+    ax, ay, bx, by, ra, rb = (p[:, i, None, None] for i in range(6))
+    dx, dy = bx - ax, by - ay
+    t = np.clip(((px - ax) * dx + (py - ay) * dy) / np.maximum(dx * dx + dy * dy, 1e-12), 0, 1)
+    cx, cy = ax + t * dx, ay + t * dy
+    radius = np.maximum(ra + (rb - ra) * t, 1e-6)
+    distance = np.hypot(px - cx, py - cy) - radius
+    return distance, 0.55 - 0.45 * np.clip((px - cx) / radius, -1, 1)
+
+
+def cone(px: np.ndarray, py: np.ndarray, p: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distance to a cone standing on its base, and shade (lit from the left, darker towards the base)"""
+    cx, top, bottom, half_width = (p[:, i, None, None] for i in range(4))
+    depth = np.clip((py - top) / np.maximum(bottom - top, 1e-6), 0, 1)
+    width = np.maximum(half_width * depth, 1e-6)
+    slope = half_width / np.maximum(bottom - top, 1e-6)
+    side = (np.abs(px - cx) - width) / np.sqrt(1 + slope * slope)
+    distance = np.maximum(np.maximum(side, top - py), py - bottom)
+    return distance, 0.65 - 0.35 * np.clip((px - cx) / width, -1, 1) - 0.3 * depth
+
+
+def ellipse(px: np.ndarray, py: np.ndarray, p: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Approximate distance to an ellipse, and shade (a dome lit from the upper left)"""
+    cx, cy, rx, ry = (p[:, i, None, None] for i in range(4))
+    rx, ry = np.maximum(rx, 1e-6), np.maximum(ry, 1e-6)
+    ux, uy = (px - cx) / rx, (py - cy) / ry
+    distance = (np.hypot(ux, uy) - 1) * np.minimum(rx, ry)
+    return distance, 0.55 - 0.3 * np.clip(ux, -1, 1) - 0.4 * np.clip(uy, -1, 1)
+
+
+SHAPES = {'capsule': capsule, 'cone': cone, 'ellipse': ellipse}
+
+
+def pack(layouts: Sequence[Dict[str, List[Tuple]]], group: str, shape: str) -> Tuple[np.ndarray, np.ndarray]:
+    """One group of every tree as N x K x params arrays, padded with inactive parts"""
+    slots = max(len(layout[group]) for layout in layouts)
+    params = np.zeros((len(layouts), slots, SHAPE_PARAMS[shape] + 1), dtype=np.float32)
+    active = np.zeros((len(layouts), slots), dtype=bool)
+    for i, layout in enumerate(layouts):
+        if layout[group]:
+            params[i, :len(layout[group])] = layout[group]
+            active[i, :len(layout[group])] = True
+    return params, active
+
+
+def render_trees(specs: Sequence[TreeSpec], size: int, rngs: Sequence[np.random.Generator]) -> np.ndarray:
+    """N x size x size x 4 sprites, tree i drawn from specs[i] with its own random stream rngs[i].
+
+    Each stream lays out its tree before drawing any texture, so a variant has
+    the same shape at every size.
+    """
+    layouts = [tree_parts(spec, rng) for spec, rng in zip(specs, rngs)]
+    # Leaf clumps of a few pixels at any size
+    texture = np.concatenate([value_noise(rng, 1, size, period=max(4, size // 6)) for rng in rngs]).astype(np.float32)
+    strength = np.array([spec.texture for spec in specs], dtype=np.float32)[:, None, None]
+    colors = {source: np.array([getattr(spec, source if source != 'fruit' else 'fruit_color') for spec in specs],
+                               dtype=np.float32)
+              for source in ('bark', 'leaves', 'fruit')}
+
+    ys, xs = ((np.mgrid[0:size, 0:size] + 0.5) / size).astype(np.float32)
+    rgb = np.zeros((len(specs), size, size, 3), dtype=np.float32)
+    alpha = np.zeros((len(specs), size, size), dtype=np.float32)
+    for group, shape, source in GROUPS:
+        params, active = pack(layouts, group, shape)
+        for slot in range(params.shape[1]):
+            # Only the trees that have this part; most groups belong to a few species
+            trees = np.flatnonzero(active[:, slot])
+            distance, shade = SHAPES[shape](xs, ys, params[trees, slot, :-1])
+            pixels = distance * size
+            # Anti-aliased coverage, plus a darker rim along the inside of the edge
+            coverage = np.clip(0.5 - pixels, 0, 1)
+            rim = np.clip(1 + pixels, 0, 1)
+            shade = shade - 0.25 * rim
+            if source == 'leaves':
+                shade = shade + (texture[trees] - 0.5) * strength[trees]
+            # A few flat bands rather than a smooth gradient, in keeping with the pixel art
+            shade = np.round(np.clip(shade, 0, 1) * 4) / 4
+            base = colors[source][trees] + params[trees, slot, -1, None]
+            color = np.clip(base[:, None, None] * (0.6 + 0.7 * shade[..., None]), 0, 255)
+            # Straight-alpha "over", so anti-aliased edges don't pick up the empty background's black
+            below = alpha[trees] * (1 - coverage)
+            alpha[trees] = coverage + below
+            rgb[trees] = (color * coverage[..., None] + rgb[trees] * below[..., None]) / \
+                np.maximum(alpha[trees], 1e-9)[..., None]
+
+    sprites = np.zeros((len(specs), size, size, 4), dtype=np.uint8)
+    sprites[..., :3] = np.rint(rgb)
+    sprites[..., 3] = np.rint(alpha * 255)
+    return sprites